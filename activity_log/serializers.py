@@ -97,9 +97,6 @@ class ActivityLogWriteSerializer(serializers.ModelSerializer):
         lng = data.get('longitude')
         activity_date = data.get('activity_date')
 
-        print("REQUEST DATA:", self.initial_data)
-        print("SERIALIZED DATA:", data)
-
         if (lat is not None and lng is None) or (lng is not None and lat is None):
             raise serializers.ValidationError({
                 'non_field_errors': ["Si proporcionas latitud, también debes proporcionar longitud, y viceversa."]
@@ -3,7 +3,7 @@ from django.db.models import QuerySet
 
 from activity_log.models import ActivityLog
 from activity_log.services.interfaces import AbstractActivityLogFactory
-from client.models import Client
+from client.services.client_service import get_serialized_clients_queryset
 from opportunity.services.base import BaseService
 
 
@@ -15,10 +15,8 @@ class ActivityLogService(AbstractActivityLogFactory, BaseService):
         pass
 
     def get_base_queryset(self, user)->QuerySet:
-        optimized_clients = Prefetch(
-            'contact__clients',
-            queryset=Client.objects.select_related('city', 'business_group')
-        )
+        # ContactSerializer anida ClientSerializer, que a su vez anida los proyectos
+        optimized_clients = Prefetch('contact__clients', queryset=get_serialized_clients_queryset())
 
         queryset = ActivityLog.objects.select_related(
             'activity_type',
@@ -43,10 +41,17 @@ class ActivityLogService(AbstractActivityLogFactory, BaseService):
             'opportunity__project__subdivision__division',
             'opportunity__project__project_status',
             'opportunity__project__work_cell',
-            'opportunity__project__work_cell__udn'
+            'opportunity__project__work_cell__udn',
+            # Lo que además lee OpportunitySerializer
+            'opportunity__agent',
+            'opportunity__contact',
+            'opportunity__client',
+            'opportunity__lost_opportunity',
+            'opportunity__finance_data',
         ).prefetch_related(
-            optimized_clients
+            optimized_clients,
+            'opportunity__documents',
         )
         return self.add_filter_by_rol(user, queryset,
-                                      workcell_filter_field="project__work_cell__users",
+                                      workcell_filter_field="project__work_cell",
                                       owner_field="project__work_cell__users")
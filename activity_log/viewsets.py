@@ -31,4 +31,8 @@ class ActivityLogViewSet(AuthenticatedModelViewSet):
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:  # Para GET (lista o detalle)
             return ActivityLogSerializer
-        return ActivityLogWriteSerializer  # Para POST, PUT, PATCH, DELETE
\ No newline at end of file
+        return ActivityLogWriteSerializer  # Para POST, PUT, PATCH, DELETE
+
+    def get_actives_queryset(self, request):
+        user = request.user
+        return self.activity_log_service.get_base_queryset(user).filter(is_removed=False)
\ No newline at end of file
@@ -1,4 +1,6 @@
+import hashlib
 import logging
+from urllib.parse import urlencode
 
 from django.db.models import QuerySet
 from redis.exceptions import ConnectionError as RedisConnectionError  # Import directo de redis-py
@@ -11,17 +13,39 @@ logger = logging.getLogger(__name__)
 import logging
 from django.core.cache import cache
 from django.db import transaction
+from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 
+from core.renderers import ORJSONRenderer
+from core.serializers.values import get_values_serializer
+from core.utils.cache import get_generations, get_raw, model_label, set_raw
+from core.utils.cache_invalidation import invalidation_registry
+from core.utils.instrumentation import record_cache, timed
+from users.models import RoleScope
+from users.services.access import get_access_profile, resolve_scope
+
 logger = logging.getLogger(__name__)
 
 
 class ListCacheMixin:
+    """
+    Cachea la respuesta de `list` en Redis como bytes JSON ya renderizados (ORJSONRenderer):
+    un HIT responde esos bytes tal cual, sin deserializar ni volver a codificar.
+
+    La clave incluye:
+    - la generación del recurso cacheado (`get_cache_resource`). Los modelos de los que depende
+      cada recurso se declaran en core.utils.cache_invalidation, e invalidar es solo incrementar
+      ese contador;
+    - el alcance del usuario (`resolve_scope`) y, según el caso, sus células o su id,
+      para no compartir filas filtradas por rol entre usuarios;
+    - los query params (filtros y página).
+    """
     cache_timeout = 60 * 60  # 1 hora
     cache_prefix = "catalog"
     cache_enabled = True
+    cache_resource = None  # Recurso del registro de invalidación; por defecto el modelo del ViewSet
 
     def list(self, request, *args, **kwargs):
         model = getattr(self, "model", None)
@@ -33,17 +57,31 @@ class ListCacheMixin:
         if not self.cache_enabled:
             return super().list(request, *args, **kwargs)
 
+        # El cache guarda el JSON compacto ya renderizado; otros formatos (API navegable, JSON indentado)
+        # no se cachean
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, ORJSONRenderer) or renderer.get_indent(request.accepted_media_type, {}):
+            return super().list(request, *args, **kwargs)
+
         cache_key = self.get_cache_key()
-        cached_data = self._safe_cache_get(cache_key)
+        payload = get_raw(cache_key)
 
-        if cached_data is not None:
-            print(f"[Redis HIT] {cache_key}")
-            return Response(cached_data)
+        if payload is not None:
+            logger.debug(f"[Redis HIT] {cache_key}")
+            record_cache(hits=1, prefix=self.cache_prefix)
+            return HttpResponse(payload, content_type=ORJSONRenderer.media_type)
 
-        print(f"[Redis MISS] {cache_key}")
+        logger.debug(f"[Redis MISS] {cache_key}")
+        record_cache(misses=1, prefix=self.cache_prefix)
         response = super().list(request, *args, **kwargs)
-        self._safe_cache_set(cache_key, response.data)
-        return response
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        # Se codifica una sola vez: los mismos bytes se guardan y se responden
+        payload = ORJSONRenderer.encode(response.data)
+        set_raw(cache_key, payload, self.cache_timeout)
+        logger.info(f"Cache SET: {cache_key}")
+        return HttpResponse(payload, content_type=ORJSONRenderer.media_type)
 
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -63,7 +101,7 @@ class ListCacheMixin:
 
         # Serializar respuesta
         read_serializer_class = getattr(self, 'read_serializer_class', self.get_serializer_class())
-        read_serializer = read_serializer_class(instance)
+        read_serializer = read_serializer_class(instance, context=self.get_serializer_context())
 
         return Response(read_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -88,7 +126,7 @@ class ListCacheMixin:
 
         # Serializar respuesta
         read_serializer_class = getattr(self, 'read_serializer_class', self.get_serializer_class())
-        read_serializer = read_serializer_class(updated_instance)
+        read_serializer = read_serializer_class(updated_instance, context=self.get_serializer_context())
 
         return Response(read_serializer.data)
 
@@ -160,31 +198,49 @@ class ListCacheMixin:
         except Exception as e:
             logger.warning(f"Error invalidando caches relacionados: {e}")
 
-    def _safe_cache_get(self, key):
-        try:
-            return cache.get(key)
-        except RedisConnectionError:
-            logger.warning(f"Redis no disponible (get): clave '{key}'")
-            return None
+    def invalidate_cache(self):
+        invalidation_registry.invalidate_resources([self.get_cache_resource()])
 
-    def _safe_cache_set(self, key, data, timeout=None):
-        if timeout is None:
-            timeout = self.cache_timeout
+    def get_cache_resource(self):
+        if self.cache_resource:
+            return self.cache_resource
+        model = getattr(self, "model", None) or getattr(self.queryset, "model", None)
+        return model_label(model)
 
-        try:
-            cache.set(key, data, timeout)
-            logger.info(f"Cache SET: {key}")
-        except RedisConnectionError:
-            logger.warning(f"Redis no disponible (set): clave '{key}'")
+    def get_cache_scope(self):
+        """
+        Huella del alcance de datos del usuario:
+        - ALL / NONE      → el scope (compartido por todos los usuarios con ese alcance)
+        - WORKCELL        → el scope + IDs de sus células
+        - OWNED           → el scope + ID del usuario
+        """
+        user = self.request.user
+        scope = resolve_scope(user)
 
-    def invalidate_cache(self):
-        try:
-            cache.delete(self.get_cache_key())
-        except RedisConnectionError:
-            logger.warning(f"Redis no disponible (delete): clave '{self.get_cache_key()}'")
+        if scope == RoleScope.WORKCELL:
+            workcell_ids = get_access_profile(user)['workcell_ids']
+            return f"{scope}:{'.'.join(str(wc_id) for wc_id in workcell_ids)}"
+
+        if scope == RoleScope.OWNED:
+            return f"{scope}:{user.pk}"
+
+        return str(scope)
+
+    def get_cache_params(self):
+        """Hash de los query params ordenados (filtros, búsqueda y página)."""
+        params = sorted(
+            (key, sorted(values)) for key, values in self.request.query_params.lists()
+        )
+        encoded = urlencode(params, doseq=True)
+        return hashlib.md5(encoded.encode()).hexdigest() if encoded else "all"
 
     def get_cache_key(self):
-        return f"{self.cache_prefix}_{self.__class__.__name__}_list"
+        resource = self.get_cache_resource()
+        generation = get_generations([resource])[resource]
+        return (
+            f"{self.cache_prefix}_{self.__class__.__name__}_list"
+            f":g{generation}:{self.get_cache_scope()}:{self.get_cache_params()}"
+        )
 
     # Métodos que los ViewSets pueden sobrescribir para personalizar comportamiento:
 
@@ -205,6 +261,34 @@ class AuthenticatedModelViewSet(ModelViewSet):
     """ViewSet base con autenticación requerida."""
     permission_classes = [IsAuthenticated, DjangoModelPermissions]
     model = None
+    # Si es True, `list` serializa desde filas `.values()` (ver core.serializers.values)
+    # con el mismo JSON que el serializer de lectura
+    values_serialization = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.values_serialization:
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(self.serialize_many(page))
+            return Response(self.serialize_many(queryset))
+
+        values_serializer = get_values_serializer(self.get_serializer_class())
+        rows = values_serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            with timed('serialize_time'):
+                data = values_serializer.serialize(page)
+            return self.get_paginated_response(data)
+        with timed('serialize_time'):
+            data = values_serializer.serialize(rows)
+        return Response(data)
+
+    def serialize_many(self, objects):
+        """`serializer.data` de una lista, medido como tiempo de serialización del request."""
+        with timed('serialize_time'):
+            return self.get_serializer(objects, many=True).data
 
     def get_queryset(self):
         optimized_getter = getattr(self, 'get_optimized_queryset', None)
@@ -224,8 +308,14 @@ class AuthenticatedModelViewSet(ModelViewSet):
     @action(detail=False, methods=['get'], url_path='actives')
     def actives(self, request):
         queryset = self.get_actives_queryset(request)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        if isinstance(queryset, Response):
+            # Algunos ViewSets devuelven directamente los errores del filterset
+            return queryset
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_many(page))
+        return Response(self.serialize_many(queryset))
 
     def get_actives_queryset(self, request)-> QuerySet:
         """
@@ -239,6 +329,6 @@ class AuthenticatedModelViewSet(ModelViewSet):
 
 
 # ¡ORDEN CORRECTO! Mixin primero, luego la clase base
-class CachedViewSet(AuthenticatedModelViewSet):
+class CachedViewSet(ListCacheMixin, AuthenticatedModelViewSet):
     """ViewSet base para catálogos con caché habilitado."""
     cache_timeout = 60 * 60 * 2  # 2 horas para catálogos
\ No newline at end of file
@@ -15,6 +15,7 @@ from catalog.serializers import (
     WorkCellWriteSerializer
 )
 from catalog.viewsets.base import CachedViewSet
+from users.services.access import get_access_profile
 
 
 class UDNViewSet(CachedViewSet):
@@ -31,9 +32,12 @@ class WorkCellViewSet(CachedViewSet):
             return WorkCellSerializer
         return WorkCellWriteSerializer
 
+    def get_optimized_queryset(self):
+        return WorkCell.all_objects.select_related('udn').order_by('-id')
 
     def get_actives_queryset(self, request):
-        return WorkCell.all_objects.filter(users=request.user).filter(is_removed=False).distinct()
+        workcell_ids = get_access_profile(request.user)['workcell_ids']
+        return WorkCell.all_objects.select_related('udn').filter(id__in=workcell_ids, is_removed=False)
 
     @action(detail=False, methods=['get'], url_path='workcell-active-all')
     def workcell_active_all(self, request):
@@ -41,7 +45,7 @@ class WorkCellViewSet(CachedViewSet):
             Devolver la lista de workcell activas del sistema.
         """
         try:
-            result = WorkCell.all_objects.filter(is_removed=False).distinct()
+            result = WorkCell.all_objects.select_related('udn').filter(is_removed=False)
             serializer = WorkCellSerializer(result, many=True)
             return Response(serializer.data)
         except Exception as e:
@@ -12,5 +12,4 @@ class ClientConfig(AppConfig):
         if should_skip_signal_registration():
             return
 
-        from .signals import register_catalog_signals
-        register_catalog_signals()
+        from . import signals  # noqa: F401 (registra el receiver de post_migrate)
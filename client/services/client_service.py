@@ -7,6 +7,27 @@ from opportunity.services.base import BaseService
 from project.models import Project
 
 
+def get_serialized_clients_queryset() -> QuerySet:
+    """
+    Clientes con todo lo que lee ClientSerializer (ciudad, grupo y proyectos con sus catálogos).
+    Se usa también para el Prefetch de `contact__clients` en los querysets que anidan ContactSerializer.
+    """
+    projects_qs = Project.objects.select_related(
+        'work_cell__udn',
+        'specialty',
+        'subdivision',
+        'project_status'
+    ).order_by('id')
+
+    return (
+        Client.objects
+        .select_related('city', 'business_group')
+        .prefetch_related(
+            Prefetch('projects', queryset=projects_qs)
+        )
+    )
+
+
 class ClientService(AbstractClientFactory, BaseService):
     def create(self, validated_data: dict) -> Client:
         project_ids = validated_data.pop('projects', [])
@@ -30,21 +51,7 @@ class ClientService(AbstractClientFactory, BaseService):
         return instance
 
     def get_base_queryset(self, user) -> QuerySet:
-        # Queryset de Projects con FKs que se necesita en el serializer
-        project_qs = Project.objects.select_related(
-            'work_cell__udn',
-            'specialty',
-            'subdivision',
-            'project_status'
-        )
-
-        queryset = (
-            Client.objects
-            .select_related('city', 'business_group')
-            .prefetch_related(
-                Prefetch('projects', queryset=project_qs)
-            )
-        )
+        queryset = get_serialized_clients_queryset()
 
-        return self.add_filter_by_rol(user, queryset, workcell_filter_field="projects__work_cell__users",
+        return self.add_filter_by_rol(user, queryset, workcell_filter_field="projects__work_cell",
                                       owner_field="projects__work_cell__users")
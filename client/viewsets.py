@@ -22,6 +22,7 @@ class ClientViewSet(CachedViewSet):
 
     filter_backends = [DjangoFilterBackend]  # Agregar filtros
     filterset_class = ClientFilter
+    values_serialization = True  # listado serializado desde .values()
 
     @cached_property
     def client_service(self) -> ClientService:
@@ -37,11 +38,11 @@ class ClientViewSet(CachedViewSet):
     def get_queryset(self):
         """Queryset optimizado específico de Client"""
         user = self.request.user
-        return self.client_service.get_base_queryset(user).distinct()
+        return self.client_service.get_base_queryset(user)
 
     def get_actives_queryset(self, request):
         user = request.user
-        queryset = self.client_service.get_base_queryset(user).filter(is_removed=False).distinct()
+        queryset = self.client_service.get_base_queryset(user).filter(is_removed=False)
 
         filterset = ClientFilter(request.query_params, queryset=queryset)
 
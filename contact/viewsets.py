@@ -17,6 +17,7 @@ class ContactViewSet(CachedViewSet):
 
     # Configuración específica de Contact
     cache_prefix = "contact"  # Override del "catalog" por defecto
+    values_serialization = True  # listado serializado desde .values()
 
     # Configuración para invalidaciones automáticas
     write_serializer_class = ContactWriteSerializer  # Para invalidaciones automáticas
@@ -28,7 +29,7 @@ class ContactViewSet(CachedViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return self.contact_service.get_base_queryset(user).distinct()
+        return self.contact_service.get_base_queryset(user)
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:  # Para GET (lista o detalle)
@@ -37,7 +38,7 @@ class ContactViewSet(CachedViewSet):
 
     def get_actives_queryset(self, request):
         user = request.user
-        queryset =self.contact_service.get_base_queryset(user).filter(is_removed=False).distinct()
+        queryset =self.contact_service.get_base_queryset(user).filter(is_removed=False)
 
         filterset = ContactFilter(request.query_params, queryset=queryset)
         if not filterset.is_valid():
@@ -1,9 +1,16 @@
 from django.apps import AppConfig
-from core.di import injector  # importas el singleton para asegurar inicialización
+
 
 class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
+        # Se importa aquí: core.di carga los servicios, que a su vez importan modelos
+        from core.di import injector  # importas el singleton para asegurar inicialización
         from opportunity.services.opportunity_service import OpportunityService
         injector.get(OpportunityService)
+
+        # La invalidación de cache se conecta siempre (también en shell/migrate): cualquier escritura
+        # que no invalide dejaría listados obsoletos hasta que expire el TTL.
+        from core.utils.cache_invalidation import invalidation_registry
+        invalidation_registry.connect()
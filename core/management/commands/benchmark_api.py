@@ -0,0 +1,270 @@
+import json
+import math
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog.models import WorkCell
+from catalog.viewsets.base import ListCacheMixin
+from core.utils.seed import seed_dataset
+from opportunity.models import Opportunity
+from users.models import RolePolicy, RoleScope, UserProfile
+from users.services.access import add_access_claims
+
+BENCH_PREFIX = "bench-api-"
+# Oportunidades por agente al sembrar: a 10× filas hay 10× agentes y cada uno conserva su volumen
+ROWS_PER_AGENT = 50
+
+# (nombre en el reporte, ruta del router, requiere pk)
+ENDPOINTS = [
+    ("opportunities", "opportunities-list", False),
+    ("opportunities/<pk>", "opportunities-detail", True),
+    ("purchases", "purchases-list", False),
+    ("projects", "projects-list", False),
+    ("clients", "client-list", False),
+    ("contacts", "contacts-list", False),
+    ("activities-log", "activitieslog-list", False),
+    ("objetives", "objetives-list", False),
+    ("users", "users-list", False),
+    ("workcells", "workcell-list", False),
+]
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide los endpoints principales con un usuario por RoleScope (OWNED, WORKCELL, ALL, NONE) y reporta "
+        "p50/p95 de latencia, consultas y bytes por endpoint en JSON. Con --seed siembra antes un dataset "
+        "sintético (core.utils.seed) con historial. Usar una base de datos desechable: los datos no se borran."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Filas sintéticas por entidad a crear antes de medir (ej: 10000)")
+        parser.add_argument('--days', type=int, default=0,
+                            help="Repartir las oportunidades sembradas en los últimos N días (0 = hoy)")
+        parser.add_argument('--no-history', action='store_true', help="Sembrar sin filas de simple_history")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--runs', type=int, default=20, help="Requests medidos por endpoint y alcance")
+        parser.add_argument('--warmup', type=int, default=2, help="Requests previos no medidos")
+        parser.add_argument('--scopes', nargs='+', choices=RoleScope.values, default=RoleScope.values)
+        parser.add_argument('--endpoints', nargs='+', choices=[name for name, _, _ in ENDPOINTS],
+                            help="Medir solo estos endpoints")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Desactivar el cache de listados (ListCacheMixin) para medir la base de datos")
+        parser.add_argument('--output', help="Guardar el reporte JSON en este archivo (por defecto, stdout)")
+        parser.add_argument('--compare', help="Reporte JSON previo contra el que comparar p50/p95 y consultas")
+
+    def handle(self, *args, **options):
+        baseline = self._load(options['compare']) if options['compare'] else None
+        users = self._bench_users()
+
+        seeded = {}
+        if options['seed']:
+            rows = options['seed']
+            self.stderr.write(f"Sembrando {rows} filas por entidad...")
+            seeded = seed_dataset(
+                rows, users=max(rows // ROWS_PER_AGENT, 1),
+                agent_ids=[users[RoleScope.OWNED].id, users[RoleScope.WORKCELL].id],
+                days=options['days'], history=not options['no_history'], batch_size=options['batch_size'],
+            )
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+        self._assign_workcells(users)
+        endpoints = [e for e in ENDPOINTS if not options['endpoints'] or e[0] in options['endpoints']]
+        detail_pk = self._detail_opportunity(users)
+
+        results = []
+        with self._list_cache(enabled=not options['no_cache']):
+            for scope in options['scopes']:
+                client = self._client(users[scope])
+                for name, route, detail in endpoints:
+                    if detail and detail_pk is None:
+                        self.stderr.write(f"  {name}: sin oportunidades del usuario OWNED, se omite")
+                        continue
+                    path = reverse(route, kwargs={'pk': detail_pk}) if detail else reverse(route)
+                    result = self._measure(client, path, options['runs'], options['warmup'])
+                    results.append({'endpoint': name, 'scope': scope, 'path': path, **result})
+                    self.stderr.write(
+                        f"  [{scope}] {name}: {result['status']} p50 {result['p50_ms']} ms | "
+                        f"p95 {result['p95_ms']} ms | {result['queries']} consultas | {result['bytes']} bytes"
+                    )
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'rows': options['seed'],
+                'seeded': seeded,
+                'opportunities': Opportunity.all_objects.count(),
+                'runs': options['runs'],
+                'warmup': options['warmup'],
+                'list_cache': not options['no_cache'],
+                'stateless_auth': settings.JWT_STATELESS_AUTH,
+            },
+            'results': results,
+        }
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(payload)
+            self.stderr.write(self.style.SUCCESS(f"Reporte guardado en {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+        if baseline is not None:
+            self._compare(baseline, report)
+
+    def _bench_users(self) -> dict:
+        """
+        Un usuario por alcance, cada uno en su grupo con RolePolicy y todos los permisos `view_*`.
+        Se crean antes de sembrar: los de OWNED y WORKCELL reciben oportunidades (`agent_ids`).
+        """
+        view_permissions = list(Permission.objects.filter(codename__startswith='view_'))
+
+        users = {}
+        for scope in RoleScope.values:
+            group, _ = Group.objects.get_or_create(name=f"{BENCH_PREFIX}{scope.lower()}")
+            group.permissions.set(view_permissions)
+            RolePolicy.objects.update_or_create(group=group, defaults={'scope': scope})
+
+            user, created = User.objects.get_or_create(username=f"{BENCH_PREFIX}{scope.lower()}")
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+                UserProfile.objects.get_or_create(user=user)
+            user.groups.set([group])
+            users[scope] = user
+        return users
+
+    def _assign_workcells(self, users: dict):
+        """Células de los usuarios de prueba; se asignan después de sembrar, cuando ya existen."""
+        workcells = list(WorkCell.all_objects.order_by('id').values_list('id', flat=True)[:2])
+        if not workcells:
+            raise CommandError("No hay células de trabajo; usa --seed para crear datos sintéticos.")
+        for scope, user in users.items():
+            user.workcell.set(workcells if scope == RoleScope.WORKCELL else workcells[:1])
+
+    def _detail_opportunity(self, users: dict):
+        """
+        Oportunidad del usuario OWNED para medir el detalle. Su célula se asigna al usuario WORKCELL,
+        así OWNED, WORKCELL y ALL la ven y NONE recibe 403.
+        """
+        opportunity = (
+            Opportunity.objects.filter(agent=users[RoleScope.OWNED], project__isnull=False)
+            .select_related('project').order_by('-id').first()
+        )
+        if opportunity is None:
+            return None
+        if opportunity.project.work_cell_id is not None:
+            users[RoleScope.WORKCELL].workcell.add(opportunity.project.work_cell_id)
+        return opportunity.pk
+
+    def _client(self, user) -> APIClient:
+        host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost').lstrip('.')
+        client = APIClient(HTTP_HOST=host, HTTP_X_FORWARDED_PROTO='https')
+        # Con los mismos claims que el login, para medir también JWT_STATELESS_AUTH
+        token = AccessToken.for_user(user)
+        add_access_claims(token, user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def _measure(self, client, path: str, runs: int, warmup: int) -> dict:
+        for _ in range(warmup):
+            client.get(path)
+
+        samples, queries = [], []
+        response = None
+        for _ in range(max(runs, 1)):
+            with _count_queries() as counter:
+                started = time.perf_counter()
+                response = client.get(path)
+                samples.append((time.perf_counter() - started) * 1000)
+            queries.append(counter[0])
+
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(samples, 50), 1),
+            'p95_ms': round(percentile(samples, 95), 1),
+            'mean_ms': round(statistics.fmean(samples), 1),
+            'queries': max(queries),
+            'bytes': len(response.content),
+            'rows': _row_count(response) if response.status_code == 200 else None,
+        }
+
+    @contextmanager
+    def _list_cache(self, enabled: bool):
+        previous = ListCacheMixin.cache_enabled
+        ListCacheMixin.cache_enabled = enabled
+        try:
+            yield
+        finally:
+            ListCacheMixin.cache_enabled = previous
+
+    def _load(self, path: str) -> dict:
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer el reporte {path}: {e}")
+
+    def _compare(self, baseline: dict, report: dict):
+        previous = {(r['endpoint'], r['scope']): r for r in baseline.get('results', [])}
+        self.stderr.write(self.style.MIGRATE_HEADING(
+            f"\nComparación con el reporte previo "
+            f"({baseline['meta'].get('opportunities')} → {report['meta']['opportunities']} oportunidades)"
+        ))
+        for result in report['results']:
+            before = previous.get((result['endpoint'], result['scope']))
+            if before is None:
+                continue
+            self.stderr.write(
+                f"  [{result['scope']}] {result['endpoint']}: "
+                f"p50 {before['p50_ms']} → {result['p50_ms']} ms ({_ratio(before['p50_ms'], result['p50_ms'])}) | "
+                f"p95 {before['p95_ms']} → {result['p95_ms']} ms ({_ratio(before['p95_ms'], result['p95_ms'])}) | "
+                f"consultas {before['queries']} → {result['queries']} | bytes {before['bytes']} → {result['bytes']}"
+            )
+
+
+def percentile(samples, p: float) -> float:
+    """Percentil por rango más cercano (sin interpolar): siempre es una de las muestras."""
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+@contextmanager
+def _count_queries():
+    """Cuenta las consultas ejecutadas en el bloque sin depender de DEBUG. Deja el total en counter[0]."""
+    counter = [0]
+
+    def wrapper(execute, sql, params, many, context):
+        counter[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+def _row_count(response) -> int:
+    """Filas de la respuesta: la lista (paginada o no) o 1 para un detalle."""
+    data = json.loads(response.content)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    return len(data) if isinstance(data, list) else 1
+
+
+def _ratio(before: float, after: float) -> str:
+    return f"x{after / before:.2f}" if before else "n/a"
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.tasks import schedule_spool_cleanup
+from core.utils.spool import cleanup_spool
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina del staging de subidas (UPLOAD_SPOOL_DIR) los archivos más antiguos que "
+        "UPLOAD_SPOOL_TTL. Los workers de `run_workers` ya la ejecutan cada UPLOAD_SPOOL_CLEANUP_INTERVAL "
+        "en la cola maintenance; este comando la ejecuta en el momento (o la programa con --schedule)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=None,
+                            help=f"Antigüedad máxima en segundos (por defecto {settings.UPLOAD_SPOOL_TTL})")
+        parser.add_argument('--schedule', action='store_true',
+                            help="Programar la limpieza periódica en la cola maintenance en lugar de ejecutarla")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            scheduled = schedule_spool_cleanup()
+            self.stdout.write(self.style.SUCCESS(
+                "Limpieza programada en la cola maintenance" if scheduled else "La limpieza ya estaba programada"
+            ))
+            return
+        removed = cleanup_spool(options['ttl'])
+        self.stdout.write(self.style.SUCCESS(f"Archivos eliminados del staging: {removed}"))
@@ -0,0 +1,48 @@
+import django_rq
+from django.core.management.base import BaseCommand, CommandError
+from rq.registry import FailedJobRegistry
+
+from core.utils.jobs import QUEUE_PRIORITY
+
+
+class Command(BaseCommand):
+    help = (
+        "Revisa el registro de jobs fallidos (dead-letter) de cada cola: los jobs que agotaron sus "
+        "reintentos. Permite reencolarlos o eliminarlos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', nargs='+', default=list(QUEUE_PRIORITY))
+        parser.add_argument('--requeue', nargs='*', metavar='JOB_ID',
+                            help="Reencola los jobs indicados (o todos si no se indica ninguno)")
+        parser.add_argument('--purge', action='store_true', help="Elimina todos los jobs fallidos")
+
+    def handle(self, *args, **options):
+        if options['requeue'] is not None and options['purge']:
+            raise CommandError("--requeue y --purge son excluyentes")
+
+        for name in options['queues']:
+            try:
+                queue = django_rq.get_queue(name)
+            except KeyError:
+                raise CommandError(f"Cola no configurada en RQ_QUEUES: {name}")
+
+            registry = FailedJobRegistry(queue=queue)
+            job_ids = registry.get_job_ids()
+            self.stdout.write(f"[{name}] {len(job_ids)} jobs fallidos")
+
+            if options['requeue'] is not None:
+                selected = [job_id for job_id in job_ids if not options['requeue'] or job_id in options['requeue']]
+                for job_id in selected:
+                    registry.requeue(job_id)
+                self.stdout.write(self.style.SUCCESS(f"[{name}] reencolados: {len(selected)}"))
+            elif options['purge']:
+                for job_id in job_ids:
+                    registry.remove(job_id, delete_job=True)
+                self.stdout.write(self.style.SUCCESS(f"[{name}] eliminados: {len(job_ids)}"))
+            else:
+                for job in queue.job_class.fetch_many(job_ids, connection=queue.connection):
+                    if job is None:
+                        continue
+                    error = (job.exc_info or "").strip().splitlines()[-1:] or [""]
+                    self.stdout.write(f"  {job.id}  {job.func_name}  {job.ended_at}  {error[0]}")
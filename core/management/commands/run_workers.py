@@ -0,0 +1,58 @@
+import logging
+import os
+
+import django_rq
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rq.worker_pool import WorkerPool
+
+from core.tasks import schedule_spool_cleanup
+from core.utils.jobs import MAINTENANCE_QUEUE, QUEUE_PRIORITY, MetricsSimpleWorker, MetricsWorker
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un pool supervisado de workers de RQ. Cada worker espera trabajos con un dequeue "
+        "bloqueante (sin sondeo) y atiende las colas en orden de prioridad; los procesos que mueren "
+        "se vuelven a crear. Los workers también ejecutan el scheduler que reencola los reintentos "
+        "con backoff. Si atienden la cola maintenance, programa la limpieza periódica del staging de subidas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', nargs='+', default=list(QUEUE_PRIORITY),
+                            help="Colas a atender, de mayor a menor prioridad")
+        parser.add_argument('--workers', type=int, default=config('RQ_WORKERS', default=os.cpu_count() or 1, cast=int),
+                            help="Número de procesos worker (por defecto RQ_WORKERS o el número de CPUs)")
+        parser.add_argument('--simple', action='store_true',
+                            help="Ejecuta cada job en el propio proceso worker (sin fork por job)")
+        parser.add_argument('--burst', action='store_true',
+                            help="Termina cuando las colas queden vacías")
+        parser.add_argument('--logging-level', default='INFO')
+
+    def handle(self, *args, **options):
+        queue_names = options['queues']
+        if options['workers'] < 1:
+            raise CommandError("--workers debe ser al menos 1")
+
+        try:
+            queues = [django_rq.get_queue(name) for name in queue_names]
+        except KeyError as e:
+            raise CommandError(f"Cola no configurada en RQ_QUEUES: {e}")
+
+        if MAINTENANCE_QUEUE in queue_names:
+            schedule_spool_cleanup()
+
+        # Los workers son procesos hijos: no deben heredar conexiones abiertas a la base de datos
+        connections.close_all()
+
+        pool = WorkerPool(
+            queues,
+            connection=queues[0].connection,
+            num_workers=options['workers'],
+            worker_class=MetricsSimpleWorker if options['simple'] else MetricsWorker,
+        )
+        logger.info(f"Iniciando {options['workers']} workers para las colas {queue_names}")
+        pool.start(burst=options['burst'], logging_level=options['logging_level'])
@@ -0,0 +1,38 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) ordenada por (-created, id).
+
+    Es opcional por petición: solo pagina si el cliente envía `cursor` o `page_size`,
+    así los clientes que esperan la lista completa siguen funcionando.
+    Al paginar:
+    - el tamaño de página nunca supera `max_page_size`;
+    - el cursor es opaco (base64) y la consulta es `WHERE created < ...` sobre el índice,
+      sin OFFSET, por lo que el costo no crece con el número de página;
+    - se aplica sobre el queryset ya filtrado por rol, y el cache de listados guarda cada
+      página por separado (el cursor forma parte de los query params de la clave).
+
+    Los modelos sin `created` (ej: User) se ordenan por -id.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created', 'id')
+    fallback_ordering = ('-id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_requested(self, request) -> bool:
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_ordering(self, request, queryset, view):
+        model = getattr(queryset, 'model', None)
+        if model is not None and not any(field.name == 'created' for field in model._meta.get_fields()):
+            return self.fallback_ordering
+        return super().get_ordering(request, queryset, view)
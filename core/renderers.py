@@ -0,0 +1,37 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.utils.instrumentation import timed
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF codificado con orjson.
+
+    Mantiene la salida de DRF: los tipos que orjson no maneja igual (fechas sin serializar, Decimal,
+    cadenas lazy de traducción, querysets...) pasan por el JSONEncoder de DRF, y se escapan
+    U+2028/U+2029. Si se pide indentación (ej: `Accept: application/json; indent=4`) se usa el
+    renderer original.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return self.encode(data)
+
+    @classmethod
+    def encode(cls, data) -> bytes:
+        with timed('serialize_time'):
+            ret = orjson.dumps(data, default=cls._encoder.default, option=cls.options)
+        # Igual que DRF: estos separadores son JSON válido pero no JavaScript válido
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
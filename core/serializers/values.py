@@ -0,0 +1,226 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, SlugRelatedField
+
+_VALUE, _NESTED, _MANY = 'value', 'nested', 'many'
+_OWNER = '_values_owner'
+_RELATED = '_values_related'
+
+
+class ValuesSerializer:
+    """
+    Ruta de solo lectura para listados grandes: produce el mismo JSON que un ModelSerializer
+    a partir de filas `.values()`, sin construir instancias de modelo ni recorrer los campos
+    de DRF por cada fila.
+
+    El serializer se "compila" una sola vez (ver `get_values_serializer`):
+    - los campos simples se leen de su columna y se convierten con el `to_representation`
+      del campo de DRF (fechas, decimales... quedan idénticos);
+    - los serializers anidados de FK / OneToOne se reconstruyen con las columnas unidas
+      (`contact__name`, `project__work_cell__udn__name`...);
+    - las relaciones many (`documents`, `clients`, `roles`...) se resuelven con una consulta
+      `.values()` por relación para todas las filas de la página.
+
+    Solo admite campos que salen de columnas de la base de datos. Los SerializerMethodField,
+    propiedades o `source='*'` lanzan ImproperlyConfigured al compilar; esos serializers
+    deben seguir usando la ruta normal.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.many_nodes = []
+        self.entries = self._compile(serializer, self.model, '')
+
+        # Columnas que la paginación por cursor lee de cada fila
+        self._add_column(self.model._meta.pk.attname)
+        if any(field.name == 'created' for field in self.model._meta.concrete_fields):
+            self._add_column('created')
+
+    # --- Compilación ---
+
+    def _add_column(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+        return column
+
+    def _compile(self, serializer, model, prefix):
+        entries = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: source='*' no soportado")
+
+            if isinstance(field, serializers.ListSerializer):
+                entries.append((_MANY, name, self._many_node(model, prefix, field.source, field.child)))
+            elif isinstance(field, ManyRelatedField):
+                entries.append((_MANY, name, self._many_node(model, prefix, field.source, field.child_relation)))
+            elif isinstance(field, serializers.BaseSerializer):
+                relation = self._get_field(model, field.source, serializer, name)
+                if not relation.is_relation:
+                    raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: no es una relación")
+                path = f"{prefix}{field.source}__"
+                null_column = self._add_column(f"{path}{relation.related_model._meta.pk.attname}")
+                entries.append((_NESTED, name, (null_column, self._compile(field, relation.related_model, path))))
+            elif isinstance(field, serializers.SerializerMethodField) or isinstance(field, serializers.HiddenField):
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: campo calculado no soportado")
+            else:
+                entries.append((_VALUE, name, self._value_spec(model, prefix, field, serializer, name)))
+        return entries
+
+    def _get_field(self, model, name, serializer, field_name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{serializer.__class__.__name__}.{field_name}: '{name}' no es un campo de {model.__name__}"
+            )
+
+    def _value_spec(self, model, prefix, field, serializer, name):
+        """
+        Columna de un campo simple. Si el `source` cruza relaciones (ej: 'work_cell.udn.name')
+        se leen también las llaves intermedias para imitar a DRF cuando alguna es nula.
+        """
+        attrs = field.source.split('.')
+        checks = []
+        current, path = model, prefix
+        for attr in attrs[:-1]:
+            relation = self._get_field(current, attr, serializer, name)
+            if not relation.is_relation:
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: '{attr}' no es una relación")
+            path = f"{path}{attr}__"
+            current = relation.related_model
+            # OneToOne inverso inexistente → DRF devuelve None; FK nula → AttributeError
+            reverse_one_to_one = relation.one_to_one and not relation.concrete
+            checks.append((self._add_column(f"{path}{current._meta.pk.attname}"), reverse_one_to_one))
+
+        model_field = self._get_field(current, attrs[-1], serializer, name)
+        if model_field.many_to_many or model_field.one_to_many:
+            raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: relación many sin serializer")
+
+        column = self._add_column(f"{path}{attrs[-1]}")
+        if isinstance(field, PrimaryKeyRelatedField):
+            to_representation = _identity
+        elif isinstance(field, serializers.RelatedField):
+            raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name}: campo relacionado no soportado")
+        else:
+            to_representation = field.to_representation
+        return column, to_representation, checks, field
+
+    def _many_node(self, model, prefix, source, child):
+        relation = model._meta.get_field(source)
+        if relation.many_to_many and relation.concrete:
+            query_name = relation.related_query_name()
+        elif relation.one_to_many or relation.many_to_many:
+            query_name = relation.field.name
+        else:
+            raise ImproperlyConfigured(f"{model.__name__}.{source}: no es una relación many")
+
+        owner_column = self._add_column(f"{prefix}{model._meta.pk.attname}")
+        node = _ManyNode(relation.related_model, query_name, owner_column, child)
+        self.many_nodes.append(node)
+        return node
+
+    # --- Ejecución ---
+
+    def values(self, queryset):
+        """Queryset de filas planas con todas las columnas necesarias (sin prefetch ni instancias)."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = {
+            id(node): node.fetch({row[node.owner_column] for row in rows} - {None})
+            for node in self.many_nodes
+        }
+        return [_build(self.entries, row, related) for row in rows]
+
+
+class _ManyNode:
+    """Relación many de un serializer compilado: una consulta para todos los dueños."""
+
+    def __init__(self, related_model, query_name, owner_column, child):
+        self.related_model = related_model
+        self.query_name = query_name
+        self.owner_column = owner_column
+        if isinstance(child, serializers.BaseSerializer):
+            self.child = get_values_serializer(child.__class__)
+            self.value_field = None
+        elif isinstance(child, SlugRelatedField):
+            self.child = None
+            self.value_field = child.slug_field
+        elif isinstance(child, PrimaryKeyRelatedField):
+            self.child = None
+            self.value_field = related_model._meta.pk.attname
+        else:
+            raise ImproperlyConfigured(f"{child.__class__.__name__}: relación many no soportada")
+
+    def fetch(self, owner_ids) -> dict:
+        if not owner_ids:
+            return {}
+
+        # Mismo manager que usan los related managers de Django (excluye eliminados lógicos)
+        queryset = self.related_model._default_manager.filter(**{f"{self.query_name}__in": owner_ids})
+        if not self.related_model._meta.ordering:
+            queryset = queryset.order_by(self.related_model._meta.pk.attname)
+
+        grouped = {}
+        if self.child is None:
+            rows = queryset.values(**{_OWNER: F(self.query_name), _RELATED: F(self.value_field)})
+            for row in rows:
+                grouped.setdefault(row[_OWNER], []).append(row[_RELATED])
+            return grouped
+
+        rows = list(queryset.values(*self.child.columns, **{_OWNER: F(self.query_name)}))
+        for row, data in zip(rows, self.child.serialize(rows)):
+            grouped.setdefault(row[_OWNER], []).append(data)
+        return grouped
+
+
+def _identity(value):
+    return value
+
+
+def _build(entries, row, related):
+    ret = {}
+    for kind, name, spec in entries:
+        if kind == _VALUE:
+            column, to_representation, checks, field = spec
+            try:
+                value = _resolve(row, column, checks, field)
+            except SkipField:
+                continue
+            ret[name] = None if value is None else to_representation(value)
+        elif kind == _NESTED:
+            null_column, sub_entries = spec
+            ret[name] = None if row[null_column] is None else _build(sub_entries, row, related)
+        else:
+            ret[name] = related[id(spec)].get(row[spec.owner_column], [])
+    return ret
+
+
+def _resolve(row, column, checks, field):
+    """Replica `Field.get_attribute` de DRF cuando una relación intermedia no existe."""
+    for check_column, reverse_one_to_one in checks:
+        if row[check_column] is not None:
+            continue
+        if reverse_one_to_one:
+            return None
+        if field.default is not empty:
+            return field.get_default()
+        if field.allow_null:
+            return None
+        raise SkipField()
+    return row[column]
+
+
+@lru_cache(maxsize=None)
+def get_values_serializer(serializer_class) -> ValuesSerializer:
+    """Compila (una vez por clase) la ruta `.values()` de un ModelSerializer de lectura."""
+    return ValuesSerializer(serializer_class)
@@ -35,10 +35,11 @@ INSTALLED_APPS = [
     'purchase',
     'activity_log',
     'users',
+    'core',
 ]
 
 MIDDLEWARE = [
-    'middleware.sql_debug.SQLDebugMiddleware', # Middleware para depuración de SQL
+    'middleware.instrumentation.PerformanceMiddleware', # Métricas por request (Server-Timing + log)
     'simple_history.middleware.HistoryRequestMiddleware', # Middleware para historial de cambios
     'corsheaders.middleware.CorsMiddleware', # Middleware de CORS
     'django.middleware.security.SecurityMiddleware', # Seguridad de Django
@@ -51,13 +52,29 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Autenticación sin consultas: el usuario se arma con los claims del access token
+# (ver users.authentication.StatelessJWTAuthentication)
+JWT_STATELESS_AUTH = config("JWT_STATELESS_AUTH", default=False, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication' if JWT_STATELESS_AUTH
+        else 'users.authentication.AccessProfileJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissions',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Paginación por cursor opcional: solo aplica si la petición envía ?cursor= o ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.OptionalCursorPagination',
 }
 
 SIMPLE_JWT = {
@@ -66,6 +83,9 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Los tokens llevan el perfil de acceso en sus claims (también los de djoser en auth/jwt/)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.MyTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.AccessClaimsTokenRefreshSerializer',
 }
 
 DJOSER = {
@@ -193,7 +213,9 @@ try:
             "BACKEND": "django_redis.cache.RedisCache",
             "LOCATION": REDIS_URL,
             "OPTIONS": {
-                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # Cuentan aciertos/fallos y tiempo de Redis por request (core.utils.instrumentation)
+                "CLIENT_CLASS": "core.utils.instrumentation.InstrumentedRedisClient",
+                "CONNECTION_POOL_CLASS": "core.utils.instrumentation.InstrumentedConnectionPool",
                 "SERIALIZER": "django_redis.serializers.json.JSONSerializer",
             }
         }
@@ -207,11 +229,24 @@ except Exception:
     }
     print("⚠️ Redis no disponible, cache deshabilitado. Todas las consultas irán a la base de datos.")
 
+# Prioridad y políticas de reintento en core.utils.jobs
 RQ_QUEUES = {
+    'uploads': {
+        'URL': REDIS_URL,
+        'DEFAULT_TIMEOUT': 1800,  # Archivos grandes por sesión de carga
+    },
     'default': {
         'URL': REDIS_URL,
         'DEFAULT_TIMEOUT': 360,
-    }
+    },
+    'deletes': {
+        'URL': REDIS_URL,
+        'DEFAULT_TIMEOUT': 360,
+    },
+    'maintenance': {
+        'URL': REDIS_URL,
+        'DEFAULT_TIMEOUT': 3600,
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -275,6 +310,29 @@ else:
 # Crear carpeta de logs si no existe
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+# Staging de archivos subidos que los jobs de RQ suben a SharePoint (ver core.utils.spool).
+# Si los workers corren en otra máquina debe ser un directorio compartido.
+UPLOAD_SPOOL_DIR = Path(config("UPLOAD_SPOOL_DIR", default=str(BASE_DIR / "spool")))
+UPLOAD_SPOOL_TTL = config("UPLOAD_SPOOL_TTL", default=60 * 60 * 24, cast=int)  # 24 horas
+# Cada cuánto se eliminan del staging los archivos vencidos (core.tasks.cleanup_upload_spool)
+UPLOAD_SPOOL_CLEANUP_INTERVAL = config("UPLOAD_SPOOL_CLEANUP_INTERVAL", default=60 * 60, cast=int)  # 1 hora
+
+# Cache local de fotos/imágenes servidas desde SharePoint (ver core.utils.blob_cache)
+SHAREPOINT_BLOB_CACHE_DIR = Path(config("SHAREPOINT_BLOB_CACHE_DIR", default=str(BASE_DIR / "blob_cache")))
+SHAREPOINT_BLOB_CACHE_MAX_BYTES = config("SHAREPOINT_BLOB_CACHE_MAX_BYTES", default=256 * 1024 * 1024, cast=int)
+# Archivos más grandes no se guardan en el cache: se reenvían en streaming desde SharePoint
+SHAREPOINT_BLOB_CACHE_MAX_FILE_BYTES = config("SHAREPOINT_BLOB_CACHE_MAX_FILE_BYTES", default=10 * 1024 * 1024, cast=int)
+# Segundos en que una entrada se sirve sin consultar a Graph; después se revalida con If-None-Match
+SHAREPOINT_BLOB_CACHE_FRESHNESS = config("SHAREPOINT_BLOB_CACHE_FRESHNESS", default=300, cast=int)
+
+# Métricas por request (middleware.instrumentation)
+PERF_INSTRUMENTATION = config("PERF_INSTRUMENTATION", default=True, cast=bool)
+# Server-Timing revela tiempos internos: por defecto solo con DEBUG o para usuarios staff
+PERF_SERVER_TIMING = config("PERF_SERVER_TIMING", default=False, cast=bool)
+PERF_SLOW_REQUEST_MS = config("PERF_SLOW_REQUEST_MS", default=1000, cast=int)
+# Token del endpoint endpoint/metrics (Authorization: Bearer <token>); vacío = endpoint deshabilitado
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -318,6 +376,16 @@ LOGGING = {
             'level': 'ERROR',
         },
 
+        # Handler para performance.log (una línea JSON por request, ver middleware.instrumentation)
+        'performance_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': str(LOG_DIR / 'performance.log'),
+            'maxBytes': 10 * 1024 * 1024,  # 10 MB
+            'backupCount': 5,
+            'formatter': 'detailed_with_env',
+            'level': 'INFO',
+        },
+
         # Handler para django_extensions (como ya lo tenías)
         'extensions_file': {
             'class': 'logging.handlers.RotatingFileHandler',
@@ -363,6 +431,13 @@ LOGGING = {
             'propagate': False,
         },
 
+        # Métricas por request
+        'middleware.instrumentation': {
+            'handlers': ['performance_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+
         # Django extensions - archivo específico
         'django_extensions': {
             'handlers': ['extensions_file'],
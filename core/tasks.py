@@ -0,0 +1,51 @@
+import logging
+import uuid
+from datetime import timedelta
+
+import django_rq
+from django.conf import settings
+from django_rq import job
+from rq import get_current_job
+
+from core.utils.jobs import MAINTENANCE_QUEUE
+from core.utils.spool import cleanup_spool
+
+logger = logging.getLogger(__name__)
+
+# Id del job de limpieza del staging ya programado (evita encolarlo dos veces)
+SPOOL_CLEANUP_SCHEDULED_KEY = "upload_spool:cleanup_job"
+
+
+@job(MAINTENANCE_QUEUE)
+def cleanup_upload_spool():
+    """
+    Elimina del staging de subidas los archivos vencidos (`core.utils.spool.cleanup_spool`)
+    y vuelve a programarse dentro de UPLOAD_SPOOL_CLEANUP_INTERVAL, aunque falle.
+    """
+    connection = django_rq.get_queue(MAINTENANCE_QUEUE).connection
+    current = get_current_job()
+    if current is not None and connection.get(SPOOL_CLEANUP_SCHEDULED_KEY) == current.id.encode():
+        connection.delete(SPOOL_CLEANUP_SCHEDULED_KEY)
+    try:
+        cleanup_spool()
+    finally:
+        schedule_spool_cleanup(settings.UPLOAD_SPOOL_CLEANUP_INTERVAL)
+
+
+def schedule_spool_cleanup(delay: int = 0) -> bool:
+    """
+    Programa `cleanup_upload_spool` en la cola maintenance dentro de `delay` segundos, salvo que ya
+    haya una ejecución programada. `run_workers` la llama al arrancar. La marca guarda el id del job
+    programado y vence poco después de su hora, así que un job perdido (ej: se vació Redis) no bloquea
+    las siguientes; si por eso se ejecutan dos, solo el dueño de la marca se vuelve a programar.
+
+    Returns:
+        True si se programó, False si ya había una programada
+    """
+    queue = django_rq.get_queue(MAINTENANCE_QUEUE)
+    job_id = uuid.uuid4().hex
+    if not queue.connection.set(SPOOL_CLEANUP_SCHEDULED_KEY, job_id, nx=True, ex=delay + 300):
+        return False
+    queue.enqueue_in(timedelta(seconds=delay), cleanup_upload_spool, job_id=job_id)
+    logger.info(f"Limpieza del staging de subidas programada en {delay} s")
+    return True
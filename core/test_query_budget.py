@@ -0,0 +1,109 @@
+"""
+Presupuesto de consultas por endpoint.
+
+Recorre el URLconf y mide cada ruta GET de los routers de DRF (list, retrieve y las acciones
+sin parámetros extra) con 1 y con `ROWS` filas sembradas (core.utils.seed). Falla si:
+- el número de consultas crece con las filas (N+1: falta un select_related / prefetch_related);
+- supera su presupuesto (`QUERY_BUDGETS` o `DEFAULT_QUERY_BUDGET`).
+
+Un ViewSet nuevo queda cubierto al registrarlo en su router.
+"""
+import re
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+
+from catalog.models import WorkCell
+from core.utils.seed import seed_dataset
+from core.utils.testing import LOCMEM_CACHES
+
+ROWS = 200
+DEFAULT_QUERY_BUDGET = 5
+QUERY_BUDGETS = {}
+# Rutas GET que no se miden: dependen de SharePoint
+SKIPPED_ROUTES = {'users-proxy-sharepoint-image', 'opportunity-documents-download'}
+
+
+def router_routes():
+    """(nombre de la ruta, ViewSet, requiere pk) de cada ruta GET registrada en los routers."""
+    seen = set()
+    for pattern in _walk(get_resolver().url_patterns):
+        actions = getattr(pattern.callback, 'actions', None) or {}
+        if 'get' not in actions or pattern.name in seen or pattern.name in SKIPPED_ROUTES:
+            continue
+        seen.add(pattern.name)
+
+        kwargs = set(pattern.pattern.regex.groupindex) - {'format'}
+        if kwargs <= {'pk'}:
+            yield pattern.name, pattern.callback.cls, bool(kwargs)
+
+
+def _walk(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@ferbaq.com', 'x')
+        cls.seed(1)
+
+    @classmethod
+    def seed(cls, rows):
+        seed_dataset(rows, catalog_rows=rows)
+        # Con células asignadas, las rutas filtradas por las células del usuario también devuelven filas
+        cls.admin.workcell.add(*WorkCell.all_objects.exclude(users=cls.admin))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_query_count_does_not_grow_with_rows(self):
+        routes = list(router_routes())
+        self.assertTrue(routes)
+
+        small = {name: self.measure(name, viewset, detail) for name, viewset, detail in routes}
+        self.seed(ROWS - 1)
+        large = {name: self.measure(name, viewset, detail) for name, viewset, detail in routes}
+
+        for name, _, _ in routes:
+            with self.subTest(route=name):
+                queries, sql = large[name]
+                self.assertEqual(queries, small[name][0], f"{name}: consultas por fila (N+1)\n{_repeated(sql)}")
+                budget = QUERY_BUDGETS.get(name, DEFAULT_QUERY_BUDGET)
+                self.assertLessEqual(queries, budget, f"{name}: fuera de presupuesto\n" + "\n".join(sql))
+
+    def measure(self, name, viewset, detail):
+        url = reverse(name, kwargs={'pk': self.latest_pk(viewset)}) if detail else reverse(name)
+        # Instancia nueva en cada request: el usuario memoiza su perfil de acceso y sus permisos
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        cache.clear()  # el listado cacheado respondería sin consultar
+        reset_queries()  # CaptureQueriesContext cuenta sobre un log limitado a 9000 consultas
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f"GET {url}")
+        if not detail:
+            self.assertTrue(response.json(), f"GET {url} sin filas: no mediría las consultas por fila")
+        return len(captured), [query['sql'] for query in captured.captured_queries]
+
+    @staticmethod
+    def latest_pk(viewset):
+        model = getattr(viewset, 'model', None) or viewset.queryset.model
+        return model._base_manager.order_by('-pk').values_list('pk', flat=True).first()
+
+
+def _repeated(sql, limit: int = 3) -> str:
+    """Las consultas que más se repiten, con los valores literales normalizados (ej: "200x SELECT ... id = ?")."""
+    shapes = Counter(re.sub(r"\b\d+\b", "?", query) for query in sql)
+    return "\n".join(f"{count}x {query}" for query, count in shapes.most_common(limit) if count > 1)
@@ -0,0 +1,204 @@
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from catalog.models import (
+    UDN, WorkCell, Division, Subdivision, ProjectStatus, Specialty, Job, City, BusinessGroup,
+    StatusOpportunity, Currency, OpportunityType, LostOpportunityType, PurchaseStatusType,
+)
+from client.models import Client
+from client.serializers import ClientSerializer
+from contact.models import Contact
+from contact.serializers import ContactSerializer
+from core.serializers.values import get_values_serializer
+from core.utils.blob_cache import BlobCache
+from core.utils.metrics import reset_metrics
+from core.utils.testing import LOCMEM_CACHES
+from opportunity.models import Opportunity, FinanceOpportunity, OpportunityDocument
+from opportunity.serializers import OpportunitySerializer
+from project.models import Project
+from project.serializers import ProjectSerializer, ProjectSimplifySerializer
+from purchase.models import PurchaseStatus
+from purchase.serializers import PurchaseOpportunitySerializer
+from users.serializers import UserSerializer
+
+
+class ValuesSerializerSnapshotTests(TestCase):
+    """
+    La ruta `.values()` debe producir exactamente el mismo JSON (incluido el orden de las llaves)
+    que el serializer de DRF sobre las mismas filas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create_user('agente', 'agente@ferbaq.com', 'x', first_name='Ana')
+        udn = UDN.objects.create(name='UDN 1')
+        work_cell = WorkCell.objects.create(name='Célula 1', udn=udn)
+        division = Division.objects.create(name='División')
+        subdivision = Subdivision.objects.create(name='Subdivisión', division=division)
+        status = ProjectStatus.objects.create(name='Activo')
+        specialty = Specialty.objects.create(name='Eléctrica')
+
+        cls.project = Project.objects.create(
+            name='Proyecto con especialidad', project_status=status, subdivision=subdivision,
+            work_cell=work_cell, specialty=specialty, latitude=19.4326, longitude=-99.1332,
+        )
+        # Sin especialidad: ProjectSimplifySerializer omite `specialty_name`
+        cls.project_without_specialty = Project.objects.create(
+            name='Proyecto sin especialidad', project_status=status, subdivision=subdivision, work_cell=work_cell,
+        )
+        removed_project = Project.objects.create(
+            name='Proyecto eliminado', project_status=status, subdivision=subdivision, work_cell=work_cell,
+        )
+        removed_project.delete()
+
+        business_group = BusinessGroup.objects.create(name='Grupo')
+        city = City.objects.create(name='CDMX')
+        client = Client.objects.create(rfc='AAA010101AAA', company='Cliente 1', id_client=1,
+                                       classification='A', business_group=business_group, city=city)
+        client.projects.add(cls.project, cls.project_without_specialty, removed_project)
+        client_without_city = Client.objects.create(rfc='BBB010101BBB', company='Cliente 2', id_client=2,
+                                                    classification='B', business_group=business_group)
+
+        job = Job.objects.create(name='Compras')
+        contact = Contact.objects.create(name='Contacto 1', email='c1@ferbaq.com', job=job)
+        contact.clients.add(client, client_without_city)
+        Contact.objects.create(name='Contacto sin clientes')
+
+        status_ids = [StatusOpportunity.objects.create(name=name).id for name in ('A', 'B', 'C', 'D', 'E')]
+        currency = Currency.objects.create(name='MXN')
+        opportunity_type = OpportunityType.objects.create(name='Licitación')
+        lost = LostOpportunityType.objects.create(name='Precio')
+        pending = PurchaseStatusType.objects.create(name='Pendiente')
+
+        base = dict(contact=contact, agent=cls.agent, opportunityType=opportunity_type)
+        complete = Opportunity.objects.create(
+            name='Completa', amount=Decimal('300000.50'), closing_percentage=Decimal('90'),
+            status_opportunity_id=status_ids[3], currency=currency, project=cls.project, client=client, **base,
+        )
+        FinanceOpportunity.objects.create(
+            opportunity=complete, earned_amount=Decimal('10.00'), cost_subtotal=Decimal('5.00'),
+            order_closing_date=complete.created,
+        )
+        OpportunityDocument.objects.create(opportunity=complete, file_name='a.pdf', sharepoint_url='https://x/a.pdf')
+        OpportunityDocument.objects.create(opportunity=complete, file_name='b.pdf', sharepoint_url='https://x/b.pdf')
+        PurchaseStatus.objects.get_or_create(opportunity=complete, defaults={'purchase_status_type': pending})
+
+        # Sin moneda, cliente, finanzas, documentos ni estado de compra
+        Opportunity.objects.create(
+            name='Mínima', status_opportunity_id=status_ids[0], project=cls.project_without_specialty,
+            lost_opportunity=lost, **base,
+        )
+
+    def assertSameJson(self, serializer_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+        values_serializer = get_values_serializer(serializer_class)
+        actual = values_serializer.serialize(values_serializer.values(queryset))
+        self.assertEqual(JSONRenderer().render(actual).decode(), JSONRenderer().render(expected).decode())
+
+    def test_opportunity(self):
+        self.assertSameJson(OpportunitySerializer, Opportunity.objects.order_by('id'))
+
+    def test_purchase(self):
+        self.assertSameJson(PurchaseOpportunitySerializer, Opportunity.objects.order_by('id'))
+
+    def test_contact(self):
+        self.assertSameJson(ContactSerializer, Contact.objects.order_by('id'))
+
+    def test_client(self):
+        self.assertSameJson(ClientSerializer, Client.objects.order_by('id'))
+
+    def test_project(self):
+        self.assertSameJson(ProjectSerializer, Project.all_objects.order_by('id'))
+        self.assertSameJson(ProjectSimplifySerializer, Project.all_objects.order_by('id'))
+
+    def test_unsupported_serializer(self):
+        # SerializerMethodField no se puede calcular desde columnas
+        from django.core.exceptions import ImproperlyConfigured
+        with self.assertRaises(ImproperlyConfigured):
+            get_values_serializer(UserSerializer)
+
+
+class BlobCacheTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.blob_cache = BlobCache(directory, max_bytes=100)
+
+    def test_entry_never_evicts_itself(self):
+        self.blob_cache.put('vieja', '"1"', 'image/png', [b'x' * 50])
+        entry = self.blob_cache.put('nueva', '"2"', 'image/png', [b'x' * 95])
+        self.assertTrue(entry.path.exists())
+        self.assertIsNone(self.blob_cache.get('vieja'))
+
+    def test_fits(self):
+        self.assertTrue(self.blob_cache.fits(90))
+        self.assertFalse(self.blob_cache.fits(91))
+        self.assertFalse(self.blob_cache.fits(None))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_and_log(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', 'admin@ferbaq.com', 'x'))
+
+        with self.assertLogs('middleware.instrumentation', 'INFO') as logs:
+            response = client.get('/endpoint/opportunities/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['endpoint'], 'endpoint/opportunities/')
+        self.assertEqual((record['view'], record['action']), ('OpportunityViewSet', 'list'))
+        self.assertGreater(record['db_queries'], 0)
+
+    def test_server_timing_hidden_from_non_staff(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('agente', 'agente@ferbaq.com', 'x'))
+        response = client.get('/endpoint/opportunities/')
+        self.assertNotIn('Server-Timing', response)
+
+
+@override_settings(METRICS_TOKEN='secreto', CACHES=LOCMEM_CACHES)
+class MetricsEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/endpoint/metrics').status_code, 401)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/endpoint/metrics').status_code, 404)
+
+    def test_request_metrics(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', 'admin@ferbaq.com', 'x'))
+        client.get('/endpoint/opportunities/')
+        client.get('/endpoint/opportunities/')
+
+        response = self.client.get('/endpoint/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(
+            'crm_http_request_duration_seconds_count{route="endpoint/opportunities/",method="GET"} 2', body
+        )
+        self.assertIn('crm_http_responses_total{route="endpoint/opportunities/",method="GET",status="200"} 2', body)
+        self.assertIn('crm_db_queries_total{route="endpoint/opportunities/"}', body)
+        self.assertIn('# TYPE crm_rq_queue_depth gauge', body)
@@ -9,6 +9,7 @@ def health(_):
 
 urlpatterns = [
     path('endpoint/health', health),
+    path('endpoint/metrics', views.metrics),
     path('endpoint/admin/', admin.site.urls),
 
     path("endpoint/test-error/", views.test_error),
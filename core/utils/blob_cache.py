@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from django.http import FileResponse, HttpResponseNotModified
+
+logger = logging.getLogger(__name__)
+
+# Los eTags de Graph llevan comas ("{GUID},3"), así que no se puede separar la lista por comas
+_QUOTED_ETAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+@dataclass
+class BlobEntry:
+    path: Optional[Path]  # None: solo metadatos, el contenido no se guardó en disco
+    etag: str
+    content_type: str
+    size: int
+    validated_at: float
+
+
+class BlobCache:
+    """
+    Cache de archivos en disco local con tope de tamaño (LRU).
+
+    Cada llave (ej: la ruta del archivo en la biblioteca de SharePoint) tiene un archivo de metadatos
+    `<hash>.json` (eTag, content type, tamaño, última validación) y el contenido en `<hash>.<etag>.bin`.
+    Las escrituras son atómicas (archivo temporal + os.replace), así que varios workers de gunicorn
+    pueden compartir el directorio. La fecha de modificación del .json registra el último uso;
+    al superar `max_bytes` se eliminan las entradas usadas hace más tiempo. Los archivos de más de
+    `max_entry_bytes` no se guardan (`fits`): desalojarían el resto del cache.
+    """
+
+    def __init__(self, directory, max_bytes: int, max_entry_bytes: int = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Nunca más que el margen que deja el desalojo: la entrada se desalojaría a sí misma
+        self.max_entry_bytes = min(max_entry_bytes or max_bytes, int(max_bytes * 0.9))
+
+    def fits(self, size) -> bool:
+        """Si un archivo de `size` bytes puede guardarse (tamaño desconocido → no)."""
+        return size is not None and size <= self.max_entry_bytes
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str):
+        """Entrada guardada para `key` (marcándola como usada) o None."""
+        meta_path = self._meta_path(key)
+        try:
+            meta = json.loads(meta_path.read_bytes())
+            entry = BlobEntry(path=self.directory / meta["blob"], etag=meta["etag"],
+                              content_type=meta["content_type"], size=meta["size"],
+                              validated_at=meta["validated_at"])
+            if not entry.path.exists():
+                return None
+            os.utime(meta_path)
+            return entry
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, etag: str, content_type: str, chunks) -> BlobEntry:
+        """Guarda el contenido (iterable de bytes) y devuelve la entrada."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path = self._meta_path(key)
+        blob_name = f"{meta_path.stem}.{hashlib.sha1(etag.encode()).hexdigest()[:12]}.bin"
+
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    tmp.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_name, self.directory / blob_name)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        previous = self.get(key)
+        entry = BlobEntry(path=self.directory / blob_name, etag=etag, content_type=content_type,
+                          size=size, validated_at=time.time())
+        self._write_meta(meta_path, entry)
+        if previous is not None and previous.path != entry.path:
+            previous.path.unlink(missing_ok=True)
+
+        self._evict(keep=meta_path)
+        return entry
+
+    def mark_validated(self, key: str, entry: BlobEntry) -> None:
+        """El origen confirmó que la entrada sigue vigente (ej: respondió 304)."""
+        entry.validated_at = time.time()
+        self._write_meta(self._meta_path(key), entry)
+
+    def delete(self, key: str) -> None:
+        entry = self.get(key)
+        self._meta_path(key).unlink(missing_ok=True)
+        if entry is not None:
+            entry.path.unlink(missing_ok=True)
+
+    def _write_meta(self, meta_path: Path, entry: BlobEntry) -> None:
+        data = json.dumps({
+            "blob": entry.path.name, "etag": entry.etag, "content_type": entry.content_type,
+            "size": entry.size, "validated_at": entry.validated_at,
+        }).encode()
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, meta_path)
+
+    def _evict(self, keep: Path = None) -> None:
+        """Desaloja las entradas usadas hace más tiempo; `keep` (la recién escrita) nunca se desaloja."""
+        entries = []
+        total = 0
+        for meta_path in self.directory.glob("*.json"):
+            try:
+                meta = json.loads(meta_path.read_bytes())
+                entries.append((meta_path.stat().st_mtime, meta_path, meta["blob"], meta["size"]))
+                total += meta["size"]
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+
+        entries = [entry for entry in entries if entry[1] != keep]
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        removed = 0
+        # Se deja margen (90%) para no desalojar en cada escritura
+        for _, meta_path, blob, size in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            meta_path.unlink(missing_ok=True)
+            (self.directory / blob).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        logger.info(f"Blob cache: {removed} entradas desalojadas ({total} bytes en uso)")
+
+
+def blob_response(request, entry: BlobEntry, cache_control: str):
+    """
+    Respuesta HTTP para una entrada del cache: 304 si el cliente ya tiene esa versión
+    (If-None-Match), si no el archivo desde disco (streaming) con su ETag.
+    """
+    if _etag_matches(request.headers.get("If-None-Match", ""), entry.etag):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(entry.path, "rb"), content_type=entry.content_type)
+    response["ETag"] = entry.etag
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in _QUOTED_ETAG.findall(if_none_match)
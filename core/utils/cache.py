@@ -0,0 +1,131 @@
+import logging
+import time
+
+from django.core.cache import cache
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY_PREFIX = "cache_gen"
+
+
+def model_label(model) -> str:
+    """
+    Etiqueta estable de un modelo para las claves de generación (ej: "opportunity.opportunity").
+    Acepta la clase del modelo o una etiqueta ya construida.
+    """
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def generation_key(label: str) -> str:
+    return f"{GENERATION_KEY_PREFIX}:{label}"
+
+
+def _seed() -> int:
+    """
+    Valor inicial de una generación. Se usa el tiempo en milisegundos para que,
+    si Redis desaloja el contador, la nueva generación nunca coincida con una anterior
+    y no se reutilicen entradas obsoletas.
+    """
+    return int(time.time() * 1000)
+
+
+def _get_redis_connection():
+    """Conexión cruda de redis-py si el backend es django_redis, o None (DummyCache, LocMem...)."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def get_generations(labels) -> dict:
+    """
+    Obtiene la generación actual de cada recurso en un solo round-trip a Redis.
+    Si algún contador no existe se inicializa con `add` (no pisa a otro proceso).
+
+    Returns:
+        Diccionario {label: generación}
+    """
+    keys = {generation_key(model_label(label)): model_label(label) for label in labels}
+    if not keys:
+        return {}
+
+    try:
+        found = cache.get_many(list(keys))
+        for key in keys:
+            if key not in found:
+                seed = _seed()
+                cache.add(key, seed, timeout=None)
+                found[key] = cache.get(key, seed)
+    except RedisConnectionError:
+        logger.warning("Redis no disponible (get_generations)")
+        return {label: 0 for label in keys.values()}
+
+    return {keys[key]: found[key] for key in keys}
+
+
+def bump_generations(labels) -> None:
+    """
+    Invalida todas las entradas cacheadas que dependen de los recursos indicados
+    incrementando su contador de generación. Las claves viejas expiran solas por TTL.
+
+    Con Redis todos los contadores se incrementan en un único pipeline
+    (SET NX con semilla + INCR por clave), es decir, un solo round-trip.
+    """
+    labels = sorted({model_label(label) for label in labels})
+    if not labels:
+        return
+
+    connection = _get_redis_connection()
+    try:
+        if connection is not None:
+            pipe = connection.pipeline(transaction=False)
+            for label in labels:
+                key = cache.make_key(generation_key(label))
+                pipe.set(key, _seed(), nx=True)
+                pipe.incr(key)
+            pipe.execute()
+        else:
+            for label in labels:
+                key = generation_key(label)
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # El contador no existe (o el backend no soporta incr): se reinicia con un valor nuevo
+                    cache.set(key, _seed(), timeout=None)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (bump_generations): {labels}")
+        return
+
+    logger.info(f"Generaciones de cache incrementadas: {labels}")
+
+
+def get_raw(key: str):
+    """
+    Lee bytes guardados con `set_raw`. Con django_redis se va directo a redis-py para
+    no pasar por el serializer del backend (JSON); en otros backends se usa `cache`.
+    Devuelve None si no existe o si Redis no está disponible.
+    """
+    connection = _get_redis_connection()
+    try:
+        if connection is not None:
+            return connection.get(cache.make_key(key))
+        return cache.get(key)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (get_raw): clave '{key}'")
+        return None
+
+
+def set_raw(key: str, payload: bytes, timeout: int) -> None:
+    """Guarda bytes ya codificados (ej: una respuesta JSON renderizada) tal cual, sin serializar."""
+    connection = _get_redis_connection()
+    try:
+        if connection is not None:
+            connection.set(cache.make_key(key), payload, ex=timeout)
+        else:
+            cache.set(key, payload, timeout)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (set_raw): clave '{key}'")
@@ -0,0 +1,176 @@
+import logging
+import threading
+
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from core.utils.cache import bump_generations, model_label
+from core.utils.transaction_collector import transaction_collector
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationRegistry:
+    """
+    Registro central de dependencias de cache.
+
+    Cada recurso cacheado (normalmente el listado de un ViewSet, ver `ListCacheMixin.cache_resource`)
+    declara de qué modelos y relaciones M2M depende. Cuando cambia cualquiera de ellos se incrementa
+    la generación del recurso.
+
+    Las invalidaciones de una transacción se acumulan y se envían una sola vez al confirmar
+    (ver `TransactionCollector`), en un único pipeline de Redis. Así no se invalida antes del commit
+    (otra petición podría volver a cachear datos viejos) ni se hace un round-trip por señal.
+    Nunca se limpia la base de Redis completa.
+    """
+
+    def __init__(self):
+        self._dependencies = {}   # recurso → set de etiquetas de modelo
+        self._dependents = {}     # etiqueta de modelo → set de recursos
+        self._local = threading.local()
+
+    def register(self, resource: str, depends_on=()):
+        """
+        Declara un recurso cacheado. Un recurso siempre depende del modelo con su mismo nombre
+        si existe (ej: "catalog.currency").
+        """
+        resource = model_label(resource)
+        labels = {model_label(label) for label in depends_on} | {resource}
+        self._dependencies.setdefault(resource, set()).update(labels)
+        for label in labels:
+            self._dependents.setdefault(label, set()).add(resource)
+
+    def resources_for(self, label: str) -> set:
+        return self._dependents.get(model_label(label), set())
+
+    def watched_labels(self) -> set:
+        return set(self._dependents)
+
+    # --- Acumulación por transacción ---
+
+    def _pending(self) -> set:
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = set()
+        return pending
+
+    def invalidate_resources(self, resources):
+        """
+        Encola la invalidación de recursos. Fuera de una transacción se ejecuta de inmediato;
+        dentro, se ejecuta al confirmar y después del resto de tareas post-commit, para incluir
+        lo que estas escriban. Si la transacción se revierte, los recursos pendientes se envían
+        con el siguiente commit (sobre-invalidar es inofensivo).
+        """
+        resources = {model_label(resource) for resource in resources}
+        if not resources:
+            return
+        self._pending().update(resources)
+        transaction_collector.add('cache_invalidation', self.flush, last=True)
+
+    def invalidate_models(self, labels):
+        resources = set()
+        for label in labels:
+            resources |= self.resources_for(label)
+        self.invalidate_resources(resources)
+
+    def flush(self):
+        """Envía en un solo lote todas las invalidaciones pendientes del hilo."""
+        pending = self._pending()
+        if not pending:
+            return
+        resources = set(pending)
+        pending.clear()
+        bump_generations(resources)
+
+    # --- Señales ---
+
+    # Campos cuya actualización no afecta a ningún recurso cacheado (ej: login de usuario)
+    ignored_update_fields = frozenset({'last_login'})
+
+    def _on_change(self, sender, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields and set(update_fields) <= self.ignored_update_fields:
+            return
+        self.invalidate_models([sender._meta.label_lower])
+
+    def _on_m2m_change(self, sender, action, **kwargs):
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            self.invalidate_models([sender._meta.label_lower])
+
+    def connect(self):
+        """Conecta las señales de todos los modelos y tablas intermedias registrados."""
+        for label in sorted(self.watched_labels()):
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                # Recurso sin modelo homónimo (ej: "purchase"), no hay nada que escuchar
+                continue
+
+            uid = f"cache_invalidation:{label}"
+            post_save.connect(self._on_change, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self._on_change, sender=model, weak=False, dispatch_uid=uid)
+            # Las tablas intermedias M2M (automáticas o `through`) emiten m2m_changed en add/remove/clear
+            m2m_changed.connect(self._on_m2m_change, sender=model, weak=False, dispatch_uid=uid)
+
+        logger.info(f"Señales de invalidación conectadas para {len(self.watched_labels())} modelos")
+
+
+invalidation_registry = InvalidationRegistry()
+
+
+# Catálogos que aparecen anidados en los listados principales
+PROJECT_CATALOGS = (
+    'catalog.specialty', 'catalog.subdivision', 'catalog.division', 'catalog.projectstatus',
+    'catalog.workcell', 'catalog.udn',
+)
+CLIENT_CATALOGS = ('catalog.city', 'catalog.businessgroup')
+OPPORTUNITY_CATALOGS = (
+    'catalog.statusopportunity', 'catalog.currency', 'catalog.opportunitytype', 'catalog.lostopportunitytype',
+)
+
+# Catálogos simples: su listado solo depende de su propio modelo
+for _label in (
+    'catalog.udn', 'catalog.businessgroup', 'catalog.division', 'catalog.specialty',
+    'catalog.projectstatus', 'catalog.city', 'catalog.period', 'catalog.statusopportunity',
+    'catalog.currency', 'catalog.job', 'catalog.opportunitytype', 'catalog.meetingtype',
+    'catalog.meetingresult', 'catalog.lostopportunitytype', 'catalog.purchasestatustype',
+    'opportunity.commercialactivity', 'opportunity.opportunitydocument',
+):
+    invalidation_registry.register(_label)
+
+invalidation_registry.register('catalog.subdivision', depends_on=['catalog.division'])
+invalidation_registry.register('catalog.workcell', depends_on=['catalog.udn', 'catalog.workcelluser'])
+
+invalidation_registry.register('objetive.objetive', depends_on=['catalog.currency', 'catalog.period', 'auth.user'])
+
+invalidation_registry.register('project.project', depends_on=[*PROJECT_CATALOGS, 'catalog.workcelluser'])
+
+invalidation_registry.register('client.client', depends_on=[
+    'client.client_projects', 'project.project', 'catalog.workcelluser',
+    *CLIENT_CATALOGS, *PROJECT_CATALOGS,
+])
+
+# ContactSerializer anida ClientSerializer, que a su vez anida ProjectSerializer
+invalidation_registry.register('contact.contact', depends_on=[
+    'contact.contact_clients', 'client.client', 'client.client_projects', 'project.project',
+    'catalog.job', 'catalog.workcelluser', *CLIENT_CATALOGS, *PROJECT_CATALOGS,
+])
+
+invalidation_registry.register('opportunity.opportunity', depends_on=[
+    'opportunity.financeopportunity', 'opportunity.opportunitydocument',
+    'contact.contact', 'client.client', 'project.project', 'auth.user',
+    *OPPORTUNITY_CATALOGS, *PROJECT_CATALOGS,
+])
+
+# El listado de compras se construye sobre Opportunity y además muestra el estado de compra
+invalidation_registry.register('purchase', depends_on=[
+    'opportunity.opportunity', 'opportunity.financeopportunity', 'opportunity.opportunitydocument',
+    'purchase.purchasestatus', 'catalog.purchasestatustype',
+    'contact.contact', 'contact.contact_clients', 'client.client', 'catalog.job',
+    'project.project', *CLIENT_CATALOGS, *OPPORTUNITY_CATALOGS, *PROJECT_CATALOGS,
+])
+
+invalidation_registry.register('auth.user', depends_on=[
+    'users.userprofile', 'auth.user_groups', 'auth.user_user_permissions', 'auth.group_permissions',
+    'catalog.workcell', 'catalog.workcelluser',
+])
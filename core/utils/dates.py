@@ -0,0 +1,19 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+
+
+def year_range(year: int = None):
+    """
+    Rango semiabierto [1 de enero del año, 1 de enero del siguiente) en la zona horaria actual.
+
+    Se usa como `created__gte=start, created__lt=end` en lugar de `created__year=...`:
+    la columna se compara directamente y la consulta puede usar los índices que empiezan
+    por la fecha, sin depender de que el backend reescriba la función de año.
+    """
+    if year is None:
+        year = timezone.localdate().year
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(datetime(year, 1, 1), time.min), tz)
+    end = timezone.make_aware(datetime.combine(datetime(year + 1, 1, 1), time.min), tz)
+    return start, end
@@ -0,0 +1,192 @@
+"""
+Métricas de rendimiento por request.
+
+`middleware.instrumentation.PerformanceMiddleware` activa un `RequestMetrics` para cada request
+(en un ContextVar) y lo reporta al terminar. Las fuentes solo suman al objeto activo, así que
+fuera de un request (workers de RQ, comandos) no hacen nada:
+
+- base de datos: `db_execute_wrapper` (`connection.execute_wrapper`, no depende de DEBUG);
+- Redis: `InstrumentedConnectionPool` (tiempo de cada round-trip) e `InstrumentedRedisClient`
+  (aciertos / fallos de `get` y `get_many`), configurados en CACHES;
+- SharePoint: `record_sharepoint_response`, hook de la sesión HTTP de `SharePointManager`;
+- serialización: `timed("serialize_time")` en los listados y en `ORJSONRenderer`.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django_redis.client import DefaultClient
+from redis.connection import Connection, ConnectionPool
+
+_MISSING = object()
+
+
+class RequestMetrics:
+    """Acumuladores de un request. Los tiempos se guardan en segundos."""
+    __slots__ = (
+        'started', 'db_queries', 'db_time', 'cache_hits', 'cache_misses', 'redis_calls', 'redis_time',
+        'sharepoint_calls', 'sharepoint_time', 'serialize_time', 'cache_results',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.redis_calls = 0
+        self.redis_time = 0.0
+        self.sharepoint_calls = 0
+        self.sharepoint_time = 0.0
+        self.serialize_time = 0.0
+        self.cache_results = {}  # {(cache_prefix, "hit" | "miss"): n} para core.utils.metrics
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self, total: float) -> dict:
+        return {
+            'total_ms': _ms(total),
+            'db_queries': self.db_queries,
+            'db_ms': _ms(self.db_time),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'redis_calls': self.redis_calls,
+            'redis_ms': _ms(self.redis_time),
+            'sharepoint_calls': self.sharepoint_calls,
+            'sharepoint_ms': _ms(self.sharepoint_time),
+            'serialize_ms': _ms(self.serialize_time),
+        }
+
+    def server_timing(self, total: float) -> str:
+        """Valor del header Server-Timing (visible en la pestaña Network del navegador)."""
+        entries = [
+            f'db;dur={_ms(self.db_time)};desc="{self.db_queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'redis;dur={_ms(self.redis_time)};desc="{self.redis_calls} calls"',
+        ]
+        if self.sharepoint_calls:
+            entries.append(f'sharepoint;dur={_ms(self.sharepoint_time)};desc="{self.sharepoint_calls} calls"')
+        entries.append(f'serialize;dur={_ms(self.serialize_time)}')
+        entries.append(f'total;dur={_ms(total)}')
+        return ', '.join(entries)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar('request_metrics', default=None)
+
+
+def start_request():
+    """Activa un RequestMetrics nuevo. Devuelve (metrics, token) para `end_request`."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def timed(attribute: str):
+    """Suma la duración del bloque al acumulador `attribute` del request activo (ej: "serialize_time")."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, attribute, getattr(metrics, attribute) + time.perf_counter() - start)
+
+
+def record_cache(hits: int = 0, misses: int = 0, prefix: str = None) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+        if prefix is not None:
+            for result, count in (('hit', hits), ('miss', misses)):
+                if count:
+                    key = (prefix, result)
+                    metrics.cache_results[key] = metrics.cache_results.get(key, 0) + count
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def record_sharepoint_response(response, *args, **kwargs):
+    """Hook `response` de requests: `elapsed` es el tiempo hasta recibir los headers (incluye reintentos)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.sharepoint_calls += 1
+        metrics.sharepoint_time += response.elapsed.total_seconds()
+
+
+class InstrumentedRedisConnection(Connection):
+    """Conexión de redis-py que mide el envío de comandos y la lectura de respuestas."""
+
+    def send_packed_command(self, command, check_health=True):
+        metrics = _current.get()
+        if metrics is None:
+            return super().send_packed_command(command, check_health)
+        start = time.perf_counter()
+        try:
+            return super().send_packed_command(command, check_health)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_time += time.perf_counter() - start
+
+    def read_response(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return super().read_response(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            metrics.redis_time += time.perf_counter() - start
+
+
+class InstrumentedConnectionPool(ConnectionPool):
+    """Pool de django_redis (CONNECTION_POOL_CLASS) con conexiones TCP instrumentadas."""
+
+    def __init__(self, connection_class=Connection, **kwargs):
+        if connection_class is Connection:
+            connection_class = InstrumentedRedisConnection
+        super().__init__(connection_class=connection_class, **kwargs)
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """Cliente de django_redis que cuenta aciertos y fallos del cache."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        if value is _MISSING:
+            record_cache(misses=1)
+            return default
+        record_cache(hits=1)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version, client=client)
+        record_cache(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
@@ -0,0 +1,47 @@
+from rq import Retry
+from rq.utils import now
+from rq.worker import SimpleWorker, Worker
+
+from core.utils.metrics import observe_job
+
+# Colas de RQ (ver RQ_QUEUES en settings). Los workers de `run_workers` las atienden en
+# este orden: una subida pendiente siempre se toma antes que una eliminación o un mantenimiento.
+UPLOADS_QUEUE = "uploads"
+DEFAULT_QUEUE = "default"
+DELETES_QUEUE = "deletes"
+MAINTENANCE_QUEUE = "maintenance"
+
+QUEUE_PRIORITY = (UPLOADS_QUEUE, DEFAULT_QUEUE, DELETES_QUEUE, MAINTENANCE_QUEUE)
+
+
+def backoff_retry(max_retries: int = 5, base: int = 10, cap: int = 600) -> Retry:
+    """
+    Política de reintentos con backoff exponencial (10s, 20s, 40s... hasta `cap`).
+    Agotados los reintentos, el job queda en el FailedJobRegistry de su cola (dead-letter),
+    desde donde se puede revisar o reencolar con `manage.py failed_jobs`.
+    """
+    return Retry(max=max_retries, interval=[min(base * 2 ** attempt, cap) for attempt in range(max_retries)])
+
+
+class JobMetricsMixin:
+    """Registra la duración de cada job por cola y resultado (core.utils.metrics)."""
+
+    def handle_job_success(self, job, queue, started_job_registry):
+        self._observe_job(job, queue, 'finished')
+        return super().handle_job_success(job, queue, started_job_registry)
+
+    def handle_job_failure(self, job, queue, started_job_registry=None, exc_string=''):
+        self._observe_job(job, queue, 'failed')
+        return super().handle_job_failure(job, queue, started_job_registry, exc_string)
+
+    def _observe_job(self, job, queue, status):
+        if job.started_at is not None:
+            observe_job(queue.name, status, (now() - job.started_at).total_seconds())
+
+
+class MetricsWorker(JobMetricsMixin, Worker):
+    pass
+
+
+class MetricsSimpleWorker(JobMetricsMixin, SimpleWorker):
+    pass
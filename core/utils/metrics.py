@@ -0,0 +1,277 @@
+"""
+Métricas agregadas (formato de texto de Prometheus) para la API, el cache, las colas de RQ y Graph.
+
+Los valores se acumulan en hashes de Redis (`metrics:<nombre>`), así que se suman entre los
+workers de gunicorn, los workers de RQ (y sus procesos por job) e incluso entre instancias.
+Cada registro es un solo pipeline (HINCRBYFLOAT); si Redis no está disponible se usa un
+almacén en memoria del proceso, útil solo en desarrollo y pruebas.
+
+Los histogramas guardan el conteo de cada bucket sin acumular (un incremento por observación)
+y se acumulan al exponerlos. Las profundidades de las colas de RQ se leen al exponer (gauges).
+
+Se exponen en `endpoint/metrics` (ver core.views.metrics).
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from redis.exceptions import RedisError
+
+from core.utils.cache import _get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "metrics"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.key = f"{METRICS_KEY_PREFIX}:{name}"
+        registry.append(self)
+
+    def _label_string(self, values: dict) -> str:
+        return ",".join(f'{label}="{_escape(values.get(label, ""))}"' for label in self.labels)
+
+    def samples(self, fields: dict):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, pipe, amount: float = 1, **labels) -> None:
+        pipe.hincrbyfloat(self.key, f"v|{self._label_string(labels)}", amount)
+
+    def samples(self, fields: dict):
+        for field, value in sorted(fields.items()):
+            _, labels = field.split("|", 1)
+            yield self.name, labels, value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, pipe, value: float, **labels) -> None:
+        label_string = self._label_string(labels)
+        bucket = next((str(le) for le in self.buckets if value <= le), "+Inf")
+        pipe.hincrbyfloat(self.key, f"b:{bucket}|{label_string}", 1)
+        pipe.hincrbyfloat(self.key, f"sum|{label_string}", value)
+        pipe.hincrbyfloat(self.key, f"count|{label_string}", 1)
+
+    def samples(self, fields: dict):
+        series = defaultdict(dict)
+        for field, value in fields.items():
+            kind, labels = field.split("|", 1)
+            series[labels][kind] = value
+
+        for labels, values in sorted(series.items()):
+            cumulative = 0.0
+            for le in (*map(str, self.buckets), "+Inf"):
+                cumulative += values.get(f"b:{le}", 0.0)
+                bucket_labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                yield f"{self.name}_bucket", bucket_labels, cumulative
+            yield f"{self.name}_sum", labels, values.get("sum", 0.0)
+            yield f"{self.name}_count", labels, values.get("count", 0.0)
+
+
+registry = []
+
+HTTP_REQUEST_DURATION = Histogram(
+    "crm_http_request_duration_seconds", "Duración de los requests por ruta", ("route", "method"),
+)
+HTTP_RESPONSES = Counter(
+    "crm_http_responses_total", "Respuestas por ruta y código de estado", ("route", "method", "status"),
+)
+DB_QUERIES = Counter("crm_db_queries_total", "Consultas SQL ejecutadas por ruta", ("route",))
+DB_TIME = Counter("crm_db_time_seconds_total", "Tiempo en la base de datos por ruta", ("route",))
+CACHE_REQUESTS = Counter(
+    "crm_cache_requests_total", "Consultas al cache de listados por cache_prefix (result=hit|miss)",
+    ("prefix", "result"),
+)
+JOB_DURATION = Histogram(
+    "crm_rq_job_duration_seconds", "Duración de los jobs de RQ", ("queue", "status"), buckets=JOB_BUCKETS,
+)
+GRAPH_REQUEST_DURATION = Histogram(
+    "crm_graph_request_duration_seconds", "Latencia de Microsoft Graph (hasta los headers, con reintentos)",
+    ("method", "status"),
+)
+GRAPH_THROTTLED = Counter(
+    "crm_graph_throttled_total", "Respuestas 429/503 de Graph (cada una se reintenta)", ("status",),
+)
+
+
+# --- Almacenamiento ---
+
+class _LocalPipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.ops.append((key, field, amount))
+
+    def execute(self):
+        with self.store.lock:
+            for key, field, amount in self.ops:
+                self.store.data[key][field] += amount
+
+
+class _LocalStore:
+    """Respaldo en memoria del proceso cuando el cache no es Redis (desarrollo, pruebas)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = defaultdict(lambda: defaultdict(float))
+
+    def pipeline(self, transaction=False):
+        return _LocalPipeline(self)
+
+    def hgetall(self, key):
+        with self.lock:
+            return dict(self.data.get(key, {}))
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.data.pop(key, None)
+
+
+_local_store = _LocalStore()
+
+
+def _store():
+    connection = _get_redis_connection()
+    return connection if connection is not None else _local_store
+
+
+@contextmanager
+def record():
+    """
+    Agrupa varios registros en un pipeline:
+
+        with record() as pipe:
+            HTTP_REQUEST_DURATION.observe(pipe, 0.12, route="...", method="GET")
+
+    Un error de Redis no interrumpe al llamador; las métricas de ese registro se pierden.
+    """
+    pipe = _store().pipeline(transaction=False)
+    yield pipe
+    try:
+        pipe.execute()
+    except RedisError as e:
+        logger.debug(f"No se pudieron registrar métricas: {e}")
+
+
+def reset_metrics() -> None:
+    """Borra los acumulados (pruebas o reinicio manual de los contadores)."""
+    try:
+        _store().delete(*(metric.key for metric in registry))
+    except RedisError as e:
+        logger.warning(f"No se pudieron borrar las métricas: {e}")
+
+
+# --- Registro desde la aplicación ---
+
+def observe_request(method: str, route, status: int, seconds: float, db_queries: int, db_time: float,
+                    cache_results=None) -> None:
+    """Un request terminado (lo llama middleware.instrumentation.PerformanceMiddleware)."""
+    route = route or "<unmatched>"
+    with record() as pipe:
+        HTTP_REQUEST_DURATION.observe(pipe, seconds, route=route, method=method)
+        HTTP_RESPONSES.inc(pipe, route=route, method=method, status=status)
+        if db_queries:
+            DB_QUERIES.inc(pipe, db_queries, route=route)
+            DB_TIME.inc(pipe, db_time, route=route)
+        for (prefix, result), count in (cache_results or {}).items():
+            CACHE_REQUESTS.inc(pipe, count, prefix=prefix, result=result)
+
+
+def observe_graph_response(response, *args, **kwargs) -> None:
+    """Hook `response` de la sesión de Graph: latencia por método y código de estado."""
+    with record() as pipe:
+        GRAPH_REQUEST_DURATION.observe(pipe, response.elapsed.total_seconds(),
+                                       method=response.request.method, status=response.status_code)
+
+
+def observe_graph_throttle(status: int) -> None:
+    with record() as pipe:
+        GRAPH_THROTTLED.inc(pipe, status=status)
+
+
+def observe_job(queue: str, status: str, seconds: float) -> None:
+    with record() as pipe:
+        JOB_DURATION.observe(pipe, seconds, queue=queue, status=status)
+
+
+# --- Exposición ---
+
+def render_metrics() -> str:
+    """Todas las métricas en el formato de texto de Prometheus (0.0.4)."""
+    store = _store()
+    lines = []
+    for metric in registry:
+        try:
+            raw = store.hgetall(metric.key)
+        except RedisError as e:
+            logger.warning(f"No se pudieron leer las métricas {metric.name}: {e}")
+            raw = {}
+        fields = {_decode(field): float(value) for field, value in raw.items()}
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(_sample_line(name, labels, value) for name, labels, value in metric.samples(fields))
+
+    lines.extend(_queue_lines())
+    return "\n".join(lines) + "\n"
+
+
+def _queue_lines():
+    """Profundidad de cada cola de RQ y de sus registros (leída en el momento)."""
+    import django_rq
+    from django.conf import settings
+
+    gauges = {
+        "crm_rq_queue_depth": ("Jobs en espera por cola", lambda queue: len(queue)),
+        "crm_rq_started_jobs": ("Jobs en ejecución por cola", lambda queue: queue.started_job_registry.count),
+        "crm_rq_scheduled_jobs": ("Jobs programados (reintentos con backoff) por cola",
+                                  lambda queue: queue.scheduled_job_registry.count),
+        "crm_rq_failed_jobs": ("Jobs fallidos (dead-letter) por cola", lambda queue: queue.failed_job_registry.count),
+    }
+    values = defaultdict(dict)
+    for name in settings.RQ_QUEUES:
+        try:
+            queue = django_rq.get_queue(name)
+            for gauge, (_, getter) in gauges.items():
+                values[gauge][name] = getter(queue)
+        except RedisError as e:
+            logger.warning(f"No se pudo leer la cola {name}: {e}")
+
+    for gauge, (help_text, _) in gauges.items():
+        yield f"# HELP {gauge} {help_text}"
+        yield f"# TYPE {gauge} gauge"
+        for queue_name, value in values[gauge].items():
+            yield _sample_line(gauge, f'queue="{_escape(queue_name)}"', value)
+
+
+def _sample_line(name: str, labels: str, value: float) -> str:
+    value = int(value) if float(value).is_integer() else value
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
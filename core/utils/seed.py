@@ -0,0 +1,282 @@
+"""
+Datos sintéticos para pruebas de consultas y benchmarks.
+
+`seed_dataset(rows)` crea `rows` filas de cada entidad principal (usuarios con perfil, grupo y célula,
+proyectos, clientes, contactos, oportunidades con finanzas, documentos y estado de compra,
+actividades comerciales, registros de actividad y objetivos) con sus relaciones M2M, además de
+los catálogos que falten. Todo se inserta con `bulk_create`, así que no dispara señales;
+`is_purchase_eligible` se calcula aquí igual que en `Opportunity.save()` y el historial de
+simple_history solo se genera con `history=True`.
+
+Los nombres llevan `prefix` más un token por llamada, de modo que se puede llamar varias veces
+sobre la misma base (ej: sembrar 1 fila y luego 199 más) sin chocar con los campos únicos.
+"""
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from activity_log.models import ActivityLog
+from catalog.models import (
+    UDN, WorkCell, WorkCellUser, BusinessGroup, Division, Subdivision, Specialty, Currency, ProjectStatus, City,
+    Period, StatusOpportunity, Job, OpportunityType, MeetingType, MeetingResult, LostOpportunityType,
+    PurchaseStatusType,
+)
+from client.models import Client
+from contact.models import Contact
+from objetive.models import Objetive
+from opportunity.eligibility import PURCHASE_MIN_AMOUNT_BY_CURRENCY, PURCHASE_STATUS_IDS, is_purchase_eligible
+from opportunity.models import Opportunity, FinanceOpportunity, OpportunityDocument, CommercialActivity
+from project.models import Project
+from purchase.models import PurchaseStatus
+from users.models import UserProfile
+
+User = get_user_model()
+
+SEED_PREFIX = "seed-"
+CATALOG_SIZE = 10
+# Filas mínimas para que existan los ids fijos de catalog.constants (estados "Negociando"/"Ganada", MN/USD)
+MIN_CATALOG_IDS = {StatusOpportunity: 6, Currency: 2, PurchaseStatusType: 1}
+SIMPLE_CATALOGS = (
+    UDN, BusinessGroup, Division, Specialty, Currency, ProjectStatus, City, Period, StatusOpportunity, Job,
+    OpportunityType, MeetingType, MeetingResult, LostOpportunityType, PurchaseStatusType,
+)
+GROUP_PERMISSIONS = ('view_opportunity', 'add_opportunity', 'change_opportunity', 'view_project', 'view_contact')
+
+
+def seed_dataset(rows: int, *, users: int = None, agent_ids=(), catalog_rows: int = CATALOG_SIZE,
+                 prefix: str = SEED_PREFIX, days: int = 0, history: bool = False, batch_size: int = 1000,
+                 seed: int = 42) -> dict:
+    """
+    Siembra `rows` filas de cada entidad y garantiza `catalog_rows` filas nuevas por catálogo.
+
+    - `users`: usuarios a crear (por defecto `rows`); `agent_ids` suma usuarios existentes a los que
+      también se asignan oportunidades y actividades.
+    - `days`: reparte `created` de las oportunidades en los últimos N días (0 = todas de hoy, visibles
+      en los listados del año en curso).
+    - `history`: crea también el registro inicial ("+") de simple_history de cada fila.
+
+    Devuelve {nombre del modelo: filas creadas}.
+    """
+    rng = random.Random(seed)
+    token = uuid.uuid4().hex[:8]
+    seeder = _Seeder(rng, prefix, token, batch_size, history)
+    with transaction.atomic():
+        seeder.catalogs(catalog_rows)
+        seeder.users(rows if users is None else users, agent_ids)
+        seeder.projects(rows)
+        seeder.clients(rows)
+        seeder.contacts(rows)
+        seeder.opportunities(rows, days)
+        seeder.activities(rows)
+        seeder.objetives(rows)
+    return seeder.created
+
+
+class _Seeder:
+
+    def __init__(self, rng: random.Random, prefix: str, token: str, batch_size: int, history: bool):
+        self.rng = rng
+        self.prefix = f"{prefix}{token}-"
+        self.token = token
+        self.batch_size = batch_size
+        self.history = history
+        self.created = {}
+        self.catalog_ids = {}
+        self.now = timezone.now()
+
+    def _bulk(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self._count(model.__name__, len(created))
+        if self.history and hasattr(model, 'history'):
+            model.history.bulk_history_create(created, batch_size=self.batch_size, default_date=self.now)
+            self._count(model.history.model.__name__, len(created))
+        return created
+
+    def _count(self, name: str, rows: int):
+        self.created[name] = self.created.get(name, 0) + rows
+
+    def _ids(self, model):
+        if model not in self.catalog_ids:
+            self.catalog_ids[model] = list(model.all_objects.values_list('id', flat=True))
+        return self.catalog_ids[model]
+
+    def _pick(self, model):
+        return self.rng.choice(self._ids(model))
+
+    def _name(self, label: str, i: int) -> str:
+        return f"{self.prefix}{label}-{i}"
+
+    def catalogs(self, count: int):
+        for model in SIMPLE_CATALOGS:
+            missing = max(count, MIN_CATALOG_IDS.get(model, 0) - model.all_objects.count())
+            self._bulk(model, [model(name=self._name(model.__name__, i)) for i in range(missing)])
+
+        udns, divisions = self._ids(UDN), self._ids(Division)
+        self._bulk(WorkCell, [
+            WorkCell(name=self._name('WorkCell', i), udn_id=udns[i % len(udns)]) for i in range(count)
+        ])
+        self._bulk(Subdivision, [
+            Subdivision(name=self._name('Subdivision', i), division_id=divisions[i % len(divisions)])
+            for i in range(count)
+        ])
+        self.catalog_ids.clear()
+
+        group, _ = Group.objects.get_or_create(name=f"{SEED_PREFIX}agentes")
+        group.permissions.add(*Permission.objects.filter(codename__in=GROUP_PERMISSIONS))
+        self.group = group
+        self.direct_permissions = list(
+            Permission.objects.filter(codename__in=('view_client', 'view_activitylog')).values_list('id', flat=True)
+        )
+
+    def users(self, count: int, agent_ids):
+        users = self._bulk(User, [
+            User(username=self._name('user', i), email=f"{self._name('user', i)}@ferbaq.com",
+                 first_name='Agente', last_name=str(i), password='!')
+            for i in range(count)
+        ])
+        created_ids = [user.id for user in users]
+        self._bulk(UserProfile, [UserProfile(user_id=user_id) for user_id in created_ids])
+        self._bulk(WorkCellUser, [
+            WorkCellUser(user_id=user_id, work_cell_id=self._pick(WorkCell)) for user_id in created_ids
+        ])
+        User.groups.through.objects.bulk_create(
+            [User.groups.through(user_id=user_id, group_id=self.group.id) for user_id in created_ids],
+            batch_size=self.batch_size,
+        )
+        User.user_permissions.through.objects.bulk_create(
+            [User.user_permissions.through(user_id=user_id, permission_id=permission_id)
+             for user_id in created_ids for permission_id in self.direct_permissions],
+            batch_size=self.batch_size,
+        )
+        self.user_ids = created_ids + list(agent_ids)
+
+    def projects(self, count: int):
+        projects = self._bulk(Project, [
+            Project(
+                name=self._name('project', i), description=f"Proyecto sintético {i}",
+                latitude=19 + self.rng.random(), longitude=-99 - self.rng.random(),
+                project_status_id=self._pick(ProjectStatus), specialty_id=self._pick(Specialty),
+                subdivision_id=self._pick(Subdivision), work_cell_id=self._pick(WorkCell),
+            )
+            for i in range(count)
+        ])
+        self.project_ids = [project.id for project in projects]
+
+    def clients(self, count: int):
+        first_id = (Client.all_objects.aggregate(last=Max('id_client'))['last'] or 0) + 1
+        clients = self._bulk(Client, [
+            Client(
+                rfc=f"{self.token.upper()}{i:06d}", company=self._name('client', i), id_client=first_id + i,
+                city_id=self._pick(City), business_group_id=self._pick(BusinessGroup),
+            )
+            for i in range(count)
+        ])
+        self.client_ids = [client.id for client in clients]
+        Client.projects.through.objects.bulk_create(
+            [Client.projects.through(client_id=client_id, project_id=self.rng.choice(self.project_ids))
+             for client_id in self.client_ids],
+            batch_size=self.batch_size,
+        )
+
+    def contacts(self, count: int):
+        contacts = self._bulk(Contact, [
+            Contact(
+                name=self._name('contact', i), email=f"{self._name('contact', i)}@ferbaq.com",
+                phone=f"55{i:08d}", job_id=self._pick(Job),
+            )
+            for i in range(count)
+        ])
+        self.contact_ids = [contact.id for contact in contacts]
+        Contact.clients.through.objects.bulk_create(
+            [Contact.clients.through(contact_id=contact_id, client_id=client_id)
+             for contact_id in self.contact_ids
+             for client_id in self.rng.sample(self.client_ids, min(2, len(self.client_ids)))],
+            batch_size=self.batch_size,
+        )
+
+    def opportunities(self, count: int, days: int):
+        statuses = self._ids(StatusOpportunity)
+        opportunities = []
+        for i in range(count):
+            opportunity = Opportunity(
+                name=self._name('opportunity', i), description=f"Oportunidad sintética {i}",
+                requisition_number=f"REQ-{i}",
+                closing_percentage=Decimal(self.rng.choice((10, 50, 80, 90, 100))),
+                amount=Decimal(self.rng.randint(1_000, 1_000_000)),
+                status_opportunity_id=self.rng.choice(statuses), currency_id=self._pick(Currency),
+                contact_id=self.rng.choice(self.contact_ids), agent_id=self.rng.choice(self.user_ids),
+                project_id=self.rng.choice(self.project_ids), opportunityType_id=self._pick(OpportunityType),
+                client_id=self.rng.choice(self.client_ids),
+                lost_opportunity_id=self._pick(LostOpportunityType) if i % 5 == 0 else None,
+                number_items=self.rng.randint(1, 50),
+                created=self.now - timedelta(days=self.rng.randint(0, days), seconds=self.rng.randint(0, 60)),
+            )
+            if i % 2 == 0:
+                # La mitad cumple los criterios de compras, para que ese listado también tenga filas
+                currency_id, min_amount = self.rng.choice(list(PURCHASE_MIN_AMOUNT_BY_CURRENCY.items()))
+                opportunity.status_opportunity_id = self.rng.choice(PURCHASE_STATUS_IDS)
+                opportunity.currency_id = currency_id
+                opportunity.closing_percentage = Decimal(self.rng.choice((80, 90, 100)))
+                opportunity.amount = Decimal(min_amount + self.rng.randint(0, 1_000_000))
+            opportunity.is_purchase_eligible = is_purchase_eligible(opportunity)
+            opportunities.append(opportunity)
+        opportunities = self._bulk(Opportunity, opportunities)
+        self.opportunity_ids = [opportunity.id for opportunity in opportunities]
+
+        self._bulk(FinanceOpportunity, [
+            FinanceOpportunity(
+                opportunity_id=opportunity.id, earned_amount=opportunity.amount,
+                cost_subtotal=opportunity.amount / 2, order_closing_date=opportunity.created,
+                oc_number=f"OC-{opportunity.id}", cash_percentage=Decimal(50), credit_percentage=Decimal(50),
+            )
+            for opportunity in opportunities[::2]
+        ])
+        self._bulk(OpportunityDocument, [
+            OpportunityDocument(
+                opportunity_id=opportunity_id, file_name=f"{name}.pdf",
+                sharepoint_url=f"https://ferbaq.sharepoint.com/sites/crm/{opportunity_id}/{name}.pdf",
+            )
+            for opportunity_id in self.opportunity_ids for name in ('cotizacion', 'requisicion')
+        ])
+        self._bulk(PurchaseStatus, [
+            PurchaseStatus(opportunity_id=opportunity.id, purchase_status_type_id=self._pick(PurchaseStatusType))
+            for opportunity in opportunities if opportunity.is_purchase_eligible
+        ])
+
+    def activities(self, count: int):
+        activities = self._bulk(CommercialActivity, [
+            CommercialActivity(name=self._name('activity', i), agent_id=self.rng.choice(self.user_ids))
+            for i in range(count)
+        ])
+        CommercialActivity.opportunities.through.objects.bulk_create(
+            [CommercialActivity.opportunities.through(
+                commercialactivity_id=activity.id, opportunity_id=self.rng.choice(self.opportunity_ids))
+             for activity in activities],
+            batch_size=self.batch_size,
+        )
+        self._bulk(ActivityLog, [
+            ActivityLog(
+                observation=f"Visita {i}", latitude=19 + self.rng.random(), longitude=-99 - self.rng.random(),
+                activity_type_id=activities[i].id, project_id=self.rng.choice(self.project_ids),
+                contact_id=self.rng.choice(self.contact_ids), meeting_type_id=self._pick(MeetingType),
+                meeting_result_id=self._pick(MeetingResult), opportunity_id=self.rng.choice(self.opportunity_ids),
+            )
+            for i in range(count)
+        ])
+
+    def objetives(self, count: int):
+        self._bulk(Objetive, [
+            Objetive(
+                name=self._name('objetive', i), amount=Decimal(self.rng.randint(10_000, 1_000_000)),
+                currency_id=self._pick(Currency), period_id=self._pick(Period),
+                user_id=self.rng.choice(self.user_ids),
+            )
+            for i in range(count)
+        ])
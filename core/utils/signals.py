@@ -20,8 +20,9 @@ def should_skip_signal_registration():
     if any(cmd in sys.argv for cmd in skip_commands):
         return True
 
-    # Evitar ejecución duplicada por runserver (autoreload)
-    if os.environ.get('RUN_MAIN') != 'true':
+    # Evitar ejecución duplicada por runserver (autoreload). Solo aplica a runserver:
+    # gunicorn y los workers de RQ no definen RUN_MAIN y sí necesitan las señales.
+    if 'runserver' in sys.argv and os.environ.get('RUN_MAIN') != 'true':
         return True
 
     return False
@@ -0,0 +1,85 @@
+import logging
+import os
+import re
+import secrets
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_SPOOL_ID = re.compile(r"^[0-9a-f]{64}$")
+_TMP_SUFFIX = ".part"
+
+
+def spool_dir() -> Path:
+    path = Path(settings.UPLOAD_SPOOL_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def spool_path(spool_id: str) -> Path:
+    if not _SPOOL_ID.match(spool_id):
+        raise ValueError(f"Identificador de spool inválido: {spool_id!r}")
+    return spool_dir() / spool_id[:2] / spool_id
+
+
+def spool_upload(uploaded_file) -> str:
+    """
+    Copia un archivo subido (UploadedFile de Django) al directorio de staging, por fragmentos,
+    y devuelve su identificador (64 caracteres hexadecimales aleatorios).
+
+    Los jobs reciben solo este identificador en lugar de los bytes, así el payload en Redis
+    no depende del tamaño del archivo. Cada subida tiene su propio archivo: el job lo elimina
+    al terminar (`release_spooled`) sin afectar a otro job que suba el mismo contenido.
+    """
+    base = spool_dir()
+    fd, tmp_name = tempfile.mkstemp(dir=base, suffix=_TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in uploaded_file.chunks():
+                tmp.write(chunk)
+
+        spool_id = secrets.token_hex(32)
+        target = spool_path(spool_id)
+        target.parent.mkdir(exist_ok=True)
+        # Reemplazo atómico: un worker nunca ve el archivo a medio escribir
+        os.replace(tmp_name, target)
+        return spool_id
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def open_spooled(spool_id: str):
+    """Abre en modo binario un archivo del staging (FileNotFoundError si ya expiró)."""
+    return open(spool_path(spool_id), "rb")
+
+
+def release_spooled(spool_id: str) -> None:
+    """Elimina un archivo del staging cuando su job ya lo subió."""
+    spool_path(spool_id).unlink(missing_ok=True)
+
+
+def cleanup_spool(ttl: int = None) -> int:
+    """
+    Elimina los archivos del staging con más de `ttl` segundos (UPLOAD_SPOOL_TTL por defecto),
+    incluidos los temporales de copias interrumpidas. Devuelve cuántos se eliminaron.
+
+    Los jobs eliminan su archivo al subirlo; aquí quedan los de jobs que agotaron sus reintentos
+    o que nunca se encolaron (transacción revertida). Lo ejecuta `core.tasks.cleanup_upload_spool`.
+    """
+    ttl = settings.UPLOAD_SPOOL_TTL if ttl is None else ttl
+    limit = time.time() - ttl
+    removed = 0
+    for path in spool_dir().rglob("*"):
+        try:
+            if path.is_file() and path.stat().st_mtime < limit:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    logger.info(f"Spool de subidas: {removed} archivos eliminados")
+    return removed
@@ -0,0 +1,34 @@
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Headers de la respuesta de origen que se reenvían al cliente
+_PASSTHROUGH_HEADERS = ("Content-Length", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified")
+
+
+def proxy_streaming_response(upstream, filename: str = None, content_type: str = None) -> StreamingHttpResponse:
+    """
+    Reenvía una respuesta de `requests` abierta con `stream=True` por fragmentos de STREAM_CHUNK_SIZE,
+    sin cargar el archivo en memoria. Conserva el status (200/206/416) y los headers de longitud y rango
+    para que los visores de PDF puedan pedir rangos. La conexión de origen se cierra al terminar
+    (o si el cliente corta la descarga).
+    """
+    def body():
+        try:
+            yield from upstream.iter_content(STREAM_CHUNK_SIZE)
+        finally:
+            upstream.close()
+
+    response = StreamingHttpResponse(
+        body(),
+        status=upstream.status_code,
+        content_type=content_type or upstream.headers.get("Content-Type", "application/octet-stream"),
+    )
+    for header in _PASSTHROUGH_HEADERS:
+        if header in upstream.headers:
+            response[header] = upstream.headers[header]
+    response.setdefault("Accept-Ranges", "bytes")
+    if filename:
+        response["Content-Disposition"] = content_disposition_header(False, filename)
+    return response
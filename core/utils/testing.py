@@ -0,0 +1,9 @@
+# Cache de las pruebas que usan `cache.clear()` o cuentan consultas con el cache activo.
+# Con Redis, `cache.clear()` vaciaría también las colas de RQ; con DummyCache (sin Redis)
+# nada se cachea y fallan las pruebas que esperan cero consultas en la segunda lectura.
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests",
+    }
+}
@@ -0,0 +1,61 @@
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionCollector:
+    """
+    Acumula trabajo derivado de una escritura (invalidaciones de cache, registros dependientes...)
+    y lo ejecuta una sola vez cuando la transacción confirma.
+
+    - Cada tarea se identifica con una clave: si varias señales de la misma transacción
+      agregan la misma clave, la tarea se ejecuta una sola vez.
+    - Las tareas `last=True` se ejecutan después de todas las demás (ej: la invalidación de cache,
+      que así incluye también lo que escriban las tareas derivadas).
+    - Fuera de una transacción `on_commit` ejecuta de inmediato.
+    - Si la transacción se revierte, lo pendiente se ejecuta con el siguiente commit del hilo;
+      por eso las tareas deben releer de la base de datos lo que necesiten.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _state(self):
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+            self._local.final = {}
+            self._local.flushing = False
+        return self._local
+
+    def add(self, key, callback, last: bool = False):
+        state = self._state()
+        queue = state.final if last else state.pending
+        queue.setdefault(key, callback)
+
+        # Durante el flush, lo que agreguen las tareas lo recoge el mismo ciclo
+        if not state.flushing:
+            transaction.on_commit(self.flush)
+
+    def flush(self):
+        state = self._state()
+        if state.flushing:
+            return
+
+        state.flushing = True
+        try:
+            while state.pending or state.final:
+                queue = state.pending if state.pending else state.final
+                key = next(iter(queue))
+                callback = queue.pop(key)
+                try:
+                    callback()
+                except Exception as e:
+                    logger.exception(f"Error ejecutando tarea post-commit {key}: {e}")
+        finally:
+            state.flushing = False
+
+
+transaction_collector = TransactionCollector()
@@ -1,4 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.utils.metrics import render_metrics
 
 
 def test_error(request):
     raise Exception("Error de prueba para CloudWatch y logging de Django")
+
+
+@require_GET
+def metrics(request):
+    """
+    Métricas en formato de texto de Prometheus (ver core.utils.metrics).
+    Solo con `Authorization: Bearer <METRICS_TOKEN>`; sin token configurado el endpoint no existe.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404()
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,11 +1,16 @@
 from django.utils.deprecation import MiddlewareMixin
-from django.apps import apps
+
+from users.services.access import get_access_profile
 
 
 class CacheUserGroupsMiddleware(MiddlewareMixin):
     """
     - user._group_names = set de nombres de grupo
     - user._workcell_ids  = lista de IDs de WorkCell para el user
+
+    Los valores salen del perfil de acceso cacheado (ver `users.services.access`).
+    Este middleware corre antes de DRF, así que solo ve usuarios de sesión (admin);
+    en la API el perfil lo carga `AccessProfileJWTAuthentication` al autenticar el token.
     """
 
     def process_request(self, request):
@@ -17,33 +22,4 @@ class CacheUserGroupsMiddleware(MiddlewareMixin):
                 user._workcell_ids = []
             return
 
-        # 1) Cachear grupos
-        user._group_names = set(
-            user.groups.values_list('name', flat=True)
-        )
-
-        # 2) Encontrar el modelo WorkCell
-        WorkCell = apps.get_model('catalog', 'WorkCell')
-
-        # 3) Tratar de usar el manager inverso correcto
-        #    probamos varios posibles related_name
-        possible_attrs = [
-            'workcell_set',  # default si no hay related_name
-            'work_cells',  # quizá related_name="work_cells"
-            'workcell_users',  # o "workcell_users"
-            'work_cells_users',  # o "work_cells_users"
-        ]
-        manager = None
-        for attr in possible_attrs:
-            if hasattr(user, attr):
-                manager = getattr(user, attr)
-                break
-
-        if manager is None:
-            # fallback directo
-            qs = WorkCell.objects.filter(users=user)
-        else:
-            qs = manager.all()
-
-        # 4) Finalmente, cacheamos los IDs
-        user._workcell_ids = list(qs.values_list('id', flat=True))
+        get_access_profile(user)
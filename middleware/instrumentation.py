@@ -0,0 +1,83 @@
+import json
+import logging
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.utils.instrumentation import db_execute_wrapper, end_request, start_request
+from core.utils.metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+_NAMED_GROUP = re.compile(r"\(\?P<(\w+)>[^)]*\)")
+
+
+class PerformanceMiddleware:
+    """
+    Mide cada request (ver core.utils.instrumentation): consultas y tiempo de base de datos,
+    aciertos/fallos de cache, tiempo de Redis, llamadas a SharePoint y serialización.
+
+    - Header `Server-Timing` para verlo en las herramientas del navegador: con PERF_SERVER_TIMING
+      para todos; si no, solo con DEBUG o para usuarios staff (revela tiempos internos).
+    - Una línea JSON por request en el logger `middleware.instrumentation`, con el endpoint
+      (ruta de la URL) y la acción del ViewSet; WARNING si supera PERF_SLOW_REQUEST_MS.
+    - Los acumulados entre procesos de core.utils.metrics (expuestos en `endpoint/metrics`).
+
+    Va primero en MIDDLEWARE para incluir al resto de middlewares en el total.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.PERF_INSTRUMENTATION
+        self.server_timing = settings.PERF_SERVER_TIMING or settings.DEBUG
+        self.slow_request_ms = settings.PERF_SLOW_REQUEST_MS
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics, token = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(db_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+
+        total = metrics.elapsed()
+        # DRF deja el usuario autenticado (JWT) en el HttpRequest al autenticar en la vista
+        if self.server_timing or getattr(getattr(request, 'user', None), 'is_staff', False):
+            response['Server-Timing'] = metrics.server_timing(total)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            **_endpoint(request),
+            'status': response.status_code,
+            **metrics.as_dict(total),
+        }
+        level = logging.WARNING if record['total_ms'] >= self.slow_request_ms else logging.INFO
+        logger.log(level, json.dumps(record, ensure_ascii=False))
+
+        observe_request(request.method, record['endpoint'], response.status_code, total,
+                        metrics.db_queries, metrics.db_time, metrics.cache_results)
+        return response
+
+
+def _endpoint(request) -> dict:
+    """Ruta de la URL resuelta (ej: "endpoint/opportunities/<pk>/") y ViewSet / acción que la atendió."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return {'endpoint': None, 'view': None, 'action': None}
+
+    view_class = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    return {
+        # Los routers de DRF registran regex: "^opportunities/(?P<pk>[^/.]+)/$" → "opportunities/<pk>/"
+        'endpoint': _NAMED_GROUP.sub(r"<\1>", match.route).replace('^', '').replace('$', ''),
+        'view': view_class.__name__ if view_class else match.view_name,
+        'action': actions.get(request.method.lower()),
+    }
@@ -7,6 +7,12 @@ class ObjetiveViewSet(CachedViewSet):
     model = Objetive
     serializer_class = ObjetiveSerializer
 
+    def get_optimized_queryset(self):
+        return Objetive.all_objects.select_related('currency', 'period', 'user').order_by('-id')
+
+    def get_actives_queryset(self, request):
+        return self.get_optimized_queryset().filter(is_removed=False)
+
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:  # Para GET (lista o detalle)
             return ObjetiveSerializer
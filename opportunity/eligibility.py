@@ -0,0 +1,38 @@
+from django.db.models import Q
+
+from catalog.constants import CurrencyIDs, OpportunityFilters, StatusIDs
+
+# Definición única de "oportunidad elegible para compras". La usan:
+# - Opportunity.save(), que guarda el resultado en `is_purchase_eligible`;
+# - el comando backfill_purchase_eligibility, que recalcula la columna en SQL.
+PURCHASE_STATUS_IDS = (StatusIDs.NEGOTIATING, StatusIDs.WON)
+PURCHASE_MIN_AMOUNT_BY_CURRENCY = {
+    CurrencyIDs.MN: OpportunityFilters.AMOUNT_MN,
+    CurrencyIDs.USD: OpportunityFilters.AMOUNT_USD,
+}
+
+
+def is_purchase_eligible(opportunity) -> bool:
+    """Evalúa en memoria los criterios de compras sobre una instancia de Opportunity."""
+    min_amount = PURCHASE_MIN_AMOUNT_BY_CURRENCY.get(opportunity.currency_id)
+    return bool(
+        opportunity.closing_percentage is not None
+        and opportunity.closing_percentage >= OpportunityFilters.CLOSING_PERCENTAGE
+        and opportunity.status_opportunity_id in PURCHASE_STATUS_IDS
+        and min_amount is not None
+        and opportunity.amount is not None
+        and opportunity.amount >= min_amount
+    )
+
+
+def purchase_eligibility_q() -> Q:
+    """Los mismos criterios que `is_purchase_eligible`, como expresión para la base de datos."""
+    by_amount = Q()
+    for currency_id, min_amount in PURCHASE_MIN_AMOUNT_BY_CURRENCY.items():
+        by_amount |= Q(currency_id=currency_id, amount__gte=min_amount)
+
+    return (
+        Q(closing_percentage__gte=OpportunityFilters.CLOSING_PERCENTAGE)
+        & Q(status_opportunity_id__in=PURCHASE_STATUS_IDS)
+        & by_amount
+    )
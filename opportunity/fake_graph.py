@@ -0,0 +1,429 @@
+"""
+Servicio local que imita la parte de Microsoft Graph / Entra ID que usa `opportunity.sharepoint`,
+para probar y medir el flujo de documentos sin el tenant real.
+
+Soporta:
+- token de aplicación (`POST /{tenant}/oauth2/v2.0/token`, client credentials);
+- sitio y drives (`/sites/{host}:/sites/{path}`, `/sites/{id}/drives`);
+- archivos por ruta (`root:/{path}:`) o dentro de una carpeta por id (`items/{id}:/{nombre}:`):
+  GET de metadatos (con `If-None-Match`), GET/PUT de `/content`, DELETE, `/children`;
+- sesiones de carga (`createUploadSession` + PUT por rangos, estado y cancelación);
+- `POST /$batch`;
+- descargas con `Range` (la `downloadUrl` prefirmada y `/content` responden igual);
+- latencia artificial y limitación (429 con `Retry-After`), cada N peticiones o con probabilidad.
+
+Todo se guarda en memoria. Para usarlo:
+
+    python manage.py fake_graph_server --port 8765
+
+    SHAREPOINT_GRAPH_BASE_URL=http://127.0.0.1:8765/v1.0
+    SHAREPOINT_AUTHORITY_HOST=http://127.0.0.1:8765
+
+o desde código / pruebas con `FakeGraphServer(...).start()` (ver opportunity/tests.py).
+"""
+import itertools
+import json
+import mimetypes
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+SITE_ID = "fake-site"
+DRIVE_ID = "fake-drive"
+ROOT_ID = "root"
+
+_DRIVE_PATH = re.compile(r"^/sites/[^/]+/drives/[^/]+/(?P<rest>.*)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+@dataclass
+class FakeItem:
+    id: str
+    name: str
+    parent_id: Optional[str]
+    is_folder: bool = False
+    content: bytes = b""
+    version: int = 1
+    modified: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> str:
+        # Igual que Graph: lleva comas, lo que obliga a no partir el header If-None-Match por ","
+        return f'"{{{self.id}}},{self.version}"'
+
+
+@dataclass
+class FakeResponse:
+    status: int
+    body: object = None
+    headers: dict = field(default_factory=dict)
+
+
+class FakeGraphServer:
+    """
+    Servidor HTTP en un hilo con el estado del drive en memoria.
+
+    Args:
+        host, port: dirección de escucha (port=0 elige uno libre)
+        latency: segundos que se espera antes de responder cada petición
+        throttle_every: responde 429 a una de cada N peticiones (0 = nunca)
+        throttle_rate: probabilidad de responder 429 (0.0 - 1.0)
+        retry_after: valor del header Retry-After de los 429
+        drive_name: nombre de la biblioteca de documentos
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 throttle_every: int = 0, throttle_rate: float = 0.0, retry_after: int = 1,
+                 drive_name: str = "Documentos"):
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.drive_name = drive_name
+
+        self.stats = Counter()
+        self._lock = threading.RLock()
+        self._counter = itertools.count(1)
+        self._items = {ROOT_ID: FakeItem(ROOT_ID, "root", None, is_folder=True)}
+        self._sessions = {}
+        self._tokens = set()
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.graph = self
+        self._thread = None
+
+    # --- Ciclo de vida ---
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def graph_url(self) -> str:
+        return f"{self.base_url}/v1.0"
+
+    def start(self) -> "FakeGraphServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Ayudas para pruebas ---
+
+    def get_content(self, path: str) -> Optional[bytes]:
+        item = self._resolve_path(path)
+        return None if item is None or item.is_folder else item.content
+
+    def put_content(self, path: str, content: bytes) -> FakeItem:
+        with self._lock:
+            return self._write(self._ensure_parent(path), path.rsplit("/", 1)[-1], content)
+
+    def move(self, path: str, new_path: str) -> None:
+        """Mueve o renombra un archivo o carpeta; su id no cambia (como en SharePoint)."""
+        with self._lock:
+            item = self._resolve_path(path)
+            parent = self._ensure_parent(new_path)
+            item.parent_id, item.name = parent.id, new_path.rsplit("/", 1)[-1]
+
+    def revoke_tokens(self) -> None:
+        """Invalida los tokens emitidos: la siguiente petición recibe 401."""
+        with self._lock:
+            self._tokens.clear()
+
+    # --- Árbol de archivos ---
+
+    def _children(self, parent_id: str):
+        return [item for item in self._items.values() if item.parent_id == parent_id]
+
+    def _child(self, parent_id: str, name: str) -> Optional[FakeItem]:
+        name = name.lower()
+        for item in self._children(parent_id):
+            if item.name.lower() == name:
+                return item
+        return None
+
+    def _resolve_path(self, path: str, parent_id: str = ROOT_ID) -> Optional[FakeItem]:
+        item = self._items.get(parent_id)
+        for part in filter(None, path.split("/")):
+            if item is None or not item.is_folder:
+                return None
+            item = self._child(item.id, part)
+        return item
+
+    def _ensure_parent(self, path: str, parent_id: str = ROOT_ID) -> FakeItem:
+        """Carpeta padre de `path`, creando las que falten (como hace Graph al subir por ruta)."""
+        parent = self._items[parent_id]
+        for part in filter(None, path.split("/")[:-1]):
+            child = self._child(parent.id, part)
+            if child is None:
+                child = FakeItem(f"F{next(self._counter)}", part, parent.id, is_folder=True)
+                self._items[child.id] = child
+            parent = child
+        return parent
+
+    def _write(self, parent: FakeItem, name: str, content: bytes) -> FakeItem:
+        item = self._child(parent.id, name)
+        if item is None:
+            item = FakeItem(f"I{next(self._counter)}", name, parent.id)
+            self._items[item.id] = item
+        else:
+            item.version += 1
+        item.content = content
+        item.modified = time.time()
+        return item
+
+    def _path(self, item_id: str) -> str:
+        """Ruta de un item desde la raíz ("" para la raíz, "/docs/sub" para una carpeta)."""
+        parts = []
+        item = self._items.get(item_id)
+        while item is not None and item.id != ROOT_ID:
+            parts.append(item.name)
+            item = self._items.get(item.parent_id)
+        return "".join(f"/{part}" for part in reversed(parts))
+
+    def _delete(self, item: FakeItem) -> None:
+        for child in self._children(item.id):
+            self._delete(child)
+        self._items.pop(item.id, None)
+
+    def _drive_item(self, item: FakeItem) -> dict:
+        data = {
+            "id": item.id,
+            "name": item.name,
+            "eTag": item.etag,
+            "cTag": item.etag,
+            "size": len(item.content),
+            "lastModifiedDateTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(item.modified)),
+            "parentReference": {"driveId": DRIVE_ID, "id": item.parent_id,
+                                "path": f"/drives/{DRIVE_ID}/root:{self._path(item.parent_id)}"},
+        }
+        if item.is_folder:
+            data["folder"] = {"childCount": len(self._children(item.id))}
+        else:
+            data["file"] = {"mimeType": mimetypes.guess_type(item.name)[0] or "application/octet-stream"}
+            data["@microsoft.graph.downloadUrl"] = f"{self.base_url}/download/{item.id}"
+        return data
+
+    # --- Despacho ---
+
+    def handle(self, method: str, raw_path: str, headers: dict, body: bytes) -> FakeResponse:
+        self.stats[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        total = sum(self.stats.values())
+        if (self.throttle_every and total % self.throttle_every == 0) or (
+                self.throttle_rate and random.random() < self.throttle_rate):
+            self.stats["throttled"] += 1
+            return FakeResponse(429, _error("activityLimitReached", "Throttled"),
+                                {"Retry-After": str(self.retry_after)})
+
+        path = urlparse(raw_path).path
+        with self._lock:
+            if path.endswith("/oauth2/v2.0/token") and method == "POST":
+                return self._issue_token()
+            if path.startswith("/upload/"):
+                return self._upload_session(method, path[len("/upload/"):], headers, body)
+            if path.startswith("/download/"):
+                item = self._items.get(path[len("/download/"):])
+                if item is None or item.is_folder:
+                    return FakeResponse(404, _error("itemNotFound", "Not found"))
+                return self._content(item, headers)
+            if not path.startswith("/v1.0/"):
+                return FakeResponse(404, _error("invalidRequest", "Unknown endpoint"))
+
+            token = (headers.get("Authorization") or "").removeprefix("Bearer ")
+            if token not in self._tokens:
+                return FakeResponse(401, _error("InvalidAuthenticationToken", "Access token is invalid"))
+            return self._graph(method, unquote(path[len("/v1.0"):]), headers, body)
+
+    def _issue_token(self) -> FakeResponse:
+        token = f"fake-{uuid.uuid4().hex}"
+        self._tokens.add(token)
+        return FakeResponse(200, {"token_type": "Bearer", "expires_in": 3600, "access_token": token})
+
+    def _graph(self, method: str, path: str, headers: dict, body: bytes) -> FakeResponse:
+        if path == "/$batch" and method == "POST":
+            return self._batch(json.loads(body or b"{}"), headers)
+        if path.startswith("/sites/") and ":/sites/" in path and method == "GET":
+            return FakeResponse(200, {"id": SITE_ID})
+        if re.fullmatch(r"/sites/[^/]+/drives", path) and method == "GET":
+            return FakeResponse(200, {"value": [
+                {"id": DRIVE_ID, "name": self.drive_name, "driveType": "documentLibrary"},
+            ]})
+
+        match = _DRIVE_PATH.match(path)
+        if not match:
+            return FakeResponse(404, _error("invalidRequest", "Unknown endpoint"))
+        rest = match.group("rest")
+
+        # root:/ruta:{endpoint} | items/{id}:/nombre:{endpoint} | root{endpoint} | items/{id}{endpoint}
+        addressed = re.fullmatch(r"(root|items/(?P<id>[^/:]+)):/(?P<path>.+?):(?P<endpoint>/[A-Za-z]+)?", rest)
+        if addressed:
+            parent_id = addressed.group("id") or ROOT_ID
+            if parent_id not in self._items:
+                return FakeResponse(404, _error("itemNotFound", "Parent not found"))
+            item_path, endpoint = addressed.group("path"), addressed.group("endpoint") or ""
+        else:
+            plain = re.fullmatch(r"(root|items/(?P<id>[^/:]+))(?P<endpoint>/[A-Za-z]+)?", rest)
+            if not plain:
+                return FakeResponse(404, _error("invalidRequest", "Unknown endpoint"))
+            parent_id, item_path = plain.group("id") or ROOT_ID, ""
+            endpoint = plain.group("endpoint") or ""
+
+        item = self._resolve_path(item_path, parent_id)
+
+        if endpoint == "/content" and method == "PUT":
+            parent = self._ensure_parent(item_path, parent_id)
+            created = item is None
+            item = self._write(parent, item_path.rsplit("/", 1)[-1], body)
+            return FakeResponse(201 if created else 200, self._drive_item(item))
+
+        if endpoint == "/createUploadSession" and method == "POST":
+            request = json.loads(body or b"{}").get("item", {})
+            if item is not None and request.get("@microsoft.graph.conflictBehavior") == "fail":
+                return FakeResponse(409, _error("nameAlreadyExists", "Item already exists"))
+            session_id = uuid.uuid4().hex
+            self._sessions[session_id] = {"parent_id": parent_id, "path": item_path, "data": bytearray()}
+            return FakeResponse(200, {
+                "uploadUrl": f"{self.base_url}/upload/{session_id}",
+                "expirationDateTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + 3600)),
+            })
+
+        if item is None:
+            return FakeResponse(404, _error("itemNotFound", "The resource could not be found."))
+
+        if endpoint == "" and method == "GET":
+            if _etag_in(headers.get("If-None-Match"), item.etag):
+                return FakeResponse(304, headers={"ETag": item.etag})
+            return FakeResponse(200, self._drive_item(item), {"ETag": item.etag})
+        if endpoint == "" and method == "DELETE":
+            self._delete(item)
+            return FakeResponse(204)
+        if endpoint == "/content" and method == "GET":
+            return self._content(item, headers)
+        if endpoint == "/children" and method == "GET":
+            return FakeResponse(200, {"value": [self._drive_item(child) for child in self._children(item.id)]})
+        return FakeResponse(405, _error("invalidRequest", "Method not allowed"))
+
+    def _content(self, item: FakeItem, headers: dict) -> FakeResponse:
+        data = item.content
+        response_headers = {"ETag": item.etag, "Accept-Ranges": "bytes", "Content-Type": "application/octet-stream"}
+        match = _RANGE.match(headers.get("Range") or "")
+        if_range = headers.get("If-Range")
+        if match and data and (not if_range or if_range == item.etag):
+            start, end = match.groups()
+            if start:
+                start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+            else:
+                start, end = max(len(data) - int(end), 0), len(data) - 1
+            if start >= len(data) or start > end:
+                return FakeResponse(416, b"", {"Content-Range": f"bytes */{len(data)}"})
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return FakeResponse(206, data[start:end + 1], response_headers)
+        return FakeResponse(200, data, response_headers)
+
+    def _upload_session(self, method: str, session_id: str, headers: dict, body: bytes) -> FakeResponse:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return FakeResponse(404, _error("itemNotFound", "Upload session not found"))
+
+        received = len(session["data"])
+        if method == "DELETE":
+            del self._sessions[session_id]
+            return FakeResponse(204)
+        if method == "GET":
+            return FakeResponse(200, {"nextExpectedRanges": [f"{received}-"]})
+        if method != "PUT":
+            return FakeResponse(405, _error("invalidRequest", "Method not allowed"))
+
+        match = _CONTENT_RANGE.match(headers.get("Content-Range") or "")
+        if not match:
+            return FakeResponse(400, _error("invalidRequest", "Content-Range required"))
+        start, end, total = map(int, match.groups())
+        if start != received or end - start + 1 != len(body):
+            return FakeResponse(416, _error("invalidRange", "Fragment overlap"))
+
+        session["data"] += body
+        if len(session["data"]) < total:
+            return FakeResponse(202, {"nextExpectedRanges": [f"{len(session['data'])}-"]})
+
+        del self._sessions[session_id]
+        if session["parent_id"] not in self._items:
+            return FakeResponse(404, _error("itemNotFound", "Parent not found"))
+        parent = self._ensure_parent(session["path"], session["parent_id"])
+        item = self._write(parent, session["path"].rsplit("/", 1)[-1], bytes(session["data"]))
+        return FakeResponse(201, self._drive_item(item))
+
+    def _batch(self, payload: dict, headers: dict) -> FakeResponse:
+        responses = []
+        for operation in payload.get("requests", []):
+            url = operation.get("url", "")
+            sub_headers = {**(operation.get("headers") or {}), "Authorization": headers.get("Authorization")}
+            body = operation.get("body")
+            result = self._graph(operation.get("method", "GET"), unquote(urlparse(url).path),
+                                 sub_headers, json.dumps(body).encode() if body is not None else b"")
+            responses.append({"id": operation.get("id"), "status": result.status,
+                              "body": result.body if not isinstance(result.body, bytes) else None})
+        return FakeResponse(200, {"responses": responses})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        response = self.server.graph.handle(self.command, self.path, self.headers, body)
+
+        payload = response.body
+        if payload is None:
+            payload = b""
+        elif not isinstance(payload, (bytes, bytearray)):
+            payload = json.dumps(payload).encode()
+            response.headers.setdefault("Content-Type", "application/json")
+
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_PATCH = do_HEAD = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _error(code: str, message: str) -> dict:
+    return {"error": {"code": code, "message": message}}
+
+
+def _etag_in(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    return header.strip() == "*" or etag in re.findall(r'(?:W/)?("(?:[^"\\]|\\.)*")', header)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import BooleanField, Case, Value, When
+
+from opportunity.eligibility import purchase_eligibility_q
+from opportunity.models import Opportunity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula Opportunity.is_purchase_eligible con la definición de opportunity.eligibility. "
+        "La migración que agrega la columna ya la llena; usar si cambian los criterios de compras "
+        "o después de actualizaciones masivas con queryset.update()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Filas por UPDATE (rangos de id, para no bloquear la tabla completa)")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        eligible = Case(
+            When(purchase_eligibility_q(), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+
+        # Incluye las eliminadas lógicamente, para que el flag sea correcto si se restauran
+        queryset = Opportunity.all_objects.order_by('pk')
+        last_id = queryset.values_list('pk', flat=True).last()
+        if last_id is None:
+            self.stdout.write("No hay oportunidades.")
+            return
+
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            with transaction.atomic():
+                updated += queryset.filter(pk__gte=start, pk__lt=start + batch_size).update(
+                    is_purchase_eligible=eligible
+                )
+
+        total_eligible = Opportunity.all_objects.filter(is_purchase_eligible=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Oportunidades recalculadas: {updated} (elegibles: {total_eligible})"
+        ))
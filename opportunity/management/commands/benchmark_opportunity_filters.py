@@ -0,0 +1,155 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import IntegerField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from catalog.models import Currency, OpportunityType, StatusOpportunity
+from contact.models import Contact
+from core.utils.dates import year_range
+from opportunity.eligibility import purchase_eligibility_q
+from opportunity.models import Opportunity
+from project.models import Project
+
+BENCH_PREFIX = "bench-"
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el filtro por año con función (EXTRACT) contra el rango semiabierto sobre `created` "
+        "en los listados de oportunidades. Opcionalmente siembra oportunidades sintéticas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Número de oportunidades sintéticas a crear antes de medir (ej: 1000000)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--runs', type=int, default=5, help="Repeticiones por consulta")
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--no-explain', action='store_true', help="No imprimir los planes de ejecución")
+        parser.add_argument('--cleanup', action='store_true',
+                            help=f"Borrar las oportunidades sintéticas ('{BENCH_PREFIX}*') y salir")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            self._cleanup()
+            return
+
+        if options['seed']:
+            self._seed(options['seed'], options['batch_size'])
+
+        year = timezone.localdate().year
+        start, end = year_range(year)
+        agent_id = Opportunity.all_objects.values_list('agent_id', flat=True).first()
+        if agent_id is None:
+            raise CommandError("No hay oportunidades; usa --seed para crear datos sintéticos.")
+
+        eligibility = purchase_eligibility_q()
+
+        by_function = Opportunity.objects.alias(created_year=self._extract_year_sql()).filter(created_year=year)
+        by_range = Opportunity.objects.filter(created__gte=start, created__lt=end)
+
+        cases = [
+            ("ALL", by_function, by_range),
+            ("OWNED", by_function.filter(agent_id=agent_id), by_range.filter(agent_id=agent_id)),
+            ("compras", by_function.filter(eligibility), by_range.filter(eligibility)),
+        ]
+
+        total = Opportunity.all_objects.count()
+        self.stdout.write(f"Oportunidades en la tabla: {total} | año: {year} | motor: {connection.vendor}")
+
+        for label, old_qs, new_qs in cases:
+            for variant, qs in (("EXTRACT(año)", old_qs), ("rango", new_qs)):
+                page = qs.order_by('-created', 'id').values_list('id', flat=True)[:options['page_size']]
+                count_ms = self._time(lambda: qs.count(), options['runs'])
+                page_ms = self._time(lambda: list(page), options['runs'])
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"\n[{label}] {variant}: count {count_ms:.1f} ms | primera página {page_ms:.1f} ms (mediana)"
+                ))
+                if not options['no_explain']:
+                    self.stdout.write(self._explain(page))
+
+    def _extract_year_sql(self) -> RawSQL:
+        """
+        EXTRACT(YEAR FROM created) tal cual lo genera el backend. Se arma a mano porque Django
+        convierte `created__year=...` (y ExtractYear con un valor fijo) en un rango.
+        """
+        column = f"{connection.ops.quote_name(Opportunity._meta.db_table)}.{connection.ops.quote_name('created')}"
+        sql, params = connection.ops.datetime_extract_sql('year', column, (), timezone.get_current_timezone_name())
+        return RawSQL(sql, params, output_field=IntegerField())
+
+    def _time(self, func, runs: int) -> float:
+        samples = []
+        for _ in range(max(runs, 1)):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def _explain(self, queryset) -> str:
+        if connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
+
+    def _seed(self, rows: int, batch_size: int):
+        agents = list(User.objects.values_list('id', flat=True)[:50])
+        projects = list(Project.all_objects.values_list('id', flat=True)[:200])
+        contacts = list(Contact.all_objects.values_list('id', flat=True)[:200])
+        statuses = list(StatusOpportunity.all_objects.values_list('id', flat=True))
+        types = list(OpportunityType.all_objects.values_list('id', flat=True))
+        currencies = list(Currency.all_objects.values_list('id', flat=True))
+
+        missing = [name for name, ids in (
+            ("usuarios", agents), ("proyectos", projects), ("contactos", contacts),
+            ("estados de oportunidad", statuses), ("tipos de oportunidad", types),
+        ) if not ids]
+        if missing:
+            raise CommandError(f"Faltan catálogos para sembrar: {', '.join(missing)}")
+
+        rng = random.Random(42)
+        now = timezone.now()
+        run_id = int(time.time())
+        self.stdout.write(f"Sembrando {rows} oportunidades sintéticas...")
+
+        created = 0
+        while created < rows:
+            batch = []
+            for i in range(created, min(created + batch_size, rows)):
+                batch.append(Opportunity(
+                    name=f"{BENCH_PREFIX}{run_id}-{i}",
+                    closing_percentage=Decimal(rng.randint(0, 100)),
+                    amount=Decimal(rng.randint(1_000, 1_000_000)),
+                    status_opportunity_id=rng.choice(statuses),
+                    contact_id=rng.choice(contacts),
+                    currency_id=rng.choice(currencies) if currencies else None,
+                    agent_id=rng.choice(agents),
+                    project_id=rng.choice(projects),
+                    opportunityType_id=rng.choice(types),
+                    created=now - timedelta(days=rng.randint(0, 365 * 3), seconds=rng.randint(0, 86_400)),
+                ))
+            with transaction.atomic():
+                Opportunity.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            self.stdout.write(f"  {created}/{rows}")
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Opportunity._meta.db_table}")
+
+    def _cleanup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Opportunity._meta.db_table} WHERE name LIKE %s",
+                [f"{BENCH_PREFIX}%"],
+            )
+            deleted = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(f"Oportunidades sintéticas borradas: {deleted}"))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from opportunity.fake_graph import FakeGraphServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un servicio local que imita Microsoft Graph / Entra ID (token, sitio, drive, archivos, "
+        "sesiones de carga y $batch) para probar el flujo de documentos sin el tenant de SharePoint. "
+        "Apuntar SHAREPOINT_GRAPH_BASE_URL y SHAREPOINT_AUTHORITY_HOST a la dirección que muestra."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Segundos de espera antes de responder cada petición")
+        parser.add_argument('--throttle-every', type=int, default=0,
+                            help="Responde 429 a una de cada N peticiones (0 = nunca)")
+        parser.add_argument('--throttle-rate', type=float, default=0.0,
+                            help="Probabilidad de responder 429 (0.0 - 1.0)")
+        parser.add_argument('--retry-after', type=int, default=1,
+                            help="Valor del header Retry-After de los 429")
+        parser.add_argument('--drive-name', default='Documentos',
+                            help="Nombre de la biblioteca (debe coincidir con SHAREPOINT_DOC_LIB)")
+
+    def handle(self, *args, **options):
+        server = FakeGraphServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            throttle_every=options['throttle_every'],
+            throttle_rate=options['throttle_rate'],
+            retry_after=options['retry_after'],
+            drive_name=options['drive_name'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Graph local en {server.base_url}"))
+        self.stdout.write(f"  SHAREPOINT_GRAPH_BASE_URL={server.graph_url}")
+        self.stdout.write(f"  SHAREPOINT_AUTHORITY_HOST={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f"Peticiones atendidas: {dict(server.stats)}")
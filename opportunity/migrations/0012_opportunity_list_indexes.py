@@ -0,0 +1,35 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_create_roles_permissions_catalog'),
+        ('client', '0003_client_classification_and_more'),
+        ('contact', '0003_alter_contact_email_alter_historicalcontact_email'),
+        ('opportunity', '0011_historicalopportunity_order_closing_date_and_more'),
+        ('project', '0002_create_roles_permissions_project'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=models.Index(fields=['-created', 'id'], name='opp_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=models.Index(fields=['agent', '-created'], name='opp_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=models.Index(fields=['project', '-created'], name='opp_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunitydocument',
+            index=models.Index(fields=['-uploaded_at'], name='opp_doc_uploaded_idx'),
+        ),
+    ]
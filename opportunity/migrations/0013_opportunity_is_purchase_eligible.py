@@ -0,0 +1,67 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Criterios de compras al crear la columna, copiados de opportunity.eligibility: la migración debe dar
+# el mismo resultado aunque cambien después (para eso está el comando backfill_purchase_eligibility)
+PURCHASE_STATUS_IDS = (4, 5)  # Negociando, Ganada
+PURCHASE_MIN_AMOUNT_BY_CURRENCY = {1: 250000, 2: 13000}  # MN, USD
+PURCHASE_MIN_CLOSING_PERCENTAGE = 80
+
+
+def backfill_purchase_eligibility(apps, schema_editor):
+    """
+    Marca las oportunidades existentes que cumplen los criterios de compras.
+    Por rangos de id para no bloquear la tabla completa; incluye las eliminadas lógicamente.
+    """
+    Opportunity = apps.get_model('opportunity', 'Opportunity')
+    by_amount = models.Q()
+    for currency_id, min_amount in PURCHASE_MIN_AMOUNT_BY_CURRENCY.items():
+        by_amount |= models.Q(currency_id=currency_id, amount__gte=min_amount)
+    eligible = (
+        models.Q(closing_percentage__gte=PURCHASE_MIN_CLOSING_PERCENTAGE)
+        & models.Q(status_opportunity_id__in=PURCHASE_STATUS_IDS)
+        & by_amount
+    )
+
+    queryset = Opportunity._base_manager.using(schema_editor.connection.alias)
+    last_id = queryset.order_by('pk').values_list('pk', flat=True).last()
+    if last_id is None:
+        return
+    for start in range(0, last_id + 1, BACKFILL_BATCH_SIZE):
+        queryset.filter(eligible, pk__gte=start, pk__lt=start + BACKFILL_BATCH_SIZE).update(
+            is_purchase_eligible=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_create_roles_permissions_catalog'),
+        ('client', '0003_client_classification_and_more'),
+        ('contact', '0003_alter_contact_email_alter_historicalcontact_email'),
+        ('opportunity', '0012_opportunity_list_indexes'),
+        ('project', '0002_create_roles_permissions_project'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalopportunity',
+            name='is_purchase_eligible',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Elegible para compras'),
+        ),
+        migrations.AddField(
+            model_name='opportunity',
+            name='is_purchase_eligible',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Elegible para compras'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=models.Index(condition=models.Q(('is_purchase_eligible', True)), fields=['-created', 'id'], name='opp_purchase_eligible_idx'),
+        ),
+        migrations.RunPython(backfill_purchase_eligibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunity', '0013_opportunity_is_purchase_eligible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opportunitydocument',
+            name='pending_delete',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='opportunitydocument',
+            index=models.Index(condition=models.Q(('pending_delete', True)), fields=['id'], name='opp_doc_pending_delete_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunity', '0014_opportunitydocument_pending_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharePointFolder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1000, unique=True)),
+                ('item_id', models.CharField(max_length=255)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Carpeta de SharePoint',
+                'verbose_name_plural': 'Carpetas de SharePoint',
+                'db_table': 'opportunity_sharepoint_folders',
+            },
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
+from django.db.models import Q
 from simple_history.models import HistoricalRecords
 
 from catalog.models import StatusOpportunity, City, Currency, BaseModel, OpportunityType, LostOpportunityType
 from client.models import Client
 from contact.models import Contact
 from project.models import Project
+from opportunity.eligibility import is_purchase_eligible
 from model_utils.models import SoftDeletableModel, TimeStampedModel
 from django.conf import settings
 
@@ -26,6 +28,9 @@ class Opportunity(BaseModel):
     date_status = models.DateTimeField(auto_now_add=True, verbose_name="Fecha del estado")
     order_closing_date = models.DateTimeField(blank=True, null=True, verbose_name="Fecha de cierre de orden")
     number_items = models.IntegerField(blank=True, null=True, verbose_name="Número de partidas")
+    # Se recalcula en save() con opportunity.eligibility; no se edita a mano
+    is_purchase_eligible = models.BooleanField(default=False, editable=False,
+                                               verbose_name="Elegible para compras")
 
     history = HistoricalRecords()
 
@@ -80,10 +85,41 @@ class Opportunity(BaseModel):
         db_table = 'opportunity_opportunities'
         verbose_name = "Oportunidad"
         verbose_name_plural = "Oportunidades"
+        indexes = [
+            # Listado del año en curso ordenado por fecha (alcance ALL y paginación por cursor)
+            models.Index(fields=['-created', 'id'], name='opp_created_idx'),
+            # Alcance OWNED: agente + rango de fechas
+            models.Index(fields=['agent', '-created'], name='opp_agent_created_idx'),
+            # Alcance WORKCELL: se filtra por el proyecto (project__work_cell_id__in)
+            models.Index(fields=['project', '-created'], name='opp_project_created_idx'),
+            # Listado de compras: solo las elegibles, por fecha
+            models.Index(fields=['-created', 'id'], name='opp_purchase_eligible_idx',
+                         condition=Q(is_purchase_eligible=True)),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nombre de carpeta con el que se cargó, para detectar renombres (invalida la caché de carpetas)
+        if 'name' in field_names and 'requisition_number' in field_names:
+            instance._loaded_folder_name = instance.sharepoint_folder_name
+        return instance
+
+    @property
+    def sharepoint_folder_name(self) -> str:
+        """Carpeta de la oportunidad dentro de la del proyecto en SharePoint."""
+        return f"{self.requisition_number}_{self.name}"
+
+    def save(self, *args, **kwargs):
+        self.is_purchase_eligible = is_purchase_eligible(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_purchase_eligible'}
+        super().save(*args, **kwargs)
+
 class CommercialActivity(BaseModel):
     name = models.CharField(unique=True, max_length=100)
     date_scheduled = models.DateTimeField(auto_now_add=True,
@@ -139,6 +175,13 @@ class FinanceOpportunity(BaseModel):
     def __str__(self):
         return f"Finanzas - {self.opportunity.name}"
 
+class OpportunityDocumentManager(models.Manager):
+    """Excluye los documentos en espera de eliminarse de SharePoint."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(pending_delete=False)
+
+
 class OpportunityDocument(models.Model):
     opportunity = models.ForeignKey(
         Opportunity,
@@ -148,11 +191,40 @@ class OpportunityDocument(models.Model):
     file_name = models.CharField(max_length=255)
     sharepoint_url = models.URLField(max_length=1000)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # El archivo se elimina de SharePoint en segundo plano (opportunity.tasks.delete_pending_documents);
+    # mientras tanto el registro ya no aparece en la API y se borra al confirmar la eliminación
+    pending_delete = models.BooleanField(default=False, editable=False)
+
+    objects = OpportunityDocumentManager()
+    all_objects = models.Manager()
 
     class Meta:
         db_table = "opportunity_documents"
         verbose_name = "Documento de oportunidad"
         verbose_name_plural = "Documentos de oportunidad"
+        indexes = [
+            models.Index(fields=['-uploaded_at'], name='opp_doc_uploaded_idx'),
+            # Cola de eliminaciones pendientes (pocas filas)
+            models.Index(fields=['id'], name='opp_doc_pending_delete_idx', condition=Q(pending_delete=True)),
+        ]
+
+    def __str__(self):
+        return self.file_name
+
+class SharePointFolder(models.Model):
+    """
+    Respaldo en base de datos de la caché ruta de carpeta → id de driveItem de SharePoint.
+    La consulta normal se resuelve en Redis (`opportunity.sharepoint.SharePointManager.get_folder_id`);
+    esta tabla conserva los ids si Redis se vacía y permite invalidar por segmento de ruta.
+    """
+    path = models.CharField(max_length=1000, unique=True)
+    item_id = models.CharField(max_length=255)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "opportunity_sharepoint_folders"
+        verbose_name = "Carpeta de SharePoint"
+        verbose_name_plural = "Carpetas de SharePoint"
 
     def __str__(self):
-        return self.file_name
\ No newline at end of file
+        return self.path
@@ -1,20 +1,15 @@
 from rest_framework.permissions import BasePermission
-from users.models import RoleScope
-from users.services.access import resolve_scope
+
+from core.di import injector
+from opportunity.services.opportunity_service import OpportunityService
+
 
 class CanAccessOpportunity(BasePermission):
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.is_superuser:
-            return True
-
-        scope = resolve_scope(user)
-        if scope == RoleScope.ALL:
-            return True
-        if scope == RoleScope.OWNED:
-            return obj.agent_id == user.id
-        if scope == RoleScope.WORKCELL:
-            # evita consultas N+1 si no tienes prefetched: usa IDs
-            return obj.project and obj.project.work_cell and \
-                   obj.project.work_cell.users.filter(id=user.id).exists()
-        return False
+        # Se resuelve en memoria con el perfil de acceso (sin consultar los usuarios de la célula)
+        project = obj.project
+        return injector.get(OpportunityService).check_object_scope(
+            request.user,
+            workcell_id=project.work_cell_id if project else None,
+            owner_id=obj.agent_id,
+        )
@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 from decimal import Decimal
 
@@ -17,6 +18,8 @@ from project.serializers import ProjectSimplifySerializer
 from users.serializers import UserSerializer, UserProfileSimplifySerializer
 from .models import CommercialActivity, FinanceOpportunity, Opportunity, OpportunityDocument
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 class OpportunityDocumentSerializer(serializers.ModelSerializer):
@@ -291,7 +294,7 @@ class OpportunityWriteSerializer(serializers.ModelSerializer):
 
     # NUEVO: Método update personalizado
     def update(self, instance, validated_data):
-        print(f" Actualizando oportunidad {instance.id}: {instance.name}")
+        logger.debug(f"Actualizando oportunidad {instance.id}: {instance.name}")
         
         # Extraer finance_opportunity del validated_data
         finance_data = validated_data.pop('finance_opportunity', None)
@@ -303,11 +306,9 @@ class OpportunityWriteSerializer(serializers.ModelSerializer):
         
         # Manejar finance_opportunity si viene en los datos
         if finance_data:
-            print(f" Procesando finance_data: {finance_data}")
             try:
                 # Intentar obtener FinanceOpportunity existente
                 finance_obj = instance.finance_data
-                print(f" FinanceOpportunity existente encontrado, actualizando...")
                 
                 # Actualizar campos
                 for field, value in finance_data.items():
@@ -315,14 +316,12 @@ class OpportunityWriteSerializer(serializers.ModelSerializer):
                 finance_obj.save()
                 
             except FinanceOpportunity.DoesNotExist:
-                print(f" No existe FinanceOpportunity, creando nuevo...")
-                
                 # Crear nuevo FinanceOpportunity
                 finance_obj = FinanceOpportunity.objects.create(
                     opportunity=instance,
                     **finance_data
                 )
-                print(f" FinanceOpportunity creado: {finance_obj}")
+                logger.debug(f"FinanceOpportunity creado para oportunidad {instance.id}")
                 
         instance.refresh_from_db()
         return instance
@@ -340,7 +339,6 @@ class OpportunityWriteSerializer(serializers.ModelSerializer):
         
         # Crear FinanceOpportunity si viene en los datos
         if finance_data:
-            print(f"🔍 Creando FinanceOpportunity para nueva oportunidad: {finance_data}")
             FinanceOpportunity.objects.create(
                 opportunity=instance,
                 **finance_data
@@ -1,33 +1,73 @@
-from typing import TypeVar
+from typing import Optional, TypeVar
 from django.contrib.auth.models import User
 from django.db.models import QuerySet
+from django.db.models.constants import LOOKUP_SEP
 
 from users.models import RoleScope
-from users.services.access import resolve_scope
+from users.services.access import get_access_profile, resolve_scope
 
 T = TypeVar('T')
 
 
+def _is_multivalued(model, path: str) -> bool:
+    """Indica si el recorrido `path` cruza alguna relación M2M o inversa (puede duplicar filas)."""
+    for name in path.split(LOOKUP_SEP):
+        field = model._meta.get_field(name)
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation:
+            return False
+        model = field.related_model
+    return False
+
+
 class BaseService:
     def add_filter_by_rol(self,
                           user: User,
                           queryset: QuerySet[T],
-                          workcell_filter_field: str = "project__work_cell__users",
+                          workcell_filter_field: str = "project__work_cell",
                           owner_field: str = 'users') -> QuerySet[T]:
         """
         Args:
-            workcell_filter_field: Campo para filtrar por work_cell (ej: "project__work_cell__users")
+            workcell_filter_field: Ruta hasta la célula de trabajo (ej: "project__work_cell").
+                Se filtra por los IDs de célula del perfil de acceso del usuario, sin unir con sus usuarios.
             :param owner_field:  Campo para filtrar por agent by default, but use params for changes
+
+        Las rutas que cruzan relaciones M2M o inversas (ej: "projects__work_cell") se resuelven con un
+        semi-join (`pk__in` subconsulta), así el resultado no trae filas repetidas y no hace falta `.distinct()`.
         """
         scope = resolve_scope(user)
 
         if scope == RoleScope.ALL:
             return queryset
         elif scope == RoleScope.WORKCELL:
-            filter_kwargs = {workcell_filter_field: user}
-            return queryset.filter(**filter_kwargs)
+            workcell_ids = get_access_profile(user)['workcell_ids']
+            return self._filter_path(queryset, f"{workcell_filter_field}_id__in", workcell_filter_field, workcell_ids)
         elif scope == RoleScope.OWNED:
-            filter_owner_kwargs = {owner_field: user}
-            return queryset.filter(**filter_owner_kwargs)
+            return self._filter_path(queryset, owner_field, owner_field, user)
         else:
-            return queryset.none()
\ No newline at end of file
+            return queryset.none()
+
+    @staticmethod
+    def _filter_path(queryset: QuerySet[T], lookup: str, path: str, value) -> QuerySet[T]:
+        if not _is_multivalued(queryset.model, path):
+            return queryset.filter(**{lookup: value})
+        matching = queryset.model._base_manager.filter(**{lookup: value}).values('pk')
+        return queryset.filter(pk__in=matching)
+
+    def check_object_scope(self, user: User, workcell_id: Optional[int], owner_id: Optional[int]) -> bool:
+        """
+        Equivalente en memoria de `add_filter_by_rol` para un objeto ya cargado:
+        recibe la célula y el dueño del objeto y responde sin consultar la base de datos.
+        """
+        if user.is_superuser:
+            return True
+
+        scope = resolve_scope(user)
+        if scope == RoleScope.ALL:
+            return True
+        if scope == RoleScope.OWNED:
+            return owner_id is not None and owner_id == user.id
+        if scope == RoleScope.WORKCELL:
+            return workcell_id is not None and workcell_id in get_access_profile(user)['workcell_ids']
+        return False
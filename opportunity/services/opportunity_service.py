@@ -1,5 +1,4 @@
 import logging
-from datetime import datetime
 from typing import TypeVar
 
 from django.contrib.auth.models import Group, Permission
@@ -8,16 +7,18 @@ from django.db import transaction
 from django.db.models import Prefetch
 from django.db.models import QuerySet
 from django.utils import timezone
-from django_rq import enqueue
 from injector import inject
 from rest_framework.exceptions import ValidationError
 
 from catalog.constants import StatusIDs, StatusPurchaseTypeIDs
 from catalog.models import WorkCell
+from core.utils.dates import year_range
+from core.utils.spool import spool_upload
+from core.utils.transaction_collector import transaction_collector
 from opportunity.models import Opportunity, FinanceOpportunity, OpportunityDocument
 from opportunity.services.base import BaseService
 from opportunity.services.interfaces import AbstractFinanceOpportunityFactory
-from opportunity.tasks import upload_to_sharepoint_db, delete_file_from_sharepoint_db
+from opportunity.tasks import upload_to_sharepoint_db, delete_pending_documents
 from purchase.models import PurchaseStatus
 
 # Si usas un modelo genérico para el queryset
@@ -79,21 +80,24 @@ class OpportunityService(BaseService):
 
     def get_base_documents_queryset(self, user) -> QuerySet[OpportunityDocument]:
 
-        queryset = OpportunityDocument.objects.only('id', 'sharepoint_url')
+        # Las columnas que lee OpportunityDocumentSerializer (un campo diferido es una consulta por fila)
+        queryset = OpportunityDocument.objects.only('id', 'file_name', 'sharepoint_url', 'uploaded_at')
 
         return self.add_filter_by_rol(user, queryset,
-                                      workcell_filter_field="opportunity__project__work_cell__users",
+                                      workcell_filter_field="opportunity__project__work_cell",
                                       owner_field="opportunity__agent"
                                       )
 
     def get_filtered_queryset(self, user):
+        start, end = year_range()
         return self.get_base_queryset(user).filter(
-            created__year=datetime.now().year
+            created__gte=start, created__lt=end
         ).order_by('-created')
 
     def get_filtered_documents_queryset(self, user):
+        start, end = year_range()
         return self.get_base_documents_queryset(user).filter(
-            uploaded_at__year=datetime.now().year
+            uploaded_at__gte=start, uploaded_at__lt=end
         ).order_by('-uploaded_at')
 
     def process_create(self, serializer, request, files=None) -> Opportunity:
@@ -176,19 +180,16 @@ class OpportunityService(BaseService):
             raise ValidationError({"non_field_errors": ["Error al actualizar la oportunidad."]})
 
     def _validate_file(self, file):
-        # 4 MB  TIENE UQE SER HASTA 4 MB PARA ELE ENVÍO A SHAREPOINT, SINO HAY QUE HACER OTRA SOLUCION
-        max_size = 4 * 1024 * 1024
+        # Sin límite de tamaño: los archivos de más de 4 MB se suben por fragmentos
+        # (sesión de carga de Graph, ver SharePointManager.upload_stream)
         allowed_extensions = ('.pdf', '.docx', '.xlsx')
 
-        if file.size > max_size:
-            raise ValidationError({'documento': 'El archivo excede el tamaño permitido (5 MB).'})
-
         if not file.name.lower().endswith(allowed_extensions):
             raise ValidationError({'documento': 'Formato de archivo no permitido.'})
 
     def upload_files_related(self, files, instance: Opportunity):
         if not files:
-            print(" No hay archivos para subir")
+            logger.debug("No hay archivos para subir")
             return
 
         for i, file in enumerate(files):
@@ -198,7 +199,6 @@ class OpportunityService(BaseService):
                 logger.error(f"Archivo {file.name} falló validación: {e}")
                 continue
 
-            file_data = file.read()
             file_name = file.name
             udn_name = (
                     getattr(instance.project, "work_cell", None)
@@ -208,12 +208,14 @@ class OpportunityService(BaseService):
 
             if udn_name:
                 try:
+                    # El job recibe solo la referencia al archivo en staging, no sus bytes
+                    spool_id = spool_upload(file)
                     transaction.on_commit(
                         lambda udn=udn_name,
                                id=instance.id,
-                               f_data=file_data,
+                               s_id=spool_id,
                                f_name=file_name:
-                        enqueue(upload_to_sharepoint_db, udn, id, f_data, f_name)
+                        upload_to_sharepoint_db.delay(udn, id, s_id, f_name)
                     )
                     # upload_to_sharepoint_db(udn_name, instance.id, file_data, file_name)
                     logger.info(f"Subido archivo {file_name}")
@@ -226,11 +228,14 @@ class OpportunityService(BaseService):
                 logger.error(f"No se pudo obtener UDN para {file_name}")
 
     def delete_document(self, document: OpportunityDocument) -> dict:
+        """
+        Marca el documento para eliminación; el archivo se borra de SharePoint en segundo plano
+        (`delete_pending_documents`) y el registro desaparece de la API desde ahora.
+        """
         file_name = document.file_name
 
-        try:
-            delete_file_from_sharepoint_db(document.sharepoint_url, document.id)
-        except Exception as e:
-            logger.error(f" Error al eliminar en SharePoint o en base de datos: {e}")
+        document.pending_delete = True
+        document.save(update_fields=['pending_delete'])
+        transaction_collector.add('sharepoint_document_deletes', delete_pending_documents.delay)
 
-        return {"message": f"Documento '{file_name}' eliminado exitosamente"}
\ No newline at end of file
+        return {"message": f"Documento '{file_name}' eliminado exitosamente"}
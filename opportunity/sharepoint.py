@@ -1,14 +1,27 @@
+import hashlib
+import io
 import logging
+import os
 import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple, Union
 from urllib.parse import urlparse, unquote, quote
 
 import msal
 import requests
 from decouple import config
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from redis.exceptions import ConnectionError as RedisConnectionError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.utils.blob_cache import BlobCache, BlobEntry
+from core.utils.instrumentation import record_sharepoint_response
+from core.utils.metrics import observe_graph_response, observe_graph_throttle
 
 SHAREPOINT_SITE_URL = config("SHAREPOINT_SITE_URL")
 CLIENT_ID = config("SHAREPOINT_CLIENT_ID")
@@ -28,8 +41,50 @@ SHAREPOINT_DOC_LIB = config("SHAREPOINT_DOC_LIB", "Biblioteca de Documentos")
 
 DOC_LIB_DISPLAY_NAME = None  # Ej: "Documentos" o "Shared Documents" si quieres forzar
 
+# Se pueden apuntar a un servicio local (ej: `python manage.py fake_graph_server`) para pruebas sin el tenant real
+GRAPH_BASE_URL = config("SHAREPOINT_GRAPH_BASE_URL", default="https://graph.microsoft.com/v1.0").rstrip("/")
+AUTHORITY_HOST = config("SHAREPOINT_AUTHORITY_HOST", default="https://login.microsoftonline.com").rstrip("/")
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+GRAPH_POOL_SIZE = config("SHAREPOINT_POOL_SIZE", default=10, cast=int)
+GRAPH_MAX_RETRIES = config("SHAREPOINT_MAX_RETRIES", default=4, cast=int)
+GRAPH_BACKOFF_FACTOR = config("SHAREPOINT_BACKOFF_FACTOR", default=0.5, cast=float)
+
+# Compartidos entre workers vía Redis
+TOKEN_CACHE_KEY = "sharepoint:graph_token"
+SITE_DRIVE_CACHE_KEY = "sharepoint:site_drive"
+SITE_DRIVE_CACHE_TIMEOUT = 60 * 60 * 24
+
+GRAPH_BATCH_SIZE = 20  # Máximo de operaciones por petición $batch de Graph
+
+# Subidas: hasta 4 MB un solo PUT; arriba, sesión de carga de Graph por fragmentos.
+# Graph exige fragmentos múltiplos de 320 KiB (máx. 60 MiB) enviados en orden.
+SIMPLE_UPLOAD_MAX_SIZE = 4 * 1024 * 1024
+UPLOAD_CHUNK_UNIT = 320 * 1024
+UPLOAD_CHUNK_SIZE = config("SHAREPOINT_UPLOAD_CHUNK_SIZE", default=16 * UPLOAD_CHUNK_UNIT, cast=int)
+UPLOAD_MAX_RESUMES = config("SHAREPOINT_UPLOAD_MAX_RESUMES", default=5, cast=int)
+UPLOAD_SESSION_CACHE_PREFIX = "sharepoint:upload_session"
+UPLOAD_SESSION_CACHE_TIMEOUT = 60 * 60 * 12
+
+# Caché ruta de carpeta → id de driveItem (Redis, con respaldo en la tabla SharePointFolder)
+FOLDER_CACHE_PREFIX = "sharepoint:folder"
+FOLDER_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+if UPLOAD_CHUNK_SIZE % UPLOAD_CHUNK_UNIT:
+    raise ValueError("SHAREPOINT_UPLOAD_CHUNK_SIZE debe ser múltiplo de 327680 (320 KiB)")
+
 logger = logging.getLogger(__name__)
 
+GRAPH_RETRY_STATUSES = (429, 503)
+
+
+class _GraphRetry(Retry):
+    """Retry de urllib3 que registra cada respuesta 429/503 de Graph (core.utils.metrics)."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and response.status in GRAPH_RETRY_STATUSES:
+            observe_graph_throttle(response.status)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
 
 @dataclass
 class SharePointConfig:
@@ -43,11 +98,55 @@ class SharePointConfig:
 class SharePointManager:
     """
     Gestor centralizado para operaciones de SharePoint usando Microsoft Graph API
+
+    El cliente es de larga vida dentro de cada proceso:
+    - el token se reutiliza hasta `expires_at` y se comparte entre workers (gunicorn, rq) vía Redis;
+    - `site_id` y `drive_id` se resuelven una sola vez (también compartidos vía Redis);
+    - todas las llamadas usan una `requests.Session` con pool de conexiones (keep-alive) y
+      reintentos con backoff ante 429/503 (respetando `Retry-After`).
     """
     _lock = threading.Lock()
     _config: Optional[SharePointConfig] = None
     _token_refresh_buffer = 300  # Renovar 5 minutos antes del vencimiento
 
+    _msal_app: Optional[msal.ConfidentialClientApplication] = None
+    _session: Optional[requests.Session] = None
+    _site_drive: Optional[Tuple[str, str]] = None
+    _blob_cache: Optional[BlobCache] = None
+    _session_lock = threading.Lock()  # Independiente de `_lock`: get_config crea la sesión mientras lo tiene
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Sesión HTTP compartida por el proceso (pool de conexiones + reintentos)."""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    retry = _GraphRetry(
+                        total=GRAPH_MAX_RETRIES,
+                        backoff_factor=GRAPH_BACKOFF_FACTOR,
+                        status_forcelist=GRAPH_RETRY_STATUSES,
+                        allowed_methods=None,  # Graph no procesa la petición cuando responde 429/503
+                        respect_retry_after_header=True,
+                        raise_on_status=False,
+                    )
+                    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=GRAPH_POOL_SIZE)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.hooks["response"].extend([record_sharepoint_response, observe_graph_response])
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def _get_msal_app(cls) -> msal.ConfidentialClientApplication:
+        if cls._msal_app is None:
+            cls._msal_app = msal.ConfidentialClientApplication(
+                client_id=CLIENT_ID,
+                authority=f"{AUTHORITY_HOST}/{TENANT_ID}",
+                client_credential=CLIENT_SEC,
+            )
+        return cls._msal_app
+
     @classmethod
     def get_fresh_token(cls) -> Tuple[str, float]:
         """
@@ -56,12 +155,10 @@ class SharePointManager:
         Returns:
             Tupla (token, expires_at)
         """
-        app = msal.ConfidentialClientApplication(
-            client_id=CLIENT_ID,
-            authority=f"https://login.microsoftonline.com/{TENANT_ID}",
-            client_credential=CLIENT_SEC,
-        )
-        result = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+        if AUTHORITY_HOST.startswith("https://"):
+            result = cls._get_msal_app().acquire_token_for_client(scopes=[GRAPH_SCOPE])
+        else:
+            result = cls._request_client_credentials_token()
 
         if "access_token" not in result:
             raise RuntimeError(f"No se pudo obtener token Graph: {result}")
@@ -70,6 +167,44 @@ class SharePointManager:
         expires_at = time.time() + result.get("expires_in", 3600) - cls._token_refresh_buffer
         return result["access_token"], expires_at
 
+    @classmethod
+    def _request_client_credentials_token(cls) -> dict:
+        """
+        Client credentials (OAuth2) sin MSAL, que solo acepta autoridades https.
+        Se usa cuando SHAREPOINT_AUTHORITY_HOST apunta a un servicio local de pruebas.
+        """
+        response = cls.get_session().post(
+            f"{AUTHORITY_HOST}/{TENANT_ID}/oauth2/v2.0/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": CLIENT_ID,
+                "client_secret": CLIENT_SEC,
+                "scope": GRAPH_SCOPE,
+            },
+            timeout=30,
+        )
+        return response.json()
+
+    @classmethod
+    def _get_shared_token(cls) -> Optional[Tuple[str, float]]:
+        """Token vigente obtenido por otro worker, si existe."""
+        try:
+            cached = cache.get(TOKEN_CACHE_KEY)
+        except RedisConnectionError:
+            logger.warning("Redis no disponible (token SharePoint)")
+            return None
+        if cached and time.time() < cached["expires_at"]:
+            return cached["token"], cached["expires_at"]
+        return None
+
+    @classmethod
+    def _set_shared_token(cls, token: str, expires_at: float) -> None:
+        try:
+            cache.set(TOKEN_CACHE_KEY, {"token": token, "expires_at": expires_at},
+                      timeout=max(int(expires_at - time.time()), 1))
+        except RedisConnectionError:
+            logger.warning("Redis no disponible (token SharePoint)")
+
     @classmethod
     def is_config_valid(cls) -> bool:
         """Verifica si la configuración actual es válida"""
@@ -88,8 +223,8 @@ class SharePointManager:
         Returns:
             ID del sitio
         """
-        url = f"https://graph.microsoft.com/v1.0/sites/{HOSTNAME}:/sites/{SITE_PATH}"
-        response = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        url = f"{GRAPH_BASE_URL}/sites/{HOSTNAME}:/sites/{SITE_PATH}"
+        response = cls.get_session().get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
         response.raise_for_status()
         return response.json()["id"]
 
@@ -106,8 +241,8 @@ class SharePointManager:
         Returns:
             ID del drive
         """
-        url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives"
-        response = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        url = f"{GRAPH_BASE_URL}/sites/{site_id}/drives"
+        response = cls.get_session().get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
         response.raise_for_status()
         drives = response.json().get("value", [])
 
@@ -124,33 +259,58 @@ class SharePointManager:
 
         raise RuntimeError(f"No se encontró drive. Drives disponibles: {[d.get('name') for d in drives]}")
 
+    @classmethod
+    def _get_site_drive(cls, token: str) -> Tuple[str, str]:
+        """(site_id, drive_id): memoria del proceso → Redis → Graph. No cambian mientras exista el sitio."""
+        if cls._site_drive is not None:
+            return cls._site_drive
+
+        try:
+            cached = cache.get(SITE_DRIVE_CACHE_KEY)
+        except RedisConnectionError:
+            cached = None
+        if cached:
+            cls._site_drive = tuple(cached)
+            return cls._site_drive
+
+        site_id = cls.get_site_id(token)
+        drive_id = cls.get_drive_id(token, site_id, SHAREPOINT_DOC_LIB)
+        cls._site_drive = (site_id, drive_id)
+        try:
+            cache.set(SITE_DRIVE_CACHE_KEY, [site_id, drive_id], timeout=SITE_DRIVE_CACHE_TIMEOUT)
+        except RedisConnectionError:
+            logger.warning("Redis no disponible (site/drive SharePoint)")
+        return cls._site_drive
+
     @classmethod
     def get_config(cls, force_refresh: bool = False) -> SharePointConfig:
         """
         Obtiene configuración completa (token, site_id, drive_id) con cache automático
 
         Args:
-            force_refresh: Si True, fuerza renovación de la configuración
+            force_refresh: Si True, fuerza renovación del token (ej: después de un 401)
 
         Returns:
             Configuración de SharePoint
         """
+        if not force_refresh and cls.is_config_valid():
+            return cls._config
+
         with cls._lock:
-            # Si tenemos configuración válida y no se fuerza refresh, devolverla
-            # if not force_refresh and cls.is_config_valid():
-            #     return cls._config
+            # Otro hilo pudo renovarla mientras se esperaba el lock
+            if not force_refresh and cls.is_config_valid():
+                return cls._config
 
             try:
-                logger.info("Renovando configuración de SharePoint...")
-
-                # Obtener nuevo token
-                token, expires_at = cls.get_fresh_token()
-
-                # Obtener site_id y drive_id
-                site_id = cls.get_site_id(token)
-                drive_id = cls.get_drive_id(token, site_id, SHAREPOINT_DOC_LIB)
+                shared = None if force_refresh else cls._get_shared_token()
+                if shared:
+                    token, expires_at = shared
+                else:
+                    logger.info("Renovando token de SharePoint...")
+                    token, expires_at = cls.get_fresh_token()
+                    cls._set_shared_token(token, expires_at)
 
-                # Crear nueva configuración
+                site_id, drive_id = cls._get_site_drive(token)
                 cls._config = SharePointConfig(
                     token=token,
                     site_id=site_id,
@@ -158,7 +318,7 @@ class SharePointManager:
                     expires_at=expires_at
                 )
 
-                logger.info(f"Configuración renovada. Expira en: {(expires_at - time.time()) / 60:.1f} minutos")
+                logger.info(f"Configuración lista. Expira en: {(expires_at - time.time()) / 60:.1f} minutos")
                 return cls._config
 
             except Exception as e:
@@ -173,9 +333,25 @@ class SharePointManager:
         Returns:
             Diccionario con headers de autorización
         """
-        if cls._config is None or cls._config.token is None:
-            SharePointManager.get_config()
-        return {"Authorization": f"Bearer {cls._config.token}"}
+        return {"Authorization": f"Bearer {cls.get_config().token}"}
+
+    @classmethod
+    def request(cls, method: str, url: str, headers: dict = None, timeout: int = 30, **kwargs) -> requests.Response:
+        """
+        Petición autenticada a Graph con la sesión compartida.
+        Si el token fue revocado antes de `expires_at` (401) se renueva y se reintenta una vez.
+        """
+        session = cls.get_session()
+        response = session.request(
+            method, url, headers={**cls.get_auth_headers(), **(headers or {})}, timeout=timeout, **kwargs
+        )
+        if response.status_code == 401:
+            logger.warning("Token de SharePoint rechazado (401), renovando")
+            cls.get_config(force_refresh=True)
+            response = session.request(
+                method, url, headers={**cls.get_auth_headers(), **(headers or {})}, timeout=timeout, **kwargs
+            )
+        return response
 
     @classmethod
     def build_graph_url(cls, path: str, endpoint: str = "") -> str:
@@ -190,7 +366,7 @@ class SharePointManager:
             URL completa de Graph API
         """
         config = cls.get_config()
-        base_url = f"https://graph.microsoft.com/v1.0/sites/{config.site_id}/drives/{config.drive_id}/root"
+        base_url = f"{GRAPH_BASE_URL}/sites/{config.site_id}/drives/{config.drive_id}/root"
 
         if path:
             encoded_path = quote(path, safe="/()!$'*,;=:@&+")
@@ -198,6 +374,69 @@ class SharePointManager:
         else:
             return f"{base_url}{endpoint}"
 
+    @classmethod
+    def build_item_url(cls, item_id: str, child_name: str = "", endpoint: str = "") -> str:
+        """
+        URL de Graph relativa a un driveItem por id (ej: una carpeta ya resuelta).
+        Con `child_name` apunta a un hijo directo: `items/{id}:/{child_name}:{endpoint}`.
+        """
+        config = cls.get_config()
+        base_url = f"{GRAPH_BASE_URL}/sites/{config.site_id}/drives/{config.drive_id}/items/{item_id}"
+        if child_name:
+            encoded_name = quote(child_name, safe="()!$'*,;=:@&+")
+            return f"{base_url}:/{encoded_name}:{endpoint}"
+        return f"{base_url}{endpoint}"
+
+    @classmethod
+    def _upload_url(cls, file_path: str, endpoint: str, parent_id: str = None) -> str:
+        """Destino de una subida: por id de la carpeta si ya se conoce, si no por ruta."""
+        if parent_id:
+            return cls.build_item_url(parent_id, file_path.rsplit("/", 1)[-1], endpoint)
+        return cls.build_graph_url(file_path, endpoint)
+
+    @classmethod
+    def get_folder_id(cls, folder_path: str) -> Optional[str]:
+        """
+        Id del driveItem de una carpeta a partir de su ruta, o None si aún no se conoce.
+        Se busca en Redis y, si no está, en la tabla SharePointFolder (y se vuelve a cachear).
+        """
+        key = _folder_cache_key(folder_path)
+        item_id = _cache_get(key)
+        if item_id:
+            return item_id
+
+        from opportunity.models import SharePointFolder
+        item_id = SharePointFolder.objects.filter(path=folder_path).values_list('item_id', flat=True).first()
+        if item_id:
+            _cache_set(key, item_id, FOLDER_CACHE_TIMEOUT)
+        return item_id
+
+    @classmethod
+    def remember_folder_id(cls, folder_path: str, item_id: str) -> None:
+        from opportunity.models import SharePointFolder
+        SharePointFolder.objects.update_or_create(path=folder_path, defaults={'item_id': item_id})
+        _cache_set(_folder_cache_key(folder_path), item_id, FOLDER_CACHE_TIMEOUT)
+
+    @classmethod
+    def forget_folder_ids(cls, folder_paths) -> None:
+        from opportunity.models import SharePointFolder
+        folder_paths = list(folder_paths)
+        SharePointFolder.objects.filter(path__in=folder_paths).delete()
+        for folder_path in folder_paths:
+            _cache_delete(_folder_cache_key(folder_path))
+
+    @classmethod
+    def forget_folders_with_segment(cls, segment: str) -> None:
+        """
+        Invalida las carpetas cacheadas cuya ruta contiene `segment` como carpeta (y sus subcarpetas).
+        Se usa al renombrar proyectos u oportunidades, cuyo nombre forma parte de la ruta.
+        """
+        from opportunity.models import SharePointFolder
+        paths = SharePointFolder.objects.filter(
+            Q(path__contains=f"/{segment}/") | Q(path__endswith=f"/{segment}") | Q(path=segment)
+        ).values_list('path', flat=True)
+        cls.forget_folder_ids(paths)
+
     @classmethod
     def site_relative_to_library_relative(cls, full_path: str, library_display_hint: str = SHAREPOINT_DOC_LIB) -> str:
         """
@@ -231,32 +470,46 @@ class SharePointManager:
     def upload_file_to_sharepoint(
             cls,
             file_path: str,
-            file_data: bytes,
+            file_data: Union[bytes, BinaryIO],
             replace_existing: bool = True,
-            verify_upload: bool = True
+            verify_upload: bool = True,
+            content_id: str = "",
     ) -> Optional[str]:
         """
         Sube archivo a SharePoint usando Microsoft Graph API
 
+        Hasta SIMPLE_UPLOAD_MAX_SIZE se sube con un solo PUT; los archivos más grandes usan
+        una sesión de carga (`upload_stream`), leyendo el archivo por fragmentos.
+
+        La carpeta destino se direcciona por id (`get_folder_id`) para que Graph no tenga que
+        resolver la ruta completa en cada subida. La primera subida a una carpeta va por ruta
+        (Graph crea las carpetas que falten) y guarda el id de la carpeta padre que devuelve.
+        El id sobrevive a mover o renombrar la carpeta en SharePoint: si la carpeta cacheada ya no
+        existe, o el archivo quedó en otra ruta (`parentReference.path`), el id se olvida y se vuelve
+        a subir por ruta, para que la URL devuelta apunte al archivo. La copia que quedó en la carpeta
+        movida no se borra (pudo reemplazar un archivo que ya estaba ahí).
+
         Args:
             file_path: Ruta del archivo en SharePoint (ej: "users/profile_photos/user_1.jpg")
-            file_data: Contenido binario del archivo
+            file_data: Contenido binario del archivo o archivo abierto en modo binario (con seek)
             replace_existing: Si True, sobrescribe archivos existentes
-            verify_upload: Si True, verifica que el archivo se subió correctamente
+            verify_upload: Si True, verifica que la respuesta de Graph sea el driveItem subido
+            content_id: Huella del contenido (ej: sha256); permite reanudar una sesión de carga previa
 
         Returns:
             URL completa del archivo en SharePoint o None si falla
         """
         try:
-            logger.info(f"Subiendo archivo: {file_path} ({len(file_data)} bytes)")
+            stream = io.BytesIO(file_data) if isinstance(file_data, (bytes, bytearray)) else file_data
+            size = _stream_size(stream)
+            logger.info(f"Subiendo archivo: {file_path} ({size} bytes)")
             full_sharepoint_path = f"{file_path}"
 
-            SharePointManager.get_config()
             # Verificar si existe (si no se permite reemplazar)
             if not replace_existing:
                 try:
                     check_url = cls.build_graph_url(full_sharepoint_path)
-                    check_response = requests.get(check_url, headers=cls.get_auth_headers())
+                    check_response = cls.request("GET", check_url)
                     if check_response.status_code == 200:
                         logger.warning(f"Archivo ya existe: {full_sharepoint_path}")
                         return None
@@ -264,26 +517,41 @@ class SharePointManager:
                     pass  # Continuar si hay error verificando
 
             # Subir archivo
-
-            upload_url = cls.build_graph_url(full_sharepoint_path, "/content")
-            headers = {**cls.get_auth_headers(), 'Content-Type': 'application/octet-stream'}
-
-            upload_response = requests.put(upload_url, headers=headers, data=file_data, timeout=120)
-
-            if upload_response.status_code not in [200, 201]:
-                logger.error(f"Error subiendo: {upload_response.status_code} - {upload_response.text}")
+            folder_path = full_sharepoint_path.rpartition("/")[0]
+            parent_id = cls.get_folder_id(folder_path) if folder_path else None
+            start = stream.tell()
+            item = None
+            if parent_id:
+                try:
+                    item = cls.upload_stream(full_sharepoint_path, stream, size, replace_existing, content_id, parent_id)
+                except requests.HTTPError as e:
+                    logger.warning(f"Subida por id de carpeta falló: {e}")
+                if item is not None and not _same_folder(_parent_path(item), folder_path):
+                    logger.warning(
+                        f"La carpeta cacheada {folder_path} se movió a {_parent_path(item)}; se sube por ruta"
+                    )
+                    item = None
+                if item is None:
+                    logger.info(f"Carpeta cacheada no válida, se sube por ruta: {folder_path}")
+                    cls.forget_folder_ids([folder_path])
+                    parent_id = None
+                    stream.seek(start)
+
+            if item is None:
+                item = cls.upload_stream(full_sharepoint_path, stream, size, replace_existing, content_id)
+            if not item:
                 return None
 
             logger.info("Archivo subido exitosamente")
 
-            # Verificar subida
-            if verify_upload:
-                verify_url = cls.build_graph_url(full_sharepoint_path)
-                verify_response = requests.get(verify_url, headers=cls.get_auth_headers())
-                if verify_response.status_code != 200:
-                    logger.error("Verificación falló: archivo no existe después de subir")
-                    return None
-                logger.info("VERIFICACIÓN: Archivo confirmado en SharePoint")
+            # El PUT / la sesión de carga devuelven el driveItem: no hace falta otro GET para verificar
+            if verify_upload and not item.get("id"):
+                logger.error("Verificación falló: Graph no devolvió el archivo subido")
+                return None
+
+            new_parent_id = (item.get("parentReference") or {}).get("id")
+            if folder_path and new_parent_id and new_parent_id != parent_id:
+                cls.remember_folder_id(folder_path, new_parent_id)
 
             # Construir URL completa
             full_url = f"{SHAREPOINT_SITE_URL}/{SHAREPOINT_DOC_LIB}/{file_path}"
@@ -294,6 +562,129 @@ class SharePointManager:
             logger.exception(f"Error subiendo archivo: {e}")
             return None
 
+    @classmethod
+    def upload_stream(
+            cls,
+            file_path: str,
+            stream: BinaryIO,
+            size: int,
+            replace_existing: bool = True,
+            content_id: str = "",
+            parent_id: str = None,
+    ) -> Optional[dict]:
+        """
+        Sube el contenido de `stream` (binario, con seek) a `file_path`.
+        Con `parent_id` el archivo se direcciona dentro de esa carpeta en lugar de por la ruta completa.
+
+        Returns:
+            driveItem creado/actualizado o None si Graph rechazó la subida
+        """
+        if size <= SIMPLE_UPLOAD_MAX_SIZE:
+            response = cls.request(
+                "PUT", cls._upload_url(file_path, "/content", parent_id),
+                headers={'Content-Type': 'application/octet-stream'}, data=stream.read(), timeout=120,
+            )
+            if response.status_code not in [200, 201]:
+                logger.error(f"Error subiendo: {response.status_code} - {response.text}")
+                return None
+            return response.json()
+
+        return cls._upload_with_session(file_path, stream, size, replace_existing, content_id, parent_id)
+
+    @classmethod
+    def _upload_with_session(cls, file_path, stream, size, replace_existing, content_id, parent_id=None) -> Optional[dict]:
+        """
+        Subida por fragmentos con una sesión de carga de Graph.
+
+        - Cada fragmento (UPLOAD_CHUNK_SIZE) se lee del stream justo antes de enviarse, por lo que
+          la memoria usada no depende del tamaño del archivo.
+        - La URL de la sesión se guarda en Redis: si el job falla y se reintenta, continúa desde el
+          último rango que Graph confirmó (`nextExpectedRanges`) en lugar de empezar de cero.
+        - Ante un error de red o una respuesta inesperada se consulta el estado de la sesión y se
+          reanuda (hasta UPLOAD_MAX_RESUMES veces). 429/503 ya los reintenta la sesión HTTP.
+
+        Graph exige que los fragmentos de una sesión lleguen en orden, así que se envían en serie;
+        el paralelismo se obtiene subiendo varios archivos a la vez (un job por archivo).
+        """
+        session_key = _upload_session_key(file_path, size, content_id)
+        upload_url = _cache_get(session_key)
+        offset = cls._get_upload_offset(upload_url) if upload_url else None
+        if offset is None:
+            upload_url = cls._create_upload_session(file_path, replace_existing, session_key, parent_id)
+            offset = 0
+        else:
+            logger.info(f"Reanudando sesión de carga de {file_path} desde el byte {offset}")
+
+        http = cls.get_session()
+        resumes = 0
+        while True:
+            stream.seek(offset)
+            chunk = stream.read(min(UPLOAD_CHUNK_SIZE, size - offset))
+            end = offset + len(chunk) - 1
+            try:
+                # La uploadUrl ya viene autenticada: no se envía el header Authorization
+                response = http.put(
+                    upload_url, data=chunk, timeout=120,
+                    headers={"Content-Length": str(len(chunk)), "Content-Range": f"bytes {offset}-{end}/{size}"},
+                )
+            except requests.RequestException as e:
+                logger.warning(f"Error de red subiendo {file_path} ({offset}-{end}): {e}")
+                response = None
+
+            if response is not None and response.status_code in (200, 201):
+                _cache_delete(session_key)
+                return response.json()
+
+            if response is not None and response.status_code == 202:
+                offset = _parse_next_offset(response.json().get("nextExpectedRanges"), end + 1)
+                continue
+
+            resumes += 1
+            if resumes > UPLOAD_MAX_RESUMES:
+                status_code = response.status_code if response is not None else "sin respuesta"
+                logger.error(f"Subida de {file_path} abortada tras {UPLOAD_MAX_RESUMES} reintentos ({status_code})")
+                cls._cancel_upload_session(upload_url, session_key)
+                return None
+
+            # 404: la sesión expiró o fue cancelada → se crea otra y se empieza de cero
+            offset = None if response is not None and response.status_code == 404 else cls._get_upload_offset(upload_url)
+            if offset is None:
+                upload_url = cls._create_upload_session(file_path, replace_existing, session_key, parent_id)
+                offset = 0
+            logger.info(f"Reanudando subida de {file_path} desde el byte {offset} (intento {resumes})")
+
+    @classmethod
+    def _create_upload_session(cls, file_path: str, replace_existing: bool, session_key: str,
+                               parent_id: str = None) -> str:
+        behavior = "replace" if replace_existing else "fail"
+        response = cls.request(
+            "POST", cls._upload_url(file_path, "/createUploadSession", parent_id),
+            json={"item": {"@microsoft.graph.conflictBehavior": behavior}},
+        )
+        response.raise_for_status()
+        upload_url = response.json()["uploadUrl"]
+        _cache_set(session_key, upload_url, UPLOAD_SESSION_CACHE_TIMEOUT)
+        return upload_url
+
+    @classmethod
+    def _get_upload_offset(cls, upload_url: str) -> Optional[int]:
+        """Siguiente byte que espera una sesión existente, o None si ya no es válida."""
+        try:
+            response = cls.get_session().get(upload_url, timeout=30)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return _parse_next_offset(response.json().get("nextExpectedRanges"), None)
+
+    @classmethod
+    def _cancel_upload_session(cls, upload_url: str, session_key: str) -> None:
+        _cache_delete(session_key)
+        try:
+            cls.get_session().delete(upload_url, timeout=30)
+        except requests.RequestException as e:
+            logger.warning(f"No se pudo cancelar la sesión de carga: {e}")
+
     @classmethod
     def delete_file_by_path(cls, file_path: str) -> bool:
         """
@@ -307,7 +698,7 @@ class SharePointManager:
         """
         try:
             delete_url = cls.build_graph_url(file_path)
-            delete_response = requests.delete(delete_url, headers=cls.get_auth_headers())
+            delete_response = cls.request("DELETE", delete_url)
 
             if delete_response.status_code in [204, 404]:
                 logger.info(f"Archivo eliminado o no existía: {file_path}")
@@ -323,6 +714,44 @@ class SharePointManager:
             logger.warning(f"Error eliminando {file_path}: {e}")
             return False
 
+    @classmethod
+    def delete_files_by_path(cls, file_paths) -> dict:
+        """
+        Elimina varios archivos combinando los DELETE en peticiones `$batch` de Graph
+        (hasta GRAPH_BATCH_SIZE operaciones por petición).
+
+        Args:
+            file_paths: Rutas relativas a la biblioteca
+
+        Returns:
+            Diccionario {ruta: bool}; True si se eliminó o ya no existía
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        results = {}
+        for start in range(0, len(file_paths), GRAPH_BATCH_SIZE):
+            chunk = file_paths[start:start + GRAPH_BATCH_SIZE]
+            operations = [
+                {"id": str(i), "method": "DELETE", "url": cls.build_graph_url(path)[len(GRAPH_BASE_URL):]}
+                for i, path in enumerate(chunk)
+            ]
+            try:
+                response = cls.request("POST", f"{GRAPH_BASE_URL}/$batch", json={"requests": operations})
+                response.raise_for_status()
+            except Exception as e:
+                logger.warning(f"Error en $batch de eliminación ({len(chunk)} archivos): {e}")
+                results.update({path: False for path in chunk})
+                continue
+
+            statuses = {item["id"]: item.get("status") for item in response.json().get("responses", [])}
+            for i, path in enumerate(chunk):
+                status_code = statuses.get(str(i))
+                results[path] = status_code in (200, 204, 404)
+                if not results[path]:
+                    logger.warning(f"Error eliminando {path}: {status_code}")
+
+        logger.info(f"Eliminados {sum(results.values())}/{len(results)} archivos de SharePoint")
+        return results
+
     @classmethod
     def get_file_content_from_sharepoint(
             cls,
@@ -348,9 +777,9 @@ class SharePointManager:
 
             # Obtener contenido
             content_url = cls.build_graph_url(lib_relative, "/content")
-            headers = {**cls.get_auth_headers(), "Accept": "application/octet-stream"}
+            headers = {"Accept": "application/octet-stream"}
 
-            response = requests.get(content_url, headers=headers, timeout=timeout)
+            response = cls.request("GET", content_url, headers=headers, timeout=timeout)
 
             if response.status_code == 200:
                 # Determinar content type
@@ -384,6 +813,110 @@ class SharePointManager:
             logger.exception(f"Error obteniendo archivo: {e}")
             return None
 
+    @classmethod
+    def open_file_stream(cls, file_url: str, range_header: str = None, if_range: str = None) -> Optional[requests.Response]:
+        """
+        Abre la descarga de un archivo sin leer el cuerpo (`stream=True`), para reenviarlo por fragmentos.
+        Los headers `Range`/`If-Range` se pasan tal cual, así que Graph/SharePoint puede responder 206.
+
+        Args:
+            file_url: URL completa del archivo en SharePoint
+            range_header: Header Range del cliente (ej: "bytes=0-65535")
+            if_range: Header If-Range del cliente
+
+        Returns:
+            Respuesta abierta (el llamador debe cerrarla) o None si el archivo no existe
+        """
+        lib_relative = cls.site_relative_to_library_relative(urlparse(file_url).path, DOC_LIB_DISPLAY_NAME)
+        headers = {}
+        if range_header:
+            headers["Range"] = range_header
+        if if_range:
+            headers["If-Range"] = if_range
+
+        # /content redirige a la URL de descarga prefirmada; requests quita el Authorization en la redirección
+        response = cls.request("GET", cls.build_graph_url(lib_relative, "/content"),
+                               headers=headers, stream=True, timeout=60)
+        if response.status_code == 404:
+            response.close()
+            logger.warning(f"Archivo no encontrado: {lib_relative}")
+            return None
+        return response
+
+    @classmethod
+    def get_blob_cache(cls) -> BlobCache:
+        if cls._blob_cache is None:
+            cls._blob_cache = BlobCache(
+                settings.SHAREPOINT_BLOB_CACHE_DIR, settings.SHAREPOINT_BLOB_CACHE_MAX_BYTES,
+                settings.SHAREPOINT_BLOB_CACHE_MAX_FILE_BYTES,
+            )
+        return cls._blob_cache
+
+    @classmethod
+    def get_cached_file(cls, file_url: str, content_type_prefix: str = "") -> Optional[BlobEntry]:
+        """
+        Obtiene un archivo a través del cache local en disco (pensado para fotos e imágenes).
+
+        - Validada hace menos de SHAREPOINT_BLOB_CACHE_FRESHNESS segundos → se sirve sin red.
+        - Si no, se consultan los metadatos con `If-None-Match: <eTag>`: un 304 (o el mismo eTag)
+          renueva la entrada; un eTag distinto descarga el archivo en streaming y la reemplaza.
+        - Si los metadatos indican otro tipo (`content_type_prefix`) o un tamaño que no cabe en el
+          cache (SHAREPOINT_BLOB_CACHE_MAX_FILE_BYTES), no se descarga: se devuelve una entrada sin
+          `path`, que el llamador rechaza o reenvía con `open_file_stream`.
+
+        Args:
+            file_url: URL completa del archivo en SharePoint
+            content_type_prefix: Tipo esperado (ej: "image/"); vacío acepta cualquiera
+
+        Returns:
+            Entrada del cache (ruta local, eTag, content type) o None si el archivo no existe
+        """
+        lib_relative = cls.site_relative_to_library_relative(urlparse(file_url).path, DOC_LIB_DISPLAY_NAME)
+        blob_cache = cls.get_blob_cache()
+        entry = blob_cache.get(lib_relative)
+        if entry is not None and time.time() - entry.validated_at < settings.SHAREPOINT_BLOB_CACHE_FRESHNESS:
+            return entry
+
+        headers = {"If-None-Match": entry.etag} if entry is not None else {}
+        response = cls.request("GET", cls.build_graph_url(lib_relative), headers=headers)
+        if response.status_code == 304:
+            blob_cache.mark_validated(lib_relative, entry)
+            return entry
+        if response.status_code == 404:
+            logger.warning(f"Archivo no encontrado: {lib_relative}")
+            blob_cache.delete(lib_relative)
+            return None
+        response.raise_for_status()
+
+        item = response.json()
+        etag = item.get("eTag") or item.get("cTag") or ""
+        if entry is not None and entry.etag == etag:
+            blob_cache.mark_validated(lib_relative, entry)
+            return entry
+
+        content_type = (item.get("file") or {}).get("mimeType") or cls.get_content_type_from_extension(
+            Path(lib_relative).suffix[1:]
+        )
+        size = item.get("size")
+        if not content_type.startswith(content_type_prefix) or not blob_cache.fits(size):
+            logger.info(f"Blob cache: no se guarda {lib_relative} ({content_type}, {size} bytes)")
+            if entry is not None:
+                blob_cache.delete(lib_relative)
+            return BlobEntry(path=None, etag=etag, content_type=content_type, size=size or 0,
+                             validated_at=time.time())
+
+        # La downloadUrl viene prefirmada: no lleva header Authorization
+        download_url = item.get("@microsoft.graph.downloadUrl")
+        if download_url:
+            download = cls.get_session().get(download_url, stream=True, timeout=60)
+        else:
+            download = cls.request("GET", cls.build_graph_url(lib_relative, "/content"), stream=True, timeout=60)
+
+        with download:
+            download.raise_for_status()
+            logger.info(f"Blob cache MISS: {lib_relative} ({etag})")
+            return blob_cache.put(lib_relative, etag, content_type, download.iter_content(64 * 1024))
+
     @classmethod
     def get_content_type_from_extension(cls, file_extension: str) -> str:
         """
@@ -435,7 +968,7 @@ class SharePointManager:
         """
         try:
             info_url = cls.build_graph_url(file_path)
-            response = requests.get(info_url, headers=cls.get_auth_headers())
+            response = cls.request("GET", info_url)
 
             if response.status_code == 200:
                 return response.json()
@@ -466,9 +999,9 @@ class SharePointManager:
                 list_url = cls.build_graph_url(folder_path, "/children")
             else:
                 config = cls.get_config()
-                list_url = f"https://graph.microsoft.com/v1.0/sites/{config.site_id}/drives/{config.drive_id}/root/children"
+                list_url = f"{GRAPH_BASE_URL}/sites/{config.site_id}/drives/{config.drive_id}/root/children"
 
-            response = requests.get(list_url, headers=cls.get_auth_headers())
+            response = cls.request("GET", list_url)
 
             if response.status_code == 200:
                 return response.json().get('value', [])
@@ -481,14 +1014,62 @@ class SharePointManager:
             return None
 
 
-def upload_file(folder_path: str, file_name: str, file_data: bytes):
+def _stream_size(stream: BinaryIO) -> int:
+    """Bytes restantes desde la posición actual hasta el final (deja el stream en esa posición)."""
+    start = stream.tell()
+    size = stream.seek(0, os.SEEK_END) - start
+    stream.seek(start)
+    return size
+
+
+def _parse_next_offset(ranges, default):
+    """Inicio del primer rango de `nextExpectedRanges` (ej: ["26214400-"]) o `default`."""
+    if not ranges:
+        return default
+    return int(ranges[0].split("-", 1)[0])
+
+
+def _upload_session_key(file_path: str, size: int, content_id: str = "") -> str:
+    digest = hashlib.sha1(f"{file_path}:{size}:{content_id}".encode()).hexdigest()
+    return f"{UPLOAD_SESSION_CACHE_PREFIX}:{digest}"
+
+
+def _folder_cache_key(folder_path: str) -> str:
+    digest = hashlib.sha1(folder_path.encode()).hexdigest()
+    return f"{FOLDER_CACHE_PREFIX}:{digest}"
+
+
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (get): clave '{key}'")
+        return None
+
+
+def _cache_set(key: str, value, timeout: int) -> None:
+    try:
+        cache.set(key, value, timeout)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (set): clave '{key}'")
+
+
+def _cache_delete(key: str) -> None:
+    try:
+        cache.delete(key)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (delete): clave '{key}'")
+
+
+def upload_file(folder_path: str, file_name: str, file_data: Union[bytes, BinaryIO], content_id: str = ""):
     """
         Sube documento usando la función genérica
 
         Args:
             folder_path: Carpeta destino (ej: "documents/contracts")
             file_name: Nombre del archivo (ej: "contract_2025.pdf")
-            file_data: Contenido binario del archivo
+            file_data: Contenido binario del archivo o archivo abierto en modo binario
+            content_id: Huella del contenido, para reanudar subidas grandes interrumpidas
         """
     try:
         file_path = f"{folder_path}/{file_name}"
@@ -497,7 +1078,8 @@ def upload_file(folder_path: str, file_name: str, file_data: bytes):
             file_path=file_path,
             file_data=file_data,
             replace_existing=True,
-            verify_upload=True
+            verify_upload=True,
+            content_id=content_id,
         )
 
     except Exception as e:
@@ -564,6 +1146,12 @@ def get_content_type_from_extension(file_extension: str) -> str:
 
         return content_type_map.get(file_extension.lower(), 'application/octet-stream')
 
+def document_url_to_path(document_url: str) -> str:
+    """URL completa de SharePoint → ruta relativa a la biblioteca (la que usa Graph)."""
+    full_path = unquote(urlparse(document_url).path)
+    return SharePointManager.site_relative_to_library_relative(full_path, SHAREPOINT_DOC_LIB)
+
+
 def delete_document(document_url: str) -> bool:
     """Elimina documento de perfil de SharePoint usando Microsoft Graph API"""
     try:
@@ -574,15 +1162,8 @@ def delete_document(document_url: str) -> bool:
 
         logger.info(f"Eliminando documento de SharePoint: {document_url}")
 
-        # 1. Procesar la URL para obtener la ruta del archivo
-        parsed = urlparse(document_url)
-        full_path = unquote(parsed.path)
-
-        # 2. Convertir ruta completa a ruta relativa a la biblioteca
-        file_path = SharePointManager.site_relative_to_library_relative(
-            full_path,
-            SHAREPOINT_DOC_LIB
-        )
+        # 1-2. Convertir la URL en ruta relativa a la biblioteca
+        file_path = document_url_to_path(document_url)
 
         logger.info(f"Ruta del archivo a eliminar: {file_path}")
 
@@ -602,3 +1183,20 @@ def delete_document(document_url: str) -> bool:
 
 
 
+
+
+def _parent_path(item: dict) -> Optional[str]:
+    """
+    Ruta de la carpeta de un driveItem relativa a la biblioteca, a partir de `parentReference.path`
+    (ej: "/drives/{id}/root:/COMERCIAL/WORKSPACE" → "COMERCIAL/WORKSPACE"), o None si Graph no la envía.
+    """
+    path = (item.get("parentReference") or {}).get("path")
+    if path is None:
+        return None
+    _, found, relative = path.partition("root:")
+    return unquote(relative).strip("/") if found else None
+
+
+def _same_folder(actual: Optional[str], expected: str) -> bool:
+    # Sin ruta en la respuesta no se puede comparar; SharePoint no distingue mayúsculas en las rutas
+    return actual is None or actual.casefold() == expected.strip("/").casefold()
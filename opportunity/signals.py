@@ -1,141 +1,109 @@
+from functools import partial
+
 from django.apps import apps
-from django.core.cache import cache
-from django.db.models.signals import post_save, post_delete
-from redis.exceptions import ConnectionError as RedisConnectionError
+from django.db.models.signals import post_save
 import logging
 
 from purchase.models import PurchaseStatus
-from catalog.models import PurchaseStatusType
-from catalog.constants import OpportunityFilters, StatusIDs, CurrencyIDs
+from catalog.constants import StatusPurchaseTypeIDs
+from core.utils.transaction_collector import transaction_collector
+from opportunity.sharepoint import SharePointManager
 
 logger = logging.getLogger(__name__)
 
-CATALOG_MODELS = ['Opportunity', 'CommercialActivity']
 APP_NAME = 'opportunity'
 
-def clear_list_cache_for(model_name, prefix="catalog"):
-    try:
-        cache_key = f"{prefix}_{model_name}ViewSet_list"
-
-        print(f"🚨 Intentando invalidar cache: {cache_key}")
-        cache.delete(cache_key)
-        print(f"Cache invalidado: {cache_key}")
-    except RedisConnectionError:
-        logger.warning(f"Redis no disponible (clear cache signal): {model_name}")
 
-def create_purchase_status_if_eligible(opportunity):
+def create_purchase_status_if_eligible(opportunity_id):
     """
-    Crea PurchaseStatus automáticamente si la oportunidad cumple criterios
+    Crea PurchaseStatus automáticamente si la oportunidad cumple criterios.
+    Se ejecuta después del commit, por lo que relee la oportunidad con su estado final.
     """
-    print(f"🔍 === EVALUANDO OPORTUNIDAD {opportunity.id}: {opportunity.name} ===")
-    
+    Opportunity = apps.get_model(APP_NAME, 'Opportunity')
+    opportunity = Opportunity.objects.filter(pk=opportunity_id).first()
+    if opportunity is None:
+        return
+
+    if PurchaseStatus.objects.filter(opportunity_id=opportunity_id).exists():
+        return
+
+    if not opportunity.is_purchase_eligible:
+        logger.debug(f"Oportunidad {opportunity_id} no cumple criterios para PurchaseStatus")
+        return
+
     try:
-        # Verificar si ya tiene PurchaseStatus
-        if hasattr(opportunity, 'purchase_data') and opportunity.purchase_data:
-            print(f"✅ Oportunidad {opportunity.id} YA tiene PurchaseStatus: {opportunity.purchase_data.purchase_status_type.name}")
-            return
+        _, created = PurchaseStatus.objects.get_or_create(
+            opportunity=opportunity,
+            defaults={'purchase_status_type_id': StatusPurchaseTypeIDs.PENDING}
+        )
+        if created:
+            logger.info(f"PurchaseStatus creado automáticamente para oportunidad {opportunity_id}")
     except Exception as e:
-        print(f"🔍 No tiene purchase_data (normal): {e}")
-        pass  # No tiene purchase_data, continuar
-    
-    # ✅ VERIFICAR CRITERIOS DETALLADAMENTE
-    print(f"📊 VERIFICANDO CRITERIOS:")
-    print(f"   - Closing %: {opportunity.closing_percentage} (req: >= {OpportunityFilters.CLOSING_PERCENTAGE})")
-    print(f"   - Status ID: {opportunity.status_opportunity_id} (req: {StatusIDs.NEGOTIATING} o {StatusIDs.WON})")
-    print(f"   - Currency: {opportunity.currency_id}, Amount: {opportunity.amount}")
-    
-    # Verificar criterios uno por uno
-    closing_ok = opportunity.closing_percentage and opportunity.closing_percentage >= OpportunityFilters.CLOSING_PERCENTAGE
-    status_ok = opportunity.status_opportunity_id in [StatusIDs.NEGOTIATING, StatusIDs.WON]
-    
-    amount_ok = False
-    if opportunity.currency_id == CurrencyIDs.USD:
-        amount_ok = opportunity.amount >= OpportunityFilters.AMOUNT_USD
-        print(f"   - Amount USD: {opportunity.amount} >= {OpportunityFilters.AMOUNT_USD} = {amount_ok}")
-    elif opportunity.currency_id == CurrencyIDs.MN:
-        amount_ok = opportunity.amount >= OpportunityFilters.AMOUNT_MN
-        print(f"   - Amount MN: {opportunity.amount} >= {OpportunityFilters.AMOUNT_MN} = {amount_ok}")
-    
-    meets_criteria = closing_ok and status_ok and amount_ok
-    
-    print(f"📊 RESUMEN CRITERIOS:")
-    print(f"   ✅ Closing: {closing_ok}")
-    print(f"   ✅ Status: {status_ok}")
-    print(f"   ✅ Amount: {amount_ok}")
-    print(f"   🎯 CUMPLE TODOS: {meets_criteria}")
-    
-    if meets_criteria:
-        try:
-            print(f"🔄 Intentando crear PurchaseStatus...")
-            
-            # Obtener estado "Pendiente" (ID 1)
-            pending_status = PurchaseStatusType.objects.get(id=1)
-            print(f"✅ Estado pendiente encontrado: {pending_status.name}")
-            
-            # Crear PurchaseStatus
-            purchase_status, created = PurchaseStatus.objects.get_or_create(
-                opportunity=opportunity,
-                defaults={'purchase_status_type': pending_status}
-            )
-            
-            if created:
-                print(f"🎉 PurchaseStatus CREADO automáticamente para: {opportunity.name} (ID: {opportunity.id})")
-            else:
-                print(f"🔍 PurchaseStatus ya existía para: {opportunity.name} (ID: {opportunity.id})")
-                
-        except Exception as e:
-            print(f"❌ Error creando PurchaseStatus para {opportunity.name}: {e}")
-            import traceback
-            traceback.print_exc()
-    else:
-        print(f"❌ Oportunidad {opportunity.id} NO cumple criterios para PurchaseStatus")
-    
-    print(f"🔍 === FIN EVALUACIÓN OPORTUNIDAD {opportunity.id} ===")
+        logger.exception(f"Error creando PurchaseStatus para oportunidad {opportunity_id}: {e}")
+
+
+def schedule_purchase_status(sender, instance, **kwargs):
+    """
+    Encola la evaluación de PurchaseStatus para el commit. Todos los guardados de la misma
+    oportunidad dentro de una transacción se resuelven en una sola evaluación.
+    Las oportunidades no elegibles (flag calculado en save) no encolan nada.
+    """
+    if instance.pk is None or not instance.is_purchase_eligible:
+        return
+    transaction_collector.add(
+        ('purchase_status', instance.pk),
+        partial(create_purchase_status_if_eligible, instance.pk),
+    )
+
+
+def _schedule_folder_invalidation(old_segment):
+    transaction_collector.add(
+        ('sharepoint_folders', old_segment),
+        partial(SharePointManager.forget_folders_with_segment, old_segment),
+    )
+
+
+def invalidate_opportunity_folder(sender, instance, created, **kwargs):
+    """
+    Al renombrar una oportunidad (nombre o número de requisición) se olvidan los ids de sus
+    carpetas de SharePoint cacheados. Solo aplica a instancias cargadas de la base de datos
+    (`Opportunity.from_db` guarda el nombre de carpeta original).
+    """
+    old_segment = getattr(instance, '_loaded_folder_name', None)
+    if created or old_segment is None:
+        return
+    if old_segment != instance.sharepoint_folder_name:
+        _schedule_folder_invalidation(old_segment)
+        instance._loaded_folder_name = instance.sharepoint_folder_name
+
+
+def invalidate_project_folders(sender, instance, created, **kwargs):
+    """Al renombrar un proyecto se olvidan los ids cacheados de su carpeta y las de sus oportunidades."""
+    old_name = getattr(instance, '_loaded_name', None)
+    if created or old_name is None:
+        return
+    if old_name != instance.name:
+        _schedule_folder_invalidation(old_name)
+        instance._loaded_name = instance.name
+
 
 def register_catalog_signals():
-    for model_name in CATALOG_MODELS:
-        model = apps.get_model(APP_NAME, model_name)
-
-        def make_handler(model_name):
-            def handler(sender, **kwargs):
-                print(f"📌 Señal post_save/post_delete activada para {model_name}")
-                
-                if model_name == 'Opportunity':
-                    instance = kwargs.get('instance')
-                    if instance:
-                        print(f"🎯 EJECUTANDO verificación PurchaseStatus para oportunidad {instance.id}...")
-                        create_purchase_status_if_eligible(instance)
-                        
-                        # ✅ LIMPIAR CACHE DE PURCHASES específicamente
-                        purchase_cache_keys = [
-                            "catalog_PurchaseViewSet_list",
-                            "purchase_PurchaseViewSet_list",
-                            "PurchaseViewSet_list"
-                        ]
-                        for key in purchase_cache_keys:
-                            cache.delete(key)
-                            print(f"🗑️ Cache PURCHASE invalidado: {key}")
-                
-                clear_list_cache_for(model_name)
-            return handler
-
-        handler = make_handler(model_name)
-
-        try:
-            # Testea disponibilidad de Redis al momento de registrar señales
-            cache.set("signal_test", "1", timeout=1)
-            post_save.connect(handler, sender=model, weak=False)
-            post_delete.connect(handler, sender=model, weak=False)
-        except RedisConnectionError:
-            logger.warning(f"Redis no disponible al registrar señales para {model_name}. Señales omitidas.")
-        except Exception as e:
-            logger.error(f"Error registrando signals para {model_name}: {e}")
-
-# ✅ SIGNAL ADICIONAL DIRECTO (por si el anterior falla)
-from django.dispatch import receiver
-
-@receiver(post_save, sender=apps.get_model('opportunity', 'Opportunity'))
-def direct_purchase_status_signal(sender, instance, **kwargs):
-    """Signal directo adicional para asegurar que funcione"""
-    print(f"🔥 SIGNAL DIRECTO ejecutado para {instance.name} (ID: {instance.id})")
-    create_purchase_status_if_eligible(instance)
\ No newline at end of file
+    model = apps.get_model(APP_NAME, 'Opportunity')
+    post_save.connect(
+        schedule_purchase_status,
+        sender=model,
+        weak=False,
+        dispatch_uid="opportunity:purchase_status",
+    )
+    post_save.connect(
+        invalidate_opportunity_folder,
+        sender=model,
+        weak=False,
+        dispatch_uid="opportunity:sharepoint_folder",
+    )
+    post_save.connect(
+        invalidate_project_folders,
+        sender=apps.get_model('project', 'Project'),
+        weak=False,
+        dispatch_uid="project:sharepoint_folders",
+    )
@@ -5,22 +5,47 @@ from urllib.parse import urljoin, urlparse
 from decouple import config
 from django_rq import job
 
+from core.utils.jobs import DELETES_QUEUE, UPLOADS_QUEUE, backoff_retry
+from core.utils.spool import open_spooled, release_spooled
 from opportunity.models import OpportunityDocument, Opportunity
-from opportunity.sharepoint import upload_file, delete_document
+from opportunity.sharepoint import SharePointManager, document_url_to_path, upload_file
+from users.models import UserProfile
 
 logger = logging.getLogger(__name__)
 SHAREPOINT_SITE_URL = config("SHAREPOINT_SITE_URL")
 
-@job
-def upload_to_sharepoint_db(udn: str, opportunity_id: int, file_data: bytes, file_name: str):
+@job(UPLOADS_QUEUE, retry=backoff_retry())
+def upload_to_sharepoint_db(udn: str, opportunity_id: int, spool_id: str, file_name: str):
+    """
+    Sube a SharePoint un documento de oportunidad previamente copiado al staging
+    (`core.utils.spool`). El job solo lleva el identificador del archivo; el contenido
+    se lee del disco por fragmentos y el archivo se elimina del staging al terminar.
+
+    Si la subida falla se lanza la excepción para que RQ reintente con backoff; agotados
+    los reintentos el job queda en el registro de fallidos de la cola.
+    """
     try:
         # Hay que volver a obtener el objeto opportunity porque no se puede pasar como parametro el objeto
-        opportunity = Opportunity.objects.get(id=opportunity_id)
+        opportunity = Opportunity.objects.select_related('project').get(id=opportunity_id)
+    except Opportunity.DoesNotExist:
+        logger.warning(f"Oportunidad {opportunity_id} no existe; se descarta la subida de {file_name}")
+        return
+
+    try:
         project_name = opportunity.project.name
         file_name = file_name[:255] # Solo hasta 200 caracteres
-        folder_name = f"COMERCIAL/WORKSPACE/{udn}/{project_name}/{opportunity.requisition_number}_{opportunity.name}"
+        folder_name = f"COMERCIAL/WORKSPACE/{udn}/{project_name}/{opportunity.sharepoint_folder_name}"
+
+        if isinstance(spool_id, bytes):
+            # Jobs encolados antes del staging traen el contenido directamente
+            relative_url = upload_file(folder_name, file_name, spool_id)
+        else:
+            with open_spooled(spool_id) as file_data:
+                relative_url = upload_file(folder_name, file_name, file_data, content_id=spool_id)
+
+        if relative_url is None:
+            raise RuntimeError(f"SharePoint no aceptó el archivo {file_name}")
 
-        relative_url = upload_file(folder_name, file_name, file_data)
         full_url = build_sharepoint_url(SHAREPOINT_SITE_URL, relative_url)
         full_url = quote(full_url, safe=':/')
 
@@ -30,11 +55,14 @@ def upload_to_sharepoint_db(udn: str, opportunity_id: int, file_data: bytes, fil
             sharepoint_url=full_url,
         )
 
+        if not isinstance(spool_id, bytes):
+            release_spooled(spool_id)
+
         logger.info(f"Archivo de oportunidad {opportunity.name} subido a SharePoint en {full_url}")
-        # Aquí podrías registrar la URL en tu modelo si quieres
 
     except Exception as e:
         logger.exception(f"Fallo al subir archivo para oportunidad: {e}")
+        raise
 
 def build_sharepoint_url(base_url: str, relative_url: str) -> str:
     base_path = urlparse(base_url).path.rstrip('/')
@@ -46,14 +74,66 @@ def build_sharepoint_url(base_url: str, relative_url: str) -> str:
     return urljoin(base_url + '/', relative_clean.lstrip('/'))
 
 
-def delete_file_from_sharepoint_db(full_url: str, doc_id):
-    try:
-        result_delete = delete_document(full_url)
-        if result_delete:
-            logger.info(f"Archivo eliminado de SharePoint: {full_url}")
-            OpportunityDocument.objects.filter(id=doc_id).delete()
-            logger.info(f"Registro OpportunityDocument eliminado: ID={doc_id}")
-    except Exception as e:
-        logger.warning(f"Error al eliminar archivo en SharePoint: {e}.")
+@job(DELETES_QUEUE, retry=backoff_retry())
+def delete_pending_documents():
+    """
+    Elimina de SharePoint todos los documentos marcados `pending_delete` y borra sus registros.
+
+    Procesa todo lo pendiente en cada ejecución, así que las eliminaciones que se acumulan
+    mientras el worker está ocupado se combinan en las mismas peticiones `$batch`.
+    Si alguna falla se lanza la excepción para reintentar (las ya eliminadas no se repiten).
+    """
+    documents = list(OpportunityDocument.all_objects.filter(pending_delete=True).only('id', 'sharepoint_url'))
+    if not documents:
+        return
+
+    ids_by_url = {}
+    for document in documents:
+        ids_by_url.setdefault(document.sharepoint_url, []).append(document.id)
+
+    # Un documento vigente puede apuntar al mismo archivo (se volvió a subir con el mismo nombre)
+    live_urls = set(
+        OpportunityDocument.objects.filter(sharepoint_url__in=ids_by_url).values_list('sharepoint_url', flat=True)
+    )
+    urls_by_path = {document_url_to_path(url): url for url in ids_by_url if url not in live_urls}
+    results = SharePointManager.delete_files_by_path(urls_by_path)
+
+    done_urls = live_urls | {urls_by_path[path] for path, deleted in results.items() if deleted}
+    done_ids = [doc_id for url in done_urls for doc_id in ids_by_url.get(url, [])]
+    OpportunityDocument.all_objects.filter(id__in=done_ids).delete()
+    logger.info(f"Documentos eliminados: {len(done_ids)}/{len(documents)}")
+
+    failed = len(documents) - len(done_ids)
+    if failed:
+        raise RuntimeError(f"No se pudieron eliminar {failed} documentos de SharePoint")
+
+
+@job(DELETES_QUEUE, retry=backoff_retry())
+def delete_sharepoint_files(file_paths: list, user_id: int = None):
+    """
+    Elimina archivos de SharePoint por ruta (ej: fotos de perfil reemplazadas), en `$batch`.
+
+    Con `user_id` se omite la foto a la que apunta el perfil al ejecutar el job: pudo volver a
+    subirse con esa extensión después de encolar la limpieza.
 
+    Si algunas rutas se eliminaron, las que fallaron se encolan en un job nuevo (con sus propios
+    reintentos) para no repetir las demás; si no se eliminó ninguna se lanza la excepción para
+    que RQ reintente el mismo job.
+    """
+    if user_id is not None:
+        current_url = UserProfile.objects.filter(user_id=user_id).values_list('photo_sharepoint_url', flat=True).first()
+        if current_url:
+            current_path = document_url_to_path(current_url).strip('/').casefold()
+            file_paths = [path for path in file_paths if path.strip('/').casefold() != current_path]
+    if not file_paths:
+        return
 
+    results = SharePointManager.delete_files_by_path(file_paths)
+    failed = [path for path, deleted in results.items() if not deleted]
+    if not failed:
+        return
+    if len(failed) < len(results):
+        logger.warning(f"Se reintentan solo las rutas que fallaron: {failed}")
+        delete_sharepoint_files.delay(failed, user_id)
+        return
+    raise RuntimeError(f"No se pudieron eliminar de SharePoint: {failed}")
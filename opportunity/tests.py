@@ -1,3 +1,226 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.utils.seed import seed_dataset
+from core.utils.spool import spool_path, spool_upload
+from core.utils.testing import LOCMEM_CACHES
+from opportunity import sharepoint
+from opportunity.fake_graph import FakeGraphServer
+from opportunity.models import Opportunity, OpportunityDocument, SharePointFolder
+from opportunity.sharepoint import SharePointManager
+from opportunity.tasks import delete_sharepoint_files, upload_to_sharepoint_db
+from users.models import UserProfile
+from users.services.sharepoint_profile_service import SharePointProfileService
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FakeGraphTestCase(TestCase):
+    """
+    Ejercita `opportunity.sharepoint` contra el Graph local (`opportunity.fake_graph`):
+    token, sitio/drive, subidas, reintentos, $batch y cache de blobs sin el tenant real.
+    """
+    server_options = {}
+
+    def setUp(self):
+        self.graph = FakeGraphServer(**self.server_options).start()
+        self.addCleanup(self.graph.stop)
+
+        blob_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, blob_dir, True)
+        settings_override = override_settings(SHAREPOINT_BLOB_CACHE_DIR=blob_dir, SHAREPOINT_BLOB_CACHE_FRESHNESS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name, value in (('GRAPH_BASE_URL', self.graph.graph_url), ('AUTHORITY_HOST', self.graph.base_url)):
+            patcher = mock.patch.object(sharepoint, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self._reset_manager()
+        self.addCleanup(self._reset_manager)
+
+    def _reset_manager(self):
+        cache.clear()
+        SharePointManager._config = None
+        SharePointManager._site_drive = None
+        SharePointManager._blob_cache = None
+        if SharePointManager._session is not None:
+            SharePointManager._session.close()
+            SharePointManager._session = None
+
+
+class SharePointUploadTests(FakeGraphTestCase):
+
+    def test_simple_upload_learns_folder_id(self):
+        url = sharepoint.upload_file('COMERCIAL/WORKSPACE/UDN/Proyecto/R1_Opp', 'a.pdf', b'uno')
+        self.assertTrue(url.endswith('/COMERCIAL/WORKSPACE/UDN/Proyecto/R1_Opp/a.pdf'))
+        self.assertTrue(SharePointFolder.objects.filter(path='COMERCIAL/WORKSPACE/UDN/Proyecto/R1_Opp').exists())
+
+        sharepoint.upload_file('COMERCIAL/WORKSPACE/UDN/Proyecto/R1_Opp', 'b.pdf', b'dos')
+        self.assertEqual(self.graph.get_content('COMERCIAL/WORKSPACE/UDN/Proyecto/R1_Opp/b.pdf'), b'dos')
+
+    def test_moved_folder_uploads_by_path(self):
+        sharepoint.upload_file('COMERCIAL/R1_Opp', 'a.pdf', b'uno')
+        old_id = SharePointFolder.objects.get(path='COMERCIAL/R1_Opp').item_id
+        # Alguien renombra la carpeta en SharePoint: el id cacheado ahora apunta a otra ruta
+        self.graph.move('COMERCIAL/R1_Opp', 'COMERCIAL/R1_Opp (viejo)')
+
+        url = sharepoint.upload_file('COMERCIAL/R1_Opp', 'b.pdf', b'dos')
+        self.assertTrue(url.endswith('/COMERCIAL/R1_Opp/b.pdf'))
+        self.assertEqual(self.graph.get_content('COMERCIAL/R1_Opp/b.pdf'), b'dos')
+        self.assertNotEqual(SharePointFolder.objects.get(path='COMERCIAL/R1_Opp').item_id, old_id)
+
+    @mock.patch.object(sharepoint, 'UPLOAD_CHUNK_SIZE', sharepoint.UPLOAD_CHUNK_UNIT)
+    def test_large_upload_uses_session(self):
+        data = os.urandom(sharepoint.SIMPLE_UPLOAD_MAX_SIZE + 12345)
+        with tempfile.TemporaryFile() as file_data:
+            file_data.write(data)
+            file_data.seek(0)
+            self.assertIsNotNone(sharepoint.upload_file('docs', 'grande.bin', file_data, content_id='x'))
+        self.assertEqual(self.graph.get_content('docs/grande.bin'), data)
+
+    def test_revoked_token_is_renewed(self):
+        self.graph.put_content('docs/a.txt', b'hola')
+        self.assertIsNotNone(SharePointManager.get_file_info('docs/a.txt'))
+        self.graph.revoke_tokens()
+        self.assertIsNotNone(SharePointManager.get_file_info('docs/a.txt'))
+
+    def test_batch_delete(self):
+        paths = [f'docs/{i}.txt' for i in range(sharepoint.GRAPH_BATCH_SIZE + 3)]
+        for path in paths:
+            self.graph.put_content(path, b'x')
+
+        results = SharePointManager.delete_files_by_path(paths + ['docs/no-existe.txt'])
+        self.assertTrue(all(results.values()))
+        self.assertIsNone(self.graph.get_content(paths[0]))
+
+
+class OpportunityDocumentUploadTests(FakeGraphTestCase):
+
+    def setUp(self):
+        super().setUp()
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool, True)
+        settings_override = override_settings(UPLOAD_SPOOL_DIR=spool)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        seed_dataset(1, catalog_rows=1)
+        self.opportunity = Opportunity.objects.select_related('project__work_cell__udn').first()
+
+    def test_spooled_file_is_released_after_upload(self):
+        first = spool_upload(SimpleUploadedFile('a.pdf', b'mismo'))
+        second = spool_upload(SimpleUploadedFile('a.pdf', b'mismo'))
+        self.assertNotEqual(first, second)
+
+        udn = self.opportunity.project.work_cell.udn.name
+        upload_to_sharepoint_db(udn, self.opportunity.pk, first, 'a.pdf')
+        self.assertFalse(spool_path(first).exists())
+        # El otro job con el mismo contenido conserva su archivo
+        self.assertTrue(spool_path(second).exists())
+        self.assertTrue(OpportunityDocument.objects.filter(opportunity=self.opportunity, file_name='a.pdf').exists())
+
+
+class SharePointThrottlingTests(FakeGraphTestCase):
+    server_options = {'throttle_every': 3, 'retry_after': 0}
+
+    def test_throttled_requests_are_retried(self):
+        for i in range(5):
+            self.assertIsNotNone(sharepoint.upload_file('docs', f'{i}.txt', b'x'))
+        self.assertGreater(self.graph.stats['throttled'], 0)
+        self.assertEqual(self.graph.get_content('docs/4.txt'), b'x')
+
+
+class ProfilePhotoCleanupTests(FakeGraphTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('agente', 'agente@ferbaq.com', 'x')
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.jpg = f'users/profile_photos/user_{self.user.pk}_profile.jpg'
+        self.png = f'users/profile_photos/user_{self.user.pk}_profile.png'
+
+    def upload(self, extension):
+        with mock.patch.object(delete_sharepoint_files, 'delay', side_effect=delete_sharepoint_files), \
+                self.captureOnCommitCallbacks(execute=True):
+            url = SharePointProfileService.upload_profile_photo(self.user.pk, io.BytesIO(b'foto'), extension)
+            if url:
+                UserProfile.objects.filter(pk=self.profile.pk).update(photo_sharepoint_url=url)
+        return url
+
+    def test_new_photo_replaces_other_extensions(self):
+        self.upload('jpg')
+        self.upload('png')
+        self.assertIsNone(self.graph.get_content(self.jpg))
+        self.assertEqual(self.graph.get_content(self.png), b'foto')
+
+    def test_failed_upload_keeps_previous_photo(self):
+        self.upload('jpg')
+        with mock.patch.object(SharePointManager, 'upload_file_to_sharepoint', return_value=None):
+            self.assertIsNone(self.upload('png'))
+        self.assertEqual(self.graph.get_content(self.jpg), b'foto')
+
+    def test_cleanup_skips_current_photo(self):
+        self.upload('jpg')
+        self.graph.put_content(self.png, b'vieja')
+        delete_sharepoint_files([self.jpg, self.png], self.user.pk)
+        self.assertEqual(self.graph.get_content(self.jpg), b'foto')
+        self.assertIsNone(self.graph.get_content(self.png))
+
+    def test_only_failed_paths_are_retried(self):
+        results = {self.jpg: True, self.png: False}
+        with mock.patch.object(SharePointManager, 'delete_files_by_path', return_value=results), \
+                mock.patch.object(delete_sharepoint_files, 'delay') as delay:
+            delete_sharepoint_files([self.jpg, self.png])
+        delay.assert_called_once_with([self.png], None)
+
+
+class SharePointDownloadTests(FakeGraphTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.graph.put_content('fotos/user_1.jpg', b'0123456789')
+        self.file_url = f"{sharepoint.SHAREPOINT_SITE_URL}/{sharepoint.SHAREPOINT_DOC_LIB}/fotos/user_1.jpg"
+
+    def test_cached_file_revalidates_with_etag(self):
+        entry = SharePointManager.get_cached_file(self.file_url)
+        with open(entry.path, 'rb') as f:
+            self.assertEqual(f.read(), b'0123456789')
+
+        self.assertEqual(SharePointManager.get_cached_file(self.file_url).etag, entry.etag)
+        self.graph.put_content('fotos/user_1.jpg', b'nueva')
+        self.assertNotEqual(SharePointManager.get_cached_file(self.file_url).etag, entry.etag)
+
+    def test_non_image_is_not_downloaded(self):
+        self.graph.put_content('fotos/contrato.pdf', b'%PDF')
+        url = f"{sharepoint.SHAREPOINT_SITE_URL}/{sharepoint.SHAREPOINT_DOC_LIB}/fotos/contrato.pdf"
+        entry = SharePointManager.get_cached_file(url, content_type_prefix='image/')
+        self.assertEqual((entry.path, entry.content_type), (None, 'application/pdf'))
+        self.assertEqual(list(SharePointManager.get_blob_cache().directory.glob('*.bin')), [])
+
+    @override_settings(SHAREPOINT_BLOB_CACHE_MAX_FILE_BYTES=5)
+    def test_oversized_file_is_streamed(self):
+        SharePointManager._blob_cache = None
+        entry = SharePointManager.get_cached_file(self.file_url, content_type_prefix='image/')
+        self.assertEqual((entry.path, entry.size), (None, 10))
+
+        user = User.objects.create_user('agente', 'agente@ferbaq.com', 'x')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/endpoint/users/sharepoint-image/', {'url': self.file_url})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_range_stream(self):
+        response = SharePointManager.open_file_stream(self.file_url, range_header='bytes=2-5')
+        with response:
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.content, b'2345')
@@ -4,10 +4,11 @@ from opportunity.viewsets.opportunity_document_viewsets import OpportunityDocume
 from opportunity.viewsets.opportunity_viewsets import (OpportunityViewSet, CommercialActivityViewSet)
 
 router = DefaultRouter()
-router.register(r'opportunities', OpportunityViewSet, basename='opportunities')
-
+# Antes que 'opportunities': su ruta de detalle (opportunities/<pk>/) también coincide con "documents/"
 router.register(r'opportunities/documents', OpportunityDocumentViewSet, basename='opportunity-documents')
 
+router.register(r'opportunities', OpportunityViewSet, basename='opportunities')
+
 router.register(r'catalog/commercial-activities', CommercialActivityViewSet, basename='commercial-activities')
 
 
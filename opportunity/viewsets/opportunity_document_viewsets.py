@@ -1,17 +1,21 @@
 import logging
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from catalog.viewsets.base import CachedViewSet
 from core.di import injector
+from core.utils.streaming import proxy_streaming_response
 from opportunity.models import OpportunityDocument
 from opportunity.serializers import (OpportunityDocumentSerializer
                                      )
 from opportunity.services.opportunity_service import OpportunityService
+from opportunity.sharepoint import SharePointManager
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +49,7 @@ class OpportunityDocumentViewSet(CachedViewSet):
 
     def get_actives_queryset(self, request):
         user = request.user
-        return self.opportunity_service.get_base_documents_queryset(user).distinct()
+        return self.opportunity_service.get_base_documents_queryset(user)
         
     def destroy(self, request, *args, **kwargs):
         """
@@ -63,5 +67,40 @@ class OpportunityDocumentViewSet(CachedViewSet):
             return Response({"error": "Documento no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
         except Exception as e:
-            print(f" Error al eliminar documento: {e}")
+            logger.exception(f"Error al eliminar documento: {e}")
             return Response({"error": "Error interno del servidor"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, pk=None):
+        """
+        Descarga el archivo desde SharePoint en streaming (sin cargarlo completo en memoria).
+        Reenvía `Range`/`If-Range`, así que los visores de PDF pueden pedir solo las páginas que muestran.
+        URL: GET /api/opportunities/documents/{document_id}/download/
+        """
+        # Cualquier documento al alcance del usuario, no solo los del año en curso
+        queryset = self.opportunity_service.get_base_documents_queryset(request.user)
+        document = get_object_or_404(queryset.only('id', 'file_name', 'sharepoint_url'), pk=pk)
+
+        try:
+            upstream = SharePointManager.open_file_stream(
+                document.sharepoint_url,
+                range_header=request.headers.get('Range'),
+                if_range=request.headers.get('If-Range'),
+            )
+        except Exception as e:
+            logger.error(f"Error abriendo documento {document.id} en SharePoint: {e}")
+            return HttpResponse("Error al obtener el documento", status=status.HTTP_502_BAD_GATEWAY)
+
+        if upstream is None:
+            return HttpResponse("Documento no encontrado", status=status.HTTP_404_NOT_FOUND)
+
+        if upstream.status_code not in (200, 206, 416):
+            logger.error(f"Error Graph API {upstream.status_code} descargando documento {document.id}")
+            upstream.close()
+            return HttpResponse("Error al obtener el documento", status=status.HTTP_502_BAD_GATEWAY)
+
+        content_type = upstream.headers.get('Content-Type')
+        if not content_type or content_type == 'application/octet-stream':
+            extension = document.file_name.rsplit('.', 1)[-1] if '.' in document.file_name else ''
+            content_type = SharePointManager.get_content_type_from_extension(extension)
+        return proxy_streaming_response(upstream, filename=document.file_name, content_type=content_type)
@@ -17,8 +17,6 @@ from opportunity.serializers import (
     CommercialActivitySerializer
 )
 from opportunity.services.opportunity_service import OpportunityService
-from users.models import RoleScope
-from users.services.access import resolve_scope
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +28,7 @@ class OpportunityViewSet(CachedViewSet):
 
     # Configuración específica de Opportunity
     cache_prefix = "opportunity"  # Override del "catalog" por defecto
+    values_serialization = True  # listado serializado desde .values()
 
     # Configuración para invalidaciones automáticas
     write_serializer_class = OpportunityWriteSerializer  # Para invalidaciones automáticas
@@ -58,30 +57,15 @@ class OpportunityViewSet(CachedViewSet):
         if user.is_anonymous and AllowAny in self.permission_classes:
             return obj
 
-        scope = resolve_scope(user)
-        if user.is_superuser or scope == RoleScope.ALL:
+        project = obj.project
+        if self.opportunity_service.check_object_scope(
+            user,
+            workcell_id=project.work_cell_id if project else None,
+            owner_id=obj.agent_id,
+        ):
             return obj
-        if scope == RoleScope.OWNED and obj.agent_id == user.id:
-            return obj
-        if scope == RoleScope.WORKCELL:
-            wc = getattr(getattr(obj, 'project', None), 'work_cell', None)
-            if wc and wc.users.filter(id=user.id).exists():
-                return obj
-        raise PermissionDenied('No tienes permisos para esta oportunidad.')
-
-        # checar permiso equivalente a tu add_filter_by_rol
-        scope = resolve_scope(self.request.user)
-        if self.request.user.is_superuser or scope == RoleScope.ALL:
-            return obj
-        if scope == RoleScope.OWNED and obj.agent_id == self.request.user.id:
-            return obj
-        if scope == RoleScope.WORKCELL:
-            wc = getattr(getattr(obj, 'project', None), 'work_cell', None)
-            if wc and wc.users.filter(id=self.request.user.id).exists():
-                return obj
         raise PermissionDenied('No tienes permisos para esta oportunidad.')
 
-
     def get_queryset(self):
         user = self.request.user
         if getattr(self, 'action', None) == 'list':
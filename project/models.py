@@ -54,3 +54,11 @@ class Project(BaseModel):
 
     def __str__(self):
         return self.description or "Proyecto sin descripción"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nombre con el que se cargó, para detectar renombres (invalida la caché de carpetas de SharePoint)
+        if 'name' in field_names:
+            instance._loaded_name = instance.name
+        return instance
@@ -25,5 +25,5 @@ class ProjectService(AbstractProjectFactory, BaseService):
         )
 
         return self.add_filter_by_rol(user, queryset,
-                                      workcell_filter_field = "work_cell__users",
+                                      workcell_filter_field = "work_cell",
                                       owner_field='work_cell__users')
@@ -13,6 +13,7 @@ class ProjectViewSet(CachedViewSet):
 
     # Configuración específica de Project
     cache_prefix = "project"  # Override del "catalog" por defecto
+    values_serialization = True  # listado serializado desde .values()
 
     # Configuración para invalidaciones automáticas
     write_serializer_class = ProjectWriteSerializer  # Para invalidaciones automáticas
@@ -24,7 +25,7 @@ class ProjectViewSet(CachedViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return self.project_service.get_base_queryset(user).distinct()
+        return self.project_service.get_base_queryset(user)
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:  # Para GET (lista o detalle)
@@ -33,4 +34,4 @@ class ProjectViewSet(CachedViewSet):
 
     def get_actives_queryset(self, request):
         user = request.user
-        return self.project_service.get_base_queryset(user).filter(is_removed=False).distinct()
\ No newline at end of file
+        return self.project_service.get_base_queryset(user).filter(is_removed=False)
\ No newline at end of file
@@ -1,14 +1,13 @@
 import logging
-from datetime import datetime
 
 from django.db.models import Prefetch
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from injector import inject
 from rest_framework.exceptions import ValidationError
 
-from catalog.constants import CurrencyIDs, StatusIDs, OpportunityFilters
 from catalog.models import PurchaseStatusType
-from client.models import Client
+from core.utils.dates import year_range
+from client.services.client_service import get_serialized_clients_queryset
 from opportunity.models import Opportunity
 from opportunity.services.base import BaseService
 from purchase.services.interfaces import AbstractPurchaseOpportunityFactory
@@ -24,28 +23,18 @@ class PurchaseService(BaseService):
         self.purchase_factory = purchase_factory
 
     def get_filtered_queryset(self, user) -> QuerySet:
-        current_year = datetime.now().year
+        start, end = year_range()
 
         base_queryset = self.get_base_optimized_queryset(user)
 
-        filters = Q(created__year=current_year)
-        filters &= Q(closing_percentage__gte=OpportunityFilters.CLOSING_PERCENTAGE)
-        filters &= (
-                Q(currency_id=CurrencyIDs.MN, amount__gte=OpportunityFilters.AMOUNT_MN) |
-                Q(currency_id=CurrencyIDs.USD, amount__gte=OpportunityFilters.AMOUNT_USD)
-        )
-        filters &= (
-                Q(status_opportunity_id=StatusIDs.NEGOTIATING) |
-                Q(status_opportunity_id=StatusIDs.WON)
-        )
-
-        return base_queryset.filter(filters).distinct().order_by('-created')
+        # Elegibilidad materializada (ver opportunity.eligibility): un solo recorrido del índice parcial
+        return base_queryset.filter(
+            is_purchase_eligible=True, created__gte=start, created__lt=end
+        ).order_by('-created')
 
     def get_base_optimized_queryset(self, user):
-        optimized_clients = Prefetch(
-            'contact__clients',
-            queryset=Client.objects.select_related('city', 'business_group')
-        )
+        # ContactSerializer anida ClientSerializer, que a su vez anida los proyectos
+        optimized_clients = Prefetch('contact__clients', queryset=get_serialized_clients_queryset())
 
         optimized_finance = Prefetch(
             'finance_data',
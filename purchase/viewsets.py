@@ -1,3 +1,5 @@
+import logging
+
 from django.db import IntegrityError
 from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
@@ -11,6 +13,8 @@ from opportunity.models import Opportunity
 from purchase.serializers import PurchaseOpportunitySerializer, PurchaseWriteSerializer, PurchaseStatusSerializer
 from purchase.services.purchase_service import PurchaseService
 
+logger = logging.getLogger(__name__)
+
 
 class PurchaseViewSet(CachedViewSet):
     model = Opportunity
@@ -18,6 +22,8 @@ class PurchaseViewSet(CachedViewSet):
 
     # Configuración específica de Purchase
     cache_prefix = "purchase"  # Override del "catalog" por defecto
+    cache_resource = "purchase"  # Ver core.utils.cache_invalidation
+    values_serialization = True  # listado serializado desde .values()
 
     # Configuración para invalidaciones automáticas
     write_serializer_class = PurchaseWriteSerializer  # Para invalidaciones automáticas
@@ -65,5 +71,5 @@ class PurchaseViewSet(CachedViewSet):
                 'non_field_errors': ['Error de integridad en base de datos.']
             })
         except Exception as e:
-            print(e)
+            logger.exception(f"Error actualizando estado de compra: {e}")
             raise APIException('Error interno del servidor.')
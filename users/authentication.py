@@ -0,0 +1,101 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from users.services.access import (
+    ACCESS_STAMP_CLAIM, GROUPS_CLAIM, SCOPE_CLAIM, STAFF_CLAIM, SUPERUSER_CLAIM, WORKCELLS_CLAIM,
+    access_profile_key, access_stamp_key, apply_access_profile, get_access_profile,
+)
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class AccessProfileJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que además carga el perfil de acceso cacheado del usuario
+    (alcance, grupos, células y permisos) antes de que DRF evalúe los permisos.
+    Así `has_perm`, `resolve_scope` y los filtros por célula no consultan la base de datos.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            get_access_profile(result[0])
+        return result
+
+
+class StatelessJWTAuthentication(AccessProfileJWTAuthentication):
+    """
+    Autenticación sin consultas a la base de datos (opcional, JWT_STATELESS_AUTH).
+
+    El usuario se arma con la identidad del access token (ver `add_access_claims`) y el perfil de
+    acceso en Redis (alcance, grupos, células y permisos), leído junto con el sello vigente del
+    usuario (`get_many`, un solo round-trip). El perfil manda sobre los claims de alcance, grupos y
+    células: si el sello se perdió (Redis se vació o lo desalojó), el perfil pudo recalcularse después
+    de un cambio de roles y el token trae los datos anteriores. Los claims solo se usan sin perfil,
+    cuando el sello de Redis coincide con el del token (superusuarios).
+
+    Se vuelve a la autenticación con la base de datos (AccessProfileJWTAuthentication) cuando:
+    - el token no trae los claims (emitido antes de activar el modo);
+    - el sello cambió: se modificaron sus roles, células o permisos, o se desactivó / borró el usuario
+      (ahí JWTAuthentication rechaza el token);
+    - los permisos no están en cache o Redis no está disponible;
+    - para superusuarios (que no necesitan permisos), si no hay en Redis ni su perfil ni un sello
+      igual al del token: tras vaciarse Redis, un token de superusuario degradado o desactivado
+      no debe seguir aceptándose solo por sus claims.
+
+    El usuario tiene cargados solo id, username, is_active, is_superuser e is_staff; el resto de
+    columnas se leen de la base de datos al accederlas y `save()` actualiza solo las columnas cargadas.
+    """
+
+    def get_user(self, validated_token):
+        user = self._user_from_claims(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+        return user
+
+    def _user_from_claims(self, token):
+        if ACCESS_STAMP_CLAIM not in token:
+            return None
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        is_superuser = bool(token.get(SUPERUSER_CLAIM))
+
+        stamp_key, profile_key = access_stamp_key(user_id), access_profile_key(user_id)
+        try:
+            cached = cache.get_many([stamp_key, profile_key])
+        except RedisConnectionError:
+            logger.warning(f"Redis no disponible (StatelessJWTAuthentication) para usuario {user_id}")
+            return None
+
+        stamp = cached.get(stamp_key)
+        if stamp is not None and stamp != token[ACCESS_STAMP_CLAIM]:
+            return None
+        cached_profile = cached.get(profile_key)
+        # Sin perfil, a un superusuario solo lo respalda un sello registrado que coincida
+        if cached_profile is None and (not is_superuser or stamp is None):
+            return None
+
+        loaded = {
+            'id': user_id,
+            'username': token.get('username', ''),
+            'is_active': True,
+            'is_superuser': is_superuser,
+            'is_staff': bool(token.get(STAFF_CLAIM)),
+        }
+        # from_db recibe los valores en el orden de las columnas del modelo; las que faltan quedan diferidas
+        field_names = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+        user = User.from_db(router.db_for_read(User), field_names, [loaded[name] for name in field_names])
+        apply_access_profile(user, cached_profile if cached_profile is not None else {
+            'scope': token[SCOPE_CLAIM],
+            'groups': token[GROUPS_CLAIM],
+            'workcell_ids': token[WORKCELLS_CLAIM],
+            'permissions': [],
+        })
+        return user
@@ -26,6 +26,14 @@ class RolePolicy(models.Model):
     def __str__(self):
         return f'{self.group.name} → {self.scope} (prio={self.priority})'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Grupo con el que se cargó: si la política cambia de grupo, sus miembros también pierden el alcance
+        if 'group_id' in field_names:
+            instance._loaded_group_id = instance.group_id
+        return instance
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.core.exceptions import ValidationError
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -9,8 +11,11 @@ from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import models
 
 from .models import UserProfile
+from .services.access import add_access_claims
+from .services.permissions import get_group_permissions
 
 User = get_user_model()
 
@@ -21,28 +26,45 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
         token['user_id'] = user.id
         token['username'] = user.username
+        # El access token hereda estos claims del refresh (ver StatelessJWTAuthentication)
+        add_access_claims(token, user)
 
         return token
 
-    def get_permissions(user):
+    def get_permissions(user, group_permissions=None):
         """
         Retorna todos los permisos (codenames) asignados al usuario, tanto directos como heredados por grupos.
+        Los de grupo salen de los conjuntos compilados por grupo (users.services.permissions);
+        `group_permissions` ({group_id: frozenset}) permite resolverlos una sola vez para varios usuarios.
+        Si los grupos y los permisos directos están precargados, no consulta la base de datos.
         """
-        all_perms = set()  # usamos set para evitar duplicados
+        all_perms = {perm.codename for perm in user.user_permissions.all()}
 
-        # Permisos heredados por grupos
-        group_perms = user.get_group_permissions()
+        # ModelBackend no devuelve permisos de grupo a usuarios inactivos
+        if user.is_active:
+            group_ids = [group.id for group in user.groups.all()]
+            if group_permissions is None:
+                group_permissions = get_group_permissions(group_ids)
+            for group_id in group_ids:
+                # Normalizamos a codenames: de "app_label.codename" → "codename"
+                all_perms.update(perm.split('.')[-1] for perm in group_permissions[group_id])
 
-        # Permisos asignados directamente
-        direct_perms = user.user_permissions.values_list('codename', flat=True)
+        return list(all_perms)
 
-        # Normalizamos todos a codenames
-        for perm in group_perms:
-            all_perms.add(perm.split('.')[-1])  # de "app_label.codename" → "codename"
-        for codename in direct_perms:
-            all_perms.add(codename)
 
-        return list(all_perms)
+class AccessClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    El access token nuevo copia los claims del refresh, que pueden ser de antes de un cambio de
+    roles o células: se vuelven a calcular para que el token nuevo sirva sin consultar la base de datos.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]})
+        add_access_claims(access, user)
+        data['access'] = str(access)
+        return data
 
 
 class UserWithRolesSerializer(serializers.ModelSerializer):
@@ -81,6 +103,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return None
 
 
+class UserListSerializer(serializers.ListSerializer):
+    """Listados de UserSerializer: resuelve los permisos de todos los grupos de la página en una sola llamada."""
+    group_permissions = None
+
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.group_permissions = get_group_permissions(
+            {group.id for user in users if user.is_active for group in user.groups.all()}
+        )
+        return super().to_representation(users)
+
+
 class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
 
@@ -96,9 +130,14 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email', 'is_active', 'is_superuser', 'profile',
                   'roles', 'permissions', 'workCells']
+        list_serializer_class = UserListSerializer
 
     def get_permissions(self, obj):
-        return MyTokenObtainPairSerializer.get_permissions(obj)
+        # En los listados los grupos y los permisos directos vienen precargados (UserService.get_prefetched_queryset)
+        # y los permisos de sus grupos los resuelve UserListSerializer
+        return MyTokenObtainPairSerializer.get_permissions(
+            obj, group_permissions=getattr(self.parent, 'group_permissions', None)
+        )
 
     def get_workCells(self, obj):
         return [
@@ -131,8 +170,8 @@ class UserWithWorkcellSerializer(serializers.ModelSerializer):
         ]
 
     def get_workcell_count(self, obj):
-        """Cuenta las WorkCells asignadas"""
-        return obj.workcell.count()
+        """Cuenta las WorkCells asignadas (sobre las precargadas, sin otra consulta)"""
+        return len(obj.workcell.all())
 
 
 class UserProfileUpdateSerializer(serializers.ModelSerializer):
@@ -1,8 +1,35 @@
+import logging
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_delete
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.utils.transaction_collector import transaction_collector
 from users.models import RolePolicy, RoleScope
+from users.services.permissions import connect_permission_signals, get_user_permissions, invalidate_group_permissions
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+ACCESS_PROFILE_PREFIX = "access_profile"
+ACCESS_PROFILE_TIMEOUT = 60 * 60 * 12  # 12 horas; se invalida por señales al cambiar roles o células
+ACCESS_STAMP_PREFIX = "access_stamp"
+# Un sello más viejo que la vida del access token ya no puede invalidar ningún token vigente
+ACCESS_STAMP_TIMEOUT = int(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+
+# Claims del access token con el perfil de acceso (ver `add_access_claims`)
+SCOPE_CLAIM = "scope"
+GROUPS_CLAIM = "groups"
+WORKCELLS_CLAIM = "workcells"
+SUPERUSER_CLAIM = "is_superuser"
+STAFF_CLAIM = "is_staff"
+ACCESS_STAMP_CLAIM = "pv"
+
 SCOPE_WEIGHT = {
     RoleScope.NONE: 0,
     RoleScope.OWNED: 1,
@@ -10,7 +37,7 @@ SCOPE_WEIGHT = {
     RoleScope.ALL: 3,
 }
 
-def resolve_scope(user: User) -> str:
+def compute_scope(user: User) -> str:
     """
     Determina el alcance (scope) de acceso a datos para un usuario según las políticas de rol (RolePolicy).
 
@@ -36,6 +63,9 @@ def resolve_scope(user: User) -> str:
     - Controlar el acceso modificando únicamente las políticas en la base de datos, sin tocar código.
     - Establecer un sistema de prioridades para definir qué alcance predomina.
 
+    Consulta la base de datos en cada llamada; normalmente se usa `resolve_scope`,
+    que lee el resultado del perfil de acceso cacheado.
+
     Parámetros:
         user (User): Usuario autenticado.
 
@@ -72,3 +102,221 @@ def resolve_scope(user: User) -> str:
 
     # Retornar el alcance final.
     return best.scope
+
+
+# --- Perfil de acceso cacheado ---
+
+def access_profile_key(user_id) -> str:
+    return f"{ACCESS_PROFILE_PREFIX}:{user_id}"
+
+
+def build_access_profile(user: User) -> dict:
+    """
+    Calcula desde la base de datos todo lo que se consulta en cada petición autenticada:
+    alcance, nombres de grupo, IDs de células y permisos de modelo ("app_label.codename").
+    """
+    from catalog.models import WorkCellUser
+
+    groups = list(user.groups.values_list('id', 'name'))
+    return {
+        'scope': compute_scope(user),
+        'groups': sorted(name for _, name in groups),
+        'workcell_ids': sorted(
+            WorkCellUser.objects.filter(user_id=user.pk).values_list('work_cell_id', flat=True)
+        ),
+        # Los superusuarios no consultan permisos (User.has_perm devuelve True antes).
+        # Los de grupo salen compilados de users.services.permissions
+        'permissions': [] if user.is_superuser else sorted(
+            get_user_permissions(user, group_ids=[group_id for group_id, _ in groups])
+        ),
+    }
+
+
+def apply_access_profile(user: User, profile: dict) -> None:
+    """
+    Memoiza el perfil en la instancia del usuario (vive lo que dura la petición) y precarga
+    las caches internas de ModelBackend para que `has_perm` no consulte la base de datos.
+    """
+    user._access_profile = profile
+    user._group_names = set(profile['groups'])
+    user._workcell_ids = list(profile['workcell_ids'])
+    if not user.is_superuser:
+        # ModelBackend.has_perm consulta este conjunto: búsqueda O(1), sin tocar la base de datos
+        user._perm_cache = frozenset(profile['permissions'])
+
+
+def get_access_profile(user: User) -> dict:
+    """
+    Perfil de acceso del usuario: primero el memo de la petición, después Redis y,
+    si no existe, se calcula y se guarda.
+    """
+    profile = getattr(user, '_access_profile', None)
+    if profile is not None:
+        return profile
+
+    key = access_profile_key(user.pk)
+    try:
+        profile = cache.get(key)
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (get_access_profile) para usuario {user.pk}")
+        profile = None
+
+    if profile is None:
+        profile = build_access_profile(user)
+        try:
+            cache.set(key, profile, timeout=ACCESS_PROFILE_TIMEOUT)
+        except RedisConnectionError:
+            pass
+
+    apply_access_profile(user, profile)
+    return profile
+
+
+def resolve_scope(user: User) -> str:
+    """
+    Alcance de acceso del usuario (ver `compute_scope` para las reglas).
+    Se resuelve desde el perfil de acceso cacheado.
+    """
+    if not user.is_authenticated:
+        return RoleScope.NONE
+    if user.is_superuser:
+        return RoleScope.ALL
+    return get_access_profile(user)['scope']
+
+
+def invalidate_access_profiles(user_ids) -> None:
+    """
+    Descarta el perfil cacheado de los usuarios indicados después del commit,
+    para que ninguna petición concurrente vuelva a cachear datos anteriores.
+    También renueva su sello de acceso: los access tokens emitidos antes dejan de usarse sin estado.
+    """
+    user_ids = frozenset(user_ids)
+    if not user_ids:
+        return
+
+    def _delete():
+        try:
+            # Primero el perfil y después el sello: un token con el sello nuevo solo pudo leer el perfil nuevo
+            cache.delete_many([access_profile_key(user_id) for user_id in user_ids])
+            stamp = time.time_ns()
+            cache.set_many({access_stamp_key(user_id): stamp for user_id in user_ids}, timeout=ACCESS_STAMP_TIMEOUT)
+        except RedisConnectionError:
+            logger.warning(f"Redis no disponible (invalidate_access_profiles): {sorted(user_ids)}")
+
+    transaction_collector.add(('access_profile', user_ids), _delete)
+
+
+# --- Claims del access token (autenticación sin estado) ---
+
+def access_stamp_key(user_id) -> str:
+    return f"{ACCESS_STAMP_PREFIX}:{user_id}"
+
+
+def add_access_claims(token, user: User) -> None:
+    """
+    Agrega al token el perfil de acceso del usuario (alcance, grupos y células) y su sello de acceso,
+    para que `users.authentication.StatelessJWTAuthentication` no consulte la base de datos.
+
+    El sello se lee antes que el perfil: si los permisos cambian en medio, el token queda con el
+    sello anterior y se descarta, nunca con el sello nuevo y datos viejos.
+    """
+    try:
+        stamp = cache.get(access_stamp_key(user.pk))
+    except RedisConnectionError:
+        logger.warning(f"Redis no disponible (add_access_claims) para usuario {user.pk}")
+        stamp = None
+    profile = get_access_profile(user)
+
+    token[SCOPE_CLAIM] = profile['scope']
+    token[GROUPS_CLAIM] = profile['groups']
+    token[WORKCELLS_CLAIM] = profile['workcell_ids']
+    token[SUPERUSER_CLAIM] = user.is_superuser
+    token[STAFF_CLAIM] = user.is_staff
+    # Sin cambios registrados el sello es 0: cualquier cambio posterior lo invalida
+    token[ACCESS_STAMP_CLAIM] = stamp or 0
+
+
+def _group_user_ids(group_ids):
+    return User.groups.through.objects.filter(group_id__in=group_ids).values_list('user_id', flat=True)
+
+
+# --- Señales ---
+
+def _on_user_change(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_access_profiles([instance.pk])
+
+
+def _on_role_policy_change(sender, instance, **kwargs):
+    # Al cambiar de grupo se invalidan los miembros del grupo anterior y los del nuevo
+    group_ids = {instance.group_id, getattr(instance, '_loaded_group_id', None)} - {None}
+    instance._loaded_group_id = instance.group_id
+    invalidate_access_profiles(_group_user_ids(group_ids))
+
+
+def _on_workcell_user_change(sender, instance, **kwargs):
+    invalidate_access_profiles([instance.user_id])
+
+
+def _on_group_delete(sender, instance, **kwargs):
+    # pre_delete: después del borrado ya no se sabe qué usuarios pertenecían al grupo
+    invalidate_access_profiles(_group_user_ids([instance.pk]))
+
+
+def _on_user_m2m_change(sender, instance, action, pk_set, **kwargs):
+    """
+    Cambios en las relaciones M2M del usuario: grupos, permisos directos y células.
+    Según el lado desde el que se haga el cambio, `instance` es el usuario
+    (ej: user.groups.add(...)) o el otro extremo (ej: work_cell.users.add(user)).
+    """
+    if isinstance(instance, User):
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_access_profiles([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_access_profiles(pk_set)
+    elif action == 'pre_clear':
+        # En clear no llega pk_set: se consultan los usuarios antes de borrar las filas
+        field = next(
+            f for f in sender._meta.concrete_fields
+            if f.is_relation and isinstance(instance, f.related_model)
+        )
+        invalidate_access_profiles(
+            sender.objects.filter(**{field.attname: instance.pk}).values_list('user_id', flat=True)
+        )
+
+
+def _on_group_permissions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # permission.group_set.add(...): pk_set son grupos (en clear no se conocen, se usan todos)
+        group_ids = pk_set if pk_set is not None else Group.objects.filter(
+            permissions=instance
+        ).values_list('id', flat=True)
+    else:
+        group_ids = [instance.pk]
+    # Primero los permisos compilados: los perfiles que se recalculen después ya los ven actualizados
+    invalidate_group_permissions()
+    invalidate_access_profiles(_group_user_ids(group_ids))
+
+
+def connect_access_signals():
+    """Conecta las señales que invalidan los perfiles de acceso cacheados."""
+    from catalog.models import WorkCellUser
+
+    post_save.connect(_on_user_change, sender=User, dispatch_uid="access_profile:user")
+    post_delete.connect(_on_user_change, sender=User, dispatch_uid="access_profile:user")
+    post_save.connect(_on_role_policy_change, sender=RolePolicy, dispatch_uid="access_profile:rolepolicy")
+    post_delete.connect(_on_role_policy_change, sender=RolePolicy, dispatch_uid="access_profile:rolepolicy")
+    post_save.connect(_on_workcell_user_change, sender=WorkCellUser, dispatch_uid="access_profile:workcelluser")
+    post_delete.connect(_on_workcell_user_change, sender=WorkCellUser, dispatch_uid="access_profile:workcelluser")
+    pre_delete.connect(_on_group_delete, sender=Group, dispatch_uid="access_profile:group")
+
+    for through in (User.groups.through, User.user_permissions.through, WorkCellUser):
+        m2m_changed.connect(_on_user_m2m_change, sender=through, dispatch_uid=f"access_profile:{through._meta.label_lower}")
+    m2m_changed.connect(
+        _on_group_permissions_change, sender=Group.permissions.through, dispatch_uid="access_profile:group_permissions"
+    )
+    connect_permission_signals()
@@ -0,0 +1,135 @@
+import logging
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.utils.cache import bump_generations, get_generations
+from core.utils.transaction_collector import transaction_collector
+
+logger = logging.getLogger(__name__)
+
+GROUP_PERMISSIONS_PREFIX = "group_permissions"
+GROUP_PERMISSIONS_LABEL = "auth.group_permissions"  # Generación que invalida todos los grupos a la vez
+GROUP_PERMISSIONS_TIMEOUT = 60 * 60 * 12  # 12 horas; las generaciones viejas expiran solas
+
+# Memoria del proceso: {'generation': int, 'groups': {group_id: frozenset("app_label.codename")}}
+_compiled = {'generation': None, 'groups': {}}
+
+
+def group_permissions_key(generation: int, group_id) -> str:
+    return f"{GROUP_PERMISSIONS_PREFIX}:{generation}:{group_id}"
+
+
+def get_group_permissions(group_ids) -> dict:
+    """
+    Permisos de cada grupo como frozenset inmutable de "app_label.codename".
+
+    Cada grupo se compila una sola vez por generación: primero la memoria del proceso, después
+    Redis (una lectura para la generación y otra para los que falten) y, al final, una sola consulta
+    para todos los grupos que falten. Cualquier cambio en `Group.permissions` incrementa la generación
+    y descarta lo compilado en todos los procesos.
+
+    Returns:
+        Diccionario {group_id: frozenset}
+    """
+    global _compiled
+    group_ids = set(group_ids)
+    if not group_ids:
+        return {}
+
+    generation = get_generations([GROUP_PERMISSIONS_LABEL])[GROUP_PERMISSIONS_LABEL]
+    if not generation:
+        # Redis no disponible: no hay forma de saber si la memoria del proceso sigue vigente
+        return _compile(group_ids)
+
+    if _compiled['generation'] != generation:
+        # Se reemplaza el diccionario completo: otro hilo puede seguir leyendo el anterior
+        _compiled = {'generation': generation, 'groups': {}}
+    groups = _compiled['groups']
+
+    missing = group_ids - groups.keys()
+    if missing:
+        keys = {group_permissions_key(generation, group_id): group_id for group_id in missing}
+        try:
+            found = cache.get_many(list(keys))
+        except RedisConnectionError:
+            logger.warning(f"Redis no disponible (get_group_permissions): grupos {sorted(missing)}")
+            found = {}
+        for key, permissions in found.items():
+            groups[keys[key]] = frozenset(permissions)
+
+        missing -= groups.keys()
+        if missing:
+            built = _compile(missing)
+            groups.update(built)
+            try:
+                # En Redis se guardan listas: el serializer del cache es JSON
+                cache.set_many(
+                    {group_permissions_key(generation, group_id): sorted(permissions)
+                     for group_id, permissions in built.items()},
+                    timeout=GROUP_PERMISSIONS_TIMEOUT,
+                )
+            except RedisConnectionError:
+                pass
+
+    return {group_id: groups[group_id] for group_id in group_ids}
+
+
+def get_user_permissions(user, group_ids=None) -> frozenset:
+    """
+    Permisos efectivos del usuario ("app_label.codename"), igual que `ModelBackend.get_all_permissions`:
+    la unión de los conjuntos compilados de sus grupos más sus permisos directos.
+
+    `group_ids` evita consultar los grupos si el llamador ya los tiene. Los permisos directos se leen
+    de `user_permissions` (usa el prefetch si existe). El resultado por usuario se cachea en su perfil
+    de acceso (users.services.access), que se invalida al cambiar `user_permissions` o sus grupos.
+    """
+    if not user.is_active or user.is_anonymous:
+        return frozenset()
+
+    if group_ids is None:
+        group_ids = [group.id for group in user.groups.all()]
+    if 'user_permissions' in getattr(user, '_prefetched_objects_cache', {}):
+        direct = user.user_permissions.all()
+    else:
+        direct = user.user_permissions.select_related('content_type')
+
+    permissions = set().union(*get_group_permissions(group_ids).values())
+    permissions.update(f"{perm.content_type.app_label}.{perm.codename}" for perm in direct)
+    return frozenset(permissions)
+
+
+def _compile(group_ids) -> dict:
+    """Una consulta para todos los grupos; los que no tienen permisos quedan con un frozenset vacío."""
+    permissions = {group_id: set() for group_id in group_ids}
+    rows = Permission.objects.filter(group__in=group_ids).values_list(
+        'group__id', 'content_type__app_label', 'codename'
+    )
+    for group_id, app_label, codename in rows:
+        permissions[group_id].add(f"{app_label}.{codename}")
+    return {group_id: frozenset(codenames) for group_id, codenames in permissions.items()}
+
+
+def invalidate_group_permissions() -> None:
+    """
+    Descarta los permisos compilados de todos los grupos después del commit.
+
+    Los cambios en `Group.permissions` llegan por la señal de users.services.access, que invalida
+    esto antes que los perfiles de acceso: un perfil recalculado entre ambas tareas ya usa los
+    permisos nuevos.
+    """
+    transaction_collector.add(
+        ('group_permissions',), lambda: bump_generations([GROUP_PERMISSIONS_LABEL])
+    )
+
+
+def _on_permission_delete(sender, instance, **kwargs):
+    # El borrado en cascada de las filas intermedias no dispara m2m_changed
+    invalidate_group_permissions()
+
+
+def connect_permission_signals():
+    """Conecta las señales que invalidan los permisos compilados por grupo."""
+    post_delete.connect(_on_permission_delete, sender=Permission, dispatch_uid="group_permissions:permission")
@@ -1,8 +1,11 @@
 import logging
+from functools import partial
 from typing import Optional
-from urllib.parse import urlparse, unquote
 
-from opportunity.sharepoint import SharePointManager, SHAREPOINT_DOC_LIB
+from core.utils.blob_cache import BlobEntry
+from core.utils.transaction_collector import transaction_collector
+from opportunity.sharepoint import SharePointManager, document_url_to_path
+from opportunity.tasks import delete_sharepoint_files
 
 logger = logging.getLogger(__name__)
 
@@ -31,93 +34,67 @@ class SharePointProfileService:
             file_content = photo_file.read()
             file_path = f"users/profile_photos/user_{user_id}_profile.{normalized_extension}"
 
-            # 3. Eliminar fotos anteriores con otras extensiones
-            possible_extensions = ['jpg', 'jpeg', 'png', 'webp']
-            for ext in possible_extensions:
-                if ext != normalized_extension:
-                    old_path = f"users/profile_photos/user_{user_id}_profile.{ext}"
-                    try:
-                        result = SharePointManager.delete_file_by_path(old_path)
-                        if result:
-                            logger.info(f"Foto anterior eliminada: {old_path}")
-                    except Exception as e:
-                        logger.debug(f"No se pudo eliminar {old_path}: {e}")
-
-            # 4. Subir nueva foto usando clase optimizada
-            return SharePointManager.upload_file_to_sharepoint(
+            # 3. Subir nueva foto usando clase optimizada
+            sharepoint_url = SharePointManager.upload_file_to_sharepoint(
                 file_path=file_path,
                 file_data=file_content,
                 replace_existing=True,
                 verify_upload=True
             )
+            if not sharepoint_url:
+                return None
+
+            # 4. Eliminar fotos anteriores con otras extensiones (en segundo plano, un solo $batch).
+            # Solo si la subida funcionó: si falla, el perfil sigue apuntando a la foto anterior
+            possible_extensions = ['jpg', 'jpeg', 'png', 'webp']
+            old_paths = [
+                f"users/profile_photos/user_{user_id}_profile.{ext}"
+                for ext in possible_extensions if ext != normalized_extension
+            ]
+            transaction_collector.add(
+                ('profile_photo_cleanup', user_id), partial(delete_sharepoint_files.delay, old_paths, user_id)
+            )
+            return sharepoint_url
 
         except Exception as e:
             logger.exception(f"Error subiendo foto de perfil: {e}")
             return None
 
     @staticmethod
-    def delete_profile_photo(photo_url: str) -> bool:
-        """Elimina foto de perfil de SharePoint usando Microsoft Graph API"""
+    def delete_profile_photo(photo_url: str, user_id: int = None) -> bool:
+        """
+        Encola la eliminación de la foto de perfil en SharePoint. Con `user_id` el job no la
+        elimina si el perfil vuelve a apuntar a ella cuando se ejecuta.
+        """
         try:
             # Si la URL está vacía o es None, no hay nada que eliminar
             if not photo_url:
                 logger.info("URL vacía, no hay nada que eliminar")
                 return True
 
-            logger.info(f"Eliminando foto de SharePoint: {photo_url}")
-
-            # 1. Procesar la URL para obtener la ruta del archivo
-            parsed = urlparse(photo_url)
-            full_path = unquote(parsed.path)
-
-            # 2. Convertir ruta completa a ruta relativa a la biblioteca
-            file_path = SharePointManager.site_relative_to_library_relative(
-                full_path,
-                SHAREPOINT_DOC_LIB
+            # La eliminación en SharePoint se hace en segundo plano (con reintentos)
+            file_path = document_url_to_path(photo_url)
+            logger.info(f"Eliminación de foto encolada: {file_path}")
+            transaction_collector.add(
+                ('profile_photo_delete', file_path), partial(delete_sharepoint_files.delay, [file_path], user_id)
             )
-
-            logger.info(f"Ruta del archivo a eliminar: {file_path}")
-
-            # 3. Usar metodo optimizado de la clase para eliminar
-            success = SharePointManager.delete_file_by_path(file_path)
-
-            if success:
-                logger.info(f"Foto eliminada exitosamente: {photo_url}")
-                return True
-            else:
-                logger.warning(f"No se pudo eliminar la foto: {photo_url}")
-                # Devolver True porque el objetivo es que no exista
-                return True
+            return True
         except Exception as e:
             logger.warning(f"No se pudo eliminar foto (posiblemente no existe): {e}")
             # Devolver True porque el objetivo (que no exista) se cumplió
             return True
 
     @staticmethod
-    def get_photo_content(photo_url: str) -> Optional[bytes]:
+    def get_cached_photo(photo_url: str) -> Optional[BlobEntry]:
         """
-        Obtiene contenido de foto usando SharePointManager optimizado
+        Obtiene la foto desde el cache local en disco (revalidado contra SharePoint con su eTag)
         """
         try:
-            result = SharePointManager.get_file_content_from_sharepoint(
-                file_url=photo_url,
-                expected_content_type="image",
-                timeout=30
-            )
-
-            if result:
-                content, content_type = result
-                logger.info(f"Foto obtenida: {len(content)} bytes, tipo: {content_type}")
-                return content
-            else:
+            entry = SharePointManager.get_cached_file(photo_url)
+            if entry is None:
                 logger.warning(f"No se pudo obtener foto: {photo_url}")
-                return None
+            return entry
 
         except Exception as e:
             logger.error(f"Error obteniendo foto: {e}")
             return None
-
-
-
-
-
@@ -6,6 +6,15 @@ from users.services.interfaces import AbstractUserFactory
 User = get_user_model()
 
 class UserService(AbstractUserFactory):
+    def get_prefetched_queryset(self):
+        """Usuarios con todo lo que leen UserSerializer y UserWithWorkcellSerializer."""
+        return (
+            User.objects
+            .select_related('profile')
+            .prefetch_related('groups', 'user_permissions', 'workcell')
+            .order_by('id')
+        )
+
     def assign_workcell(self, workcell_id: int, user):
         try:
             workcell = WorkCell.objects.get(pk=workcell_id)
@@ -45,7 +54,7 @@ class UserService(AbstractUserFactory):
         Valida permisos del usuario solicitante.
         """
        # Obtener usuarios no superusuarios
-        return User.objects.filter(is_superuser=False, is_active=True)
+        return self.get_prefetched_queryset().filter(is_superuser=False, is_active=True)
 
     def get_users_with_workcell(self):
         """
@@ -54,4 +63,4 @@ class UserService(AbstractUserFactory):
         """
 
         # Obtener usuarios que tienen WorkCells asignadas
-        return User.objects.filter(is_active=True).prefetch_related('workcell')
+        return self.get_prefetched_queryset().filter(is_active=True)
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.utils.testing import LOCMEM_CACHES
+from core.utils.transaction_collector import transaction_collector
+from users.models import RolePolicy, RoleScope
+from users.services.access import get_access_profile
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AccessProfileInvalidationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.old_group = Group.objects.create(name='gerentes')
+        cls.new_group = Group.objects.create(name='directores')
+        cls.policy = RolePolicy.objects.create(group=cls.old_group, scope=RoleScope.ALL)
+        cls.old_member = User.objects.create_user('gerente', 'gerente@ferbaq.com', 'x')
+        cls.old_member.groups.add(cls.old_group)
+        cls.new_member = User.objects.create_user('director', 'director@ferbaq.com', 'x')
+        cls.new_member.groups.add(cls.new_group)
+
+    def setUp(self):
+        # Las invalidaciones de setUpTestData quedan pendientes (no hay commit): no deben ocultar las del test
+        transaction_collector.flush()
+        cache.clear()
+
+    def scope(self, user):
+        return get_access_profile(User.objects.get(pk=user.pk))['scope']
+
+    def test_policy_moved_to_another_group(self):
+        self.assertEqual(self.scope(self.old_member), RoleScope.ALL)
+        self.assertEqual(self.scope(self.new_member), RoleScope.NONE)
+
+        policy = RolePolicy.objects.get(pk=self.policy.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            policy.group = self.new_group
+            policy.save()
+
+        self.assertEqual(self.scope(self.old_member), RoleScope.NONE)
+        self.assertEqual(self.scope(self.new_member), RoleScope.ALL)
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.utils.testing import LOCMEM_CACHES
+from users.serializers import UserSerializer
+from users.services.access import build_access_profile
+from users.services.permissions import get_group_permissions, get_user_permissions
+from users.services.user_service import UserService
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GroupPermissionsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = Permission.objects.get(codename='view_opportunity')
+        cls.change = Permission.objects.get(codename='change_opportunity')
+        cls.direct = Permission.objects.get(codename='view_client')
+        cls.group = Group.objects.create(name='agentes')
+        cls.group.permissions.add(cls.view)
+        cls.empty_group = Group.objects.create(name='sin permisos')
+        cls.user = User.objects.create_user('agente', 'agente@ferbaq.com', 'x')
+        cls.user.groups.add(cls.group, cls.empty_group)
+        cls.user.user_permissions.add(cls.direct)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compiled_once(self):
+        with self.assertNumQueries(1):
+            compiled = get_group_permissions([self.group.pk, self.empty_group.pk])
+        self.assertEqual(compiled, {
+            self.group.pk: frozenset({'opportunity.view_opportunity'}),
+            self.empty_group.pk: frozenset(),
+        })
+        with self.assertNumQueries(0):
+            self.assertIs(get_group_permissions([self.group.pk])[self.group.pk], compiled[self.group.pk])
+
+    def test_group_permissions_change_invalidates(self):
+        get_group_permissions([self.group.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.change)
+
+        self.assertEqual(get_group_permissions([self.group.pk])[self.group.pk], frozenset({
+            'opportunity.view_opportunity', 'opportunity.change_opportunity',
+        }))
+
+    def test_user_permissions_match_model_backend(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(get_user_permissions(user), user.get_all_permissions())
+        self.assertEqual(build_access_profile(user)['permissions'], sorted(user.get_all_permissions()))
+
+    def test_serialized_users_without_queries_per_user(self):
+        users = list(UserService().get_prefetched_queryset().filter(pk=self.user.pk))
+        get_group_permissions([self.group.pk, self.empty_group.pk])
+        with self.assertNumQueries(0):
+            permissions = UserSerializer(users[0]).data['permissions']
+        self.assertEqual(sorted(permissions), ['view_client', 'view_opportunity'])
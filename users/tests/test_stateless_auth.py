@@ -0,0 +1,96 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from catalog.models import UDN, WorkCell
+from core.utils.testing import LOCMEM_CACHES
+from users.authentication import StatelessJWTAuthentication
+from users.models import RolePolicy, RoleScope
+from users.serializers import AccessClaimsTokenRefreshSerializer, MyTokenObtainPairSerializer
+from users.services.access import access_profile_key, access_stamp_key
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StatelessJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='agentes')
+        cls.group.permissions.add(Permission.objects.get(codename='view_opportunity'))
+        RolePolicy.objects.create(group=cls.group, scope=RoleScope.OWNED)
+        cls.user = User.objects.create_user('agente', 'agente@ferbaq.com', 'x')
+        cls.user.groups.add(cls.group)
+        cls.workcell = WorkCell.objects.create(name='Célula', udn=UDN.objects.create(name='UDN'))
+
+    def setUp(self):
+        cache.clear()
+        self.refresh = MyTokenObtainPairSerializer.get_token(self.user)
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {token}")
+        user, _ = StatelessJWTAuthentication().authenticate(request)
+        return user
+
+    def test_user_from_claims_without_queries(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate(self.refresh.access_token)
+            self.assertEqual((user.pk, user.username, user.is_active), (self.user.pk, 'agente', True))
+            self.assertEqual(user._access_profile['scope'], RoleScope.OWNED)
+            self.assertEqual(user._group_names, {'agentes'})
+            self.assertTrue(user.has_perm('opportunity.view_opportunity'))
+            self.assertFalse(user.has_perm('opportunity.change_opportunity'))
+        # Las columnas que no vienen en el token se cargan al usarlas
+        self.assertEqual(user.email, 'agente@ferbaq.com')
+
+    def test_cached_profile_overrides_token_claims(self):
+        # Sin sello (Redis lo desalojó) y con un perfil recalculado tras quitarle el rol al usuario
+        cache.delete(access_stamp_key(self.user.pk))
+        profile = cache.get(access_profile_key(self.user.pk))
+        cache.set(access_profile_key(self.user.pk), {**profile, 'scope': RoleScope.NONE, 'groups': []})
+
+        user = self.authenticate(self.refresh.access_token)
+        self.assertEqual(user._access_profile['scope'], RoleScope.NONE)
+        self.assertEqual(user._group_names, set())
+
+    def test_superuser_needs_cached_profile_or_stamp(self):
+        admin = User.objects.create_superuser('admin', 'admin@ferbaq.com', 'x')
+        access = MyTokenObtainPairSerializer.get_token(admin).access_token
+        with self.assertNumQueries(0):
+            self.assertTrue(self.authenticate(access).is_superuser)
+
+        # Redis se vació: ni perfil ni sello respaldan los claims del token
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(self.authenticate(access).is_superuser)
+        self.assertTrue(captured.captured_queries)
+
+    def test_access_change_falls_back_to_database(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.workcell.add(self.workcell)
+
+        with CaptureQueriesContext(connection) as captured:
+            user = self.authenticate(self.refresh.access_token)
+        self.assertTrue(captured.captured_queries)
+        self.assertEqual(user._workcell_ids, [self.workcell.pk])
+
+    def test_inactive_user_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.refresh.access_token)
+
+    def test_refresh_issues_current_claims(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.workcell.add(self.workcell)
+
+        serializer = AccessClaimsTokenRefreshSerializer(data={'refresh': str(self.refresh)})
+        serializer.is_valid(raise_exception=True)
+        with self.assertNumQueries(0):
+            user = self.authenticate(serializer.validated_data['access'])
+        self.assertEqual(user._workcell_ids, [self.workcell.pk])
@@ -16,7 +16,9 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from catalog.models import WorkCell
 from catalog.viewsets.base import CachedViewSet
 from core.di import injector
-from opportunity.sharepoint import fetch_sharepoint_file
+from core.utils.blob_cache import blob_response
+from core.utils.streaming import proxy_streaming_response
+from opportunity.sharepoint import SharePointManager
 from users.serializers import (
     UserSerializer, UserWithWorkcellSerializer, UserProfileUpdateSerializer,
     ProfilePhotoUploadSerializer, PasswordChangeSerializer, PasswordResetRequestSerializer,
@@ -49,6 +51,13 @@ class UserViewSet(CachedViewSet):
     def user_service(self) -> UserService:
         return injector.get(UserService)
 
+    def get_optimized_queryset(self):
+        return self.user_service.get_prefetched_queryset()
+
+    def get_actives_queryset(self, request):
+        # User no es SoftDeletableModel: "activos" son los que pueden iniciar sesión
+        return self.user_service.get_prefetched_queryset().filter(is_active=True)
+
     @action(detail=False, methods=['get'], url_path='non-superusers')
     def non_superusers(self, request):
         """
@@ -208,7 +217,7 @@ class UserViewSet(CachedViewSet):
             )
 
         # Eliminar de SharePoint
-        deleted = SharePointProfileService.delete_profile_photo(profile.photo_sharepoint_url)
+        deleted = SharePointProfileService.delete_profile_photo(profile.photo_sharepoint_url, request.user.id)
 
         if deleted:
             profile.photo_sharepoint_url = None
@@ -233,25 +242,15 @@ class UserViewSet(CachedViewSet):
             # Construir URL completa del archivo
             photo_url = f"{SHAREPOINT_SITE_URL}/{SHAREPOINT_DOC_LIB}/users/profile_photos/{filename}"
 
-            if photo_url:
-                # Obtener el archivo de SharePoint
-                photo_content = SharePointProfileService.get_photo_content(photo_url)
-
-                content_type = 'image/jpeg'
-                if photo_content:
-                    if filename.lower().endswith('.png'):
-                        content_type = 'image/png'
-                    elif filename.lower().endswith('.webp'):
-                        content_type = 'image/webp'
-                    elif filename.lower().endswith('.gif'):
-                        content_type = 'image/gif'
-
-                response = HttpResponse(photo_content, content_type=content_type)
-                response['Cache-Control'] = 'max-age=3600'  # Cache por 1 hora
-                response['Access-Control-Allow-Origin'] = '*'  # Para CORS
-                return response
-            else:
+            # Obtener el archivo del cache local (revalidado contra SharePoint)
+            photo = SharePointProfileService.get_cached_photo(photo_url)
+            if photo is None:
                 return self.serve_default_avatar()
+
+            # 304 si el navegador ya tiene esta versión (ETag)
+            response = blob_response(request, photo, 'max-age=3600')  # Cache por 1 hora
+            response['Access-Control-Allow-Origin'] = '*'  # Para CORS
+            return response
                 
         except Exception as e:
             logger.exception(f"Error en proxy de foto: {e}")
@@ -355,16 +354,24 @@ class UserViewSet(CachedViewSet):
             return HttpResponse("URL is required", status=400)
 
         try:
-            blob, content_type = fetch_sharepoint_file(url)
+            image = SharePointManager.get_cached_file(url, content_type_prefix="image/")
+            if image is None:
+                return HttpResponse("Imagen no encontrada", status=404)
 
-            # Validar que sea imagen
-            if not content_type.startswith("image/"):
-                # Puedes intentar deducir por extensión si lo prefieres
-                logger.warning(f"No es imagen. Content-Type: {content_type}")
+            # Validar que sea imagen (se revisa en los metadatos, antes de descargarla)
+            if not image.content_type.startswith("image/"):
+                logger.warning(f"No es imagen. Content-Type: {image.content_type}")
                 return HttpResponse("La URL no tiene una imagen", status=404)
 
-            resp = HttpResponse(blob, content_type=content_type)
-            resp["Cache-Control"] = "public, max-age=900"
+            if image.path is None:
+                # Demasiado grande para el cache local: se reenvía desde SharePoint
+                upstream = SharePointManager.open_file_stream(url)
+                if upstream is None:
+                    return HttpResponse("Imagen no encontrada", status=404)
+                resp = proxy_streaming_response(upstream, content_type=image.content_type)
+                resp["Cache-Control"] = "public, max-age=900"
+            else:
+                resp = blob_response(request, image, "public, max-age=900")
             resp["Access-Control-Allow-Origin"] = "*"
             return resp
 